@@ -1,4 +1,28 @@
 import copy
+import itertools
+import random
+import re
+
+# NumPy is optional, it only speeds up generating large boards
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Above this many bombs create_bomb_set samples with NumPy, when it's installed
+NUMPY_BOMB_THRESHOLD = 100000
+
+# The eight neighbors of a cell as (delta_x, delta_y) offsets
+DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1),
+              (0, -1), (0, 1),
+              (1, -1), (1, 0), (1, 1)]
+
+# The board size and number of bombs of each difficulty, from easiest to hardest
+DIFFICULTIES = {
+    "easy": {"board_width": 10, "board_height": 10, "num_bombs": 10},
+    "medium": {"board_width": 15, "board_height": 15, "num_bombs": 20},
+    "hard": {"board_width": 20, "board_height": 20, "num_bombs": 40}
+}
 
 
 def create_cell(visible=False, flagged=False, value='0'):
@@ -11,18 +35,255 @@ def create_cell(visible=False, flagged=False, value='0'):
     return {"visible": visible, "flagged": flagged, "value": value}
 
 
+# Bits of a cell's state byte in a Board
+VISIBLE = 1
+FLAGGED = 2
+
+# Runs of hidden, unflagged states and of 0 values, which a Board's flood fill reveals a run at a time
+_HIDDEN_RUN = re.compile(b'\x00+')
+_ZERO_RUN = re.compile(b'0+')
+
+
+class Board:
+    """
+    A compact board that stores every cell's value and state in byte arrays.
+    Values are one flat array and states are one array per row. Copies share both and only copy
+    the values, or a single row of states, right before writing to them, so a new board made by a
+    move shares every row the move didn't touch with the board it came from.
+    Rows and cells can still be indexed like a 2D array of dictionaries (board[y][x]["visible"]),
+    so a Board can be passed to any function that takes a board.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        # The character code of each cell's value, stored row by row
+        self.values = bytearray(b'0') * (width * height)
+        # The VISIBLE and FLAGGED bits of each cell, every row starts out sharing one blank row
+        self.state_rows = [bytearray(width)] * height
+        self._values_owned = True
+        self._owned_rows = set()
+        # board_to_string's rendering of each row, None until it's rendered or after the row is written to
+        self._row_strings = [None] * height
+
+    @classmethod
+    def from_list(cls, board):
+        """ Builds a Board from a 2D array of cells
+        :param board: 2D Array of Dictionaries
+        :return: A new Board
+        """
+        result = cls(len(board[0]), len(board))
+        for y, row in enumerate(board):
+            for x, cell in enumerate(row):
+                result.set_cell((x, y), cell)
+        return result
+
+    def to_list(self):
+        """ Builds a 2D array of cells from this Board
+        :return: 2D Array of Dictionaries
+        """
+        return [[self.get_cell((x, y)) for x in range(self.width)] for y in range(self.height)]
+
+    def own_values(self):
+        """ Gets the values array for writing, copying it first if it's shared with another board
+        :return: The values bytearray
+        """
+        if not self._values_owned:
+            self.values = self.values[:]
+            self._values_owned = True
+        self._row_strings = [None] * self.height
+        return self.values
+
+    def own_row(self, y):
+        """ Gets a row of states for writing, copying it first if it's shared with another board
+        :param y: The row
+        :return: The row's state bytearray
+        """
+        if y not in self._owned_rows:
+            self.state_rows[y] = self.state_rows[y][:]
+            self._owned_rows.add(y)
+        self._row_strings[y] = None
+        return self.state_rows[y]
+
+    def get_cell(self, coord):
+        """ Gets a copy of a cell
+        :param coord: A tuple of the cell
+        :return: A cell Dictionary
+        """
+        (x, y) = coord
+        state = self.state_rows[y][x]
+        return create_cell(bool(state & VISIBLE), bool(state & FLAGGED), chr(self.values[y * self.width + x]))
+
+    def set_cell(self, coord, cell):
+        """ Overwrites a cell
+        :param coord: A tuple of the cell
+        :param cell: A cell Dictionary
+        """
+        (x, y) = coord
+        value = ord(cell["value"])
+        if self.values[y * self.width + x] != value:
+            self.own_values()[y * self.width + x] = value
+        self.own_row(y)[x] = (VISIBLE if cell["visible"] else 0) | (FLAGGED if cell["flagged"] else 0)
+
+    def copy(self):
+        """ Copies the board in O(height), the copy and the original share all of their arrays
+        :return: A new Board
+        """
+        result = Board.__new__(Board)
+        result.width = self.width
+        result.height = self.height
+        result.values = self.values
+        result.state_rows = self.state_rows[:]
+        # Neither board may write to the shared arrays any more
+        self._values_owned = result._values_owned = False
+        self._owned_rows = set()
+        result._owned_rows = set()
+        result._row_strings = self._row_strings[:]
+        return result
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, y):
+        if y < 0:
+            y += self.height
+        if not 0 <= y < self.height:
+            raise IndexError("board row out of range")
+        return _BoardRow(self, y)
+
+    def __iter__(self):
+        for y in range(self.height):
+            yield _BoardRow(self, y)
+
+    def __eq__(self, other):
+        if isinstance(other, Board):
+            return (self.width == other.width and self.height == other.height and self.values == other.values
+                    and self.state_rows == other.state_rows)
+        if isinstance(other, list):
+            return self.to_list() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "Board(" + repr(self.to_list()) + ")"
+
+
+class _BoardRow:
+    """
+    A view of one row of a Board that can be indexed like a list of cells
+    """
+
+    def __init__(self, board, y):
+        self.board = board
+        self.y = y
+
+    def __len__(self):
+        return self.board.width
+
+    def __getitem__(self, x):
+        if x < 0:
+            x += self.board.width
+        if not 0 <= x < self.board.width:
+            raise IndexError("board column out of range")
+        return _BoardCell(self.board, (x, self.y))
+
+    def __setitem__(self, x, cell):
+        self.board.set_cell((x, self.y), cell)
+
+    def __iter__(self):
+        for x in range(self.board.width):
+            yield _BoardCell(self.board, (x, self.y))
+
+    def __eq__(self, other):
+        return list(self) == other
+
+    __hash__ = None
+
+
+class _BoardCell:
+    """
+    A view of one cell of a Board that can be read and written like a cell Dictionary
+    """
+
+    def __init__(self, board, coord):
+        self.board = board
+        self.coord = coord
+
+    def __getitem__(self, key):
+        return self.board.get_cell(self.coord)[key]
+
+    def __setitem__(self, key, value):
+        cell = self.board.get_cell(self.coord)
+        if key not in cell:
+            raise KeyError(key)
+        cell[key] = value
+        self.board.set_cell(self.coord, cell)
+
+    def to_dict(self):
+        return self.board.get_cell(self.coord)
+
+    def __eq__(self, other):
+        if isinstance(other, _BoardCell):
+            other = other.to_dict()
+        return self.to_dict() == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+
 def create_board(width, height):
     """ Get a new Board data structure
     :param width:
     :param height:
-    :return: A 2D array of cells
-    """
-    result = []
-    for y in range(height):
-        row = []
-        for x in range(width):
-            row.append(create_cell())
-        result.append(row)
+    :return: A Board of hidden '0' cells
+    """
+    return Board(width, height)
+
+
+def create_bomb_set(board_width, board_height, num_bombs, seed=None, safe_coord=None):
+    """ Picks exactly num_bombs distinct bomb locations, uniformly at random
+    :param board_width:
+    :param board_height:
+    :param num_bombs: How many bombs to place
+    :param seed: A seed or a random.Random to make the bombs reproducible, defaults to a fresh seed
+    :param safe_coord: A tuple where the first click will be, no bombs are placed on it or its neighbors
+    :return: A set of (x, y) tuples
+    """
+    rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+    total_cells = board_width * board_height
+
+    safe_cells = set()
+    if safe_coord is not None:
+        (x, y) = safe_coord
+        for (delta_x, delta_y) in DIRECTIONS + [(0, 0)]:
+            if 0 <= y + delta_y < board_height and 0 <= x + delta_x < board_width:
+                safe_cells.add((y + delta_y) * board_width + x + delta_x)
+    if not 0 <= num_bombs <= total_cells - len(safe_cells):
+        raise ValueError("Can't place " + str(num_bombs) + " bombs on a " + str(board_width) + "x" +
+                         str(board_height) + " board")
+
+    # Sampling a few extra cells and skipping the safe ones keeps the choice uniform,
+    # since the sample comes back in random order
+    if np is not None and num_bombs >= NUMPY_BOMB_THRESHOLD:
+        np_rng = np.random.default_rng(rng.getrandbits(64))
+        cells = np_rng.choice(total_cells, num_bombs + len(safe_cells), replace=False)
+        if safe_cells:
+            cells = cells[~np.isin(cells, list(safe_cells))]
+        cells = cells[:num_bombs]
+        return set(zip((cells % board_width).tolist(), (cells // board_width).tolist()))
+
+    result = set()
+    for i in rng.sample(range(total_cells), num_bombs + len(safe_cells)):
+        if len(result) == num_bombs:
+            break
+        if i not in safe_cells:
+            result.add((i % board_width, i // board_width))
     return result
 
 
@@ -33,14 +294,18 @@ def create_game(board_width, board_height, bomb_set):
     :param bomb_set:
     :return: A game Dictionary
     """
-    return {
+    board = place_nums_on_board(place_bombs_on_board(create_board(board_width, board_height), bomb_set))
+    result = {
         "board_width": board_width,
         "board_height": board_height,
         "bombs": bomb_set,
         "game_over": False,
         "is_win": False,
-        "board": place_nums_on_board(place_bombs_on_board(create_board(board_width, board_height), bomb_set))
+        "board": board
     }
+    # Running counts that get_next_game keeps up to date, so it never has to scan the board
+    result.update(count_board(board))
+    return result
 
 
 def cell_to_char(cell):
@@ -59,15 +324,44 @@ def board_to_string(board):
     :param board:
     :return: A String representing the given board
     """
-    result = ""
-    for y in range(len(board)):
-        row_string = ""
-        for x in range(len(board[0])):
-            row_string += cell_to_char(board[y][x])
-        result += row_string
-        if y in range(len(board) - 1):
-            result += '\n'
-    return result
+    if isinstance(board, Board):
+        return _packed_board_to_string(board)
+    return '\n'.join(''.join(cell_to_char(cell) for cell in row) for row in board)
+
+
+def _packed_board_to_string(board):
+    """ Generates a string from a Board without creating any cells
+    Each row's string is kept on the board, so only rows written to since the last call are rendered.
+    :param board: A Board
+    :return: A String representing the given board
+    """
+    row_strings = board._row_strings
+    for y in range(board.height):
+        if row_strings[y] is None:
+            row_strings[y] = _packed_row_to_string(board, y)
+    return '\n'.join(row_strings)
+
+
+# Turns the state of a hidden cell into its char, and visible states into a placeholder
+HIDDEN_CHARS = bytes(ord('F') if state & FLAGGED else ord('#') for state in range(256))
+
+
+def _packed_row_to_string(board, y):
+    """ Generates the string for one row of a Board
+    :param board: A Board
+    :param y: The row
+    :return: A String representing the given row
+    """
+    states = board.state_rows[y]
+    start = y * board.width
+    hidden_cells = states.count(0) + states.count(FLAGGED)
+    if hidden_cells == board.width:
+        return states.translate(HIDDEN_CHARS).decode()
+    values = board.values[start:start + board.width]
+    if hidden_cells == 0:
+        return values.decode()
+    hidden = HIDDEN_CHARS
+    return bytes(value if state & VISIBLE else hidden[state] for (value, state) in zip(values, states)).decode()
 
 
 def place_bombs_on_board(board, bomb_set):
@@ -76,6 +370,8 @@ def place_bombs_on_board(board, bomb_set):
     :param bomb_set:
     :return: a new board
     """
+    if isinstance(board, Board):
+        return _place_bombs_on_packed_board(board, bomb_set)
     result = copy.deepcopy(board)
     for y in range(len(board)):
         for x in range(len(board[0])):
@@ -89,15 +385,19 @@ def place_nums_on_board(board):
     :param board: 2D array of dictionaries
     :return: Returns a board with numbers
     """
+    if isinstance(board, Board):
+        result = board.copy()
+        if np is not None:
+            _place_nums_with_numpy(result)
+        else:
+            _place_nums_with_scatter(result)
+        return result
     result = copy.deepcopy(board)
-    direction = [(-1, -1), (-1, 0), (-1, 1),
-                 (0, -1), (0, 1),
-                 (1, -1), (1, 0), (1, 1)]
     for y in range(len(result)):
         for x in range(len(result[0])):
             if result[y][x]["value"] == 'X':
                 continue
-            for (delta_x, delta_y) in direction:
+            for (delta_x, delta_y) in DIRECTIONS:
                 new_y = y + delta_y
                 new_x = x + delta_x
                 in_bounds = 0 <= new_y < len(result) and 0 <= new_x < len(result[0])
@@ -106,75 +406,500 @@ def place_nums_on_board(board):
     return result
 
 
-def get_next_board(board, action, coord):
-    """ Generates the next state of board with an action taken
-    :param board: 2D Array of Dictionaries
-    :param action: Reveal or Flag (Left or Right Click)
-    :param coord: A tuple where the action is being taken place
-    :return: A new board
+def _place_bombs_on_packed_board(board, bomb_set):
+    """ Generates a Board with bombs placed by writing each bomb straight into the values array
+    :param board: A Board
+    :param bomb_set: A set of coords, those out of bounds are ignored
+    :return: a new Board
     """
-    result = copy.deepcopy(board)
+    result = board.copy()
+    values = result.own_values()
+    width = result.width
+    height = result.height
+    bomb = ord('X')
+    for (x, y) in bomb_set:
+        if 0 <= y < height and 0 <= x < width:
+            values[y * width + x] = bomb
+    return result
+
+
+def _place_nums_with_numpy(board):
+    """ Adds the number of neighboring bombs to every non bomb cell of a Board in place,
+    summing eight shifted copies of the bomb mask
+    :param board: A Board, modified in place
+    """
+    if board.width == 0 or board.height == 0:
+        return
+    values = np.frombuffer(board.own_values(), dtype=np.uint8).reshape(board.height, board.width)
+    bombs = values == ord('X')
+    padded = np.pad(bombs, 1).astype(np.uint8)
+    counts = np.zeros(values.shape, dtype=np.uint8)
+    for (delta_x, delta_y) in DIRECTIONS:
+        counts += padded[1 + delta_y:1 + delta_y + board.height, 1 + delta_x:1 + delta_x + board.width]
+    counts[bombs] = 0
+    values += counts
+
+
+def _place_nums_with_scatter(board):
+    """ Adds the number of neighboring bombs to every non bomb cell of a Board in place,
+    visiting only the neighbors of each bomb
+    :param board: A Board, modified in place
+    """
+    values = board.own_values()
+    width = board.width
+    height = board.height
+    bomb = ord('X')
+    i = values.find(bomb)
+    while i != -1:
+        (y, x) = divmod(i, width)
+        for (delta_x, delta_y) in DIRECTIONS:
+            new_x = x + delta_x
+            new_y = y + delta_y
+            if 0 <= new_y < height and 0 <= new_x < width:
+                j = new_y * width + new_x
+                if values[j] != bomb:
+                    values[j] += 1
+        i = values.find(bomb, i + 1)
+
+
+def reveal_on_board(board, coord):
+    """ Reveals a cell in place, flood filling outward from hidden 0 cells
+    Uses an explicit stack instead of recursion so large open areas don't hit the recursion limit.
+    :param board: 2D Array of Dictionaries, modified in place
+    :param coord: A tuple where the reveal starts
+    :return: A list of the coords that were revealed
+    """
+    return _flood_fill(board, [coord])
+
+
+def chord_on_board(board, coord):
+    """ Reveals every unflagged neighbor of a visible number in place, if it has exactly that many
+    flagged neighbors. All of the neighbors are flood filled together in a single pass.
+    :param board: 2D Array of Dictionaries, modified in place
+    :param coord: A tuple of the number
+    :return: A list of the coords that were revealed
+    """
+    height = len(board)
+    width = len(board[0])
     (x, y) = coord
-    in_bounds = 0 <= y < len(result) and 0 <= x < len(result[0])
-    if not in_bounds:
-        return result
+    if not (0 <= y < height and 0 <= x < width):
+        return []
+    cell = board[y][x]
+    if not cell["visible"] or not '1' <= cell["value"] <= '8':
+        return []
+
+    neighbors = [(x + delta_x, y + delta_y) for (delta_x, delta_y) in DIRECTIONS
+                 if 0 <= y + delta_y < height and 0 <= x + delta_x < width]
+    flags = sum(1 for (new_x, new_y) in neighbors if board[new_y][new_x]["flagged"])
+    if flags != int(cell["value"]):
+        return []
+    return _flood_fill(board, neighbors)
+
+
+def _flood_fill(board, coords):
+    """ Reveals cells in place, flood filling outward from hidden 0 cells
+    :param board: 2D Array of Dictionaries, modified in place
+    :param coords: The coords where the reveal starts, those out of bounds are ignored
+    :return: A list of the coords that were revealed
+    """
+    if isinstance(board, Board):
+        return _flood_fill_packed_board(board, coords)
+    height = len(board)
+    width = len(board[0])
+
+    # Cells are revealed as they're pushed, so no cell is pushed twice
+    revealed = []
+    for (x, y) in coords:
+        if 0 <= y < height and 0 <= x < width:
+            cell = board[y][x]
+            if not cell["visible"] and not cell["flagged"]:
+                cell["visible"] = True
+                revealed.append((x, y))
+    stack = revealed[:]
+    while stack:
+        (x, y) = stack.pop()
+        if board[y][x]["value"] != '0':
+            continue
+        for (delta_x, delta_y) in DIRECTIONS:
+            new_x = x + delta_x
+            new_y = y + delta_y
+            if 0 <= new_y < height and 0 <= new_x < width:
+                neighbor = board[new_y][new_x]
+                if not neighbor["visible"] and not neighbor["flagged"]:
+                    neighbor["visible"] = True
+                    revealed.append((new_x, new_y))
+                    stack.append((new_x, new_y))
+    return revealed
+
 
-    cell = result[y][x]
-    directions = [(-1, -1), (-1, 0), (-1, 1),
-                  (0, -1), (0, 1),
-                  (1, -1), (1, 0), (1, 1)]
+def _flood_fill_packed_board(board, coords):
+    """ Reveals cells of a Board in place, working directly on its arrays
+    Works on runs of cells in a row rather than single cells: each run of 0 cells reveals the
+    hidden runs in the rows above, below and beside it with one slice assignment each, and the
+    runs are found by regular expressions over the row's bytes, so the Python work grows with the
+    number of runs rather than the number of cells.
+    :param board: A Board, modified in place
+    :param coords: The coords where the reveal starts, those out of bounds are ignored
+    :return: A list of the coords that were revealed
+    """
+    width = board.width
+    height = board.height
+    values = board.values
+    state_rows = board.state_rows
+    zero = ord('0')
+
+    revealed = []
+    # Rows already taken for writing during this fill
+    owned = set()
+    # Runs of revealed 0 cells whose neighbors still need revealing, as (y, start, end)
+    runs = []
+    for (x, y) in coords:
+        if 0 <= y < height and 0 <= x < width and not state_rows[y][x]:
+            if y not in owned:
+                board.own_row(y)
+                owned.add(y)
+            state_rows[y][x] = VISIBLE
+            revealed.append((x, y))
+            if values[y * width + x] == zero:
+                runs.append((y, x, x + 1))
+    while runs:
+        (y, start, end) = runs.pop()
+        start = max(start - 1, 0)
+        end = min(end + 1, width)
+        for new_y in (y - 1, y, y + 1):
+            if not 0 <= new_y < height:
+                continue
+            row_start = new_y * width
+            for hidden in _HIDDEN_RUN.finditer(state_rows[new_y], start, end):
+                (left, right) = hidden.span()
+                if new_y not in owned:
+                    board.own_row(new_y)
+                    owned.add(new_y)
+                states = state_rows[new_y]
+                states[left:right] = bytes([VISIBLE]) * (right - left)
+                revealed.extend(zip(range(left, right), itertools.repeat(new_y)))
+                for zeros in _ZERO_RUN.finditer(values, row_start + left, row_start + right):
+                    (zeros_left, zeros_right) = (zeros.start() - row_start, zeros.end() - row_start)
+                    # A run touching the edge of the window carries on past it, through hidden 0 cells
+                    if zeros_right == end:
+                        hidden_end = _HIDDEN_RUN.match(states, zeros_right)
+                        zeros_end = _ZERO_RUN.match(values, row_start + zeros_right, row_start + width)
+                        if hidden_end and zeros_end:
+                            new_right = min(hidden_end.end(), zeros_end.end() - row_start)
+                            states[zeros_right:new_right] = bytes([VISIBLE]) * (new_right - zeros_right)
+                            revealed.extend(zip(range(zeros_right, new_right), itertools.repeat(new_y)))
+                            zeros_right = new_right
+                    if zeros_left == start:
+                        new_left = zeros_left
+                        while new_left > 0 and not states[new_left - 1] and values[row_start + new_left - 1] == zero:
+                            new_left -= 1
+                        states[new_left:zeros_left] = bytes([VISIBLE]) * (zeros_left - new_left)
+                        revealed.extend(zip(range(new_left, zeros_left), itertools.repeat(new_y)))
+                        zeros_left = new_left
+                    runs.append((new_y, zeros_left, zeros_right))
+    return revealed
 
+
+def flag_on_board(board, coord):
+    """ Toggles the flag on a cell in place
+    :param board: 2D Array of Dictionaries, modified in place
+    :param coord: A tuple of the cell to flag or unflag
+    :return: A list of the coords that were changed
+    """
+    (x, y) = coord
+    if not (0 <= y < len(board) and 0 <= x < len(board[0])):
+        return []
+    cell = board[y][x]
+    cell["flagged"] = not cell["flagged"]
+    return [coord]
+
+
+def update_board(board, action, coord):
+    """ Applies an action to a board in place
+    :param board: 2D Array of Dictionaries, modified in place
+    :param action: Reveal, Flag or Chord (Left, Right or Middle Click)
+    :param coord: A tuple where the action is being taken place
+    :return: A list of the coords that were changed
+    """
     if action == "LEFT_CLICK":
-        if not cell["visible"] and not cell["flagged"]:
-            cell["visible"] = True
-            if cell["value"] == '0':
-                for (delta_x, delta_y) in directions:
-                    result = get_next_board(result, action, (x + delta_x, y + delta_y))
+        return reveal_on_board(board, coord)
     elif action == "RIGHT_CLICK":
-        cell["flagged"] = not cell["flagged"]
+        return flag_on_board(board, coord)
+    elif action == "CHORD":
+        return chord_on_board(board, coord)
+    return []
+
 
+def get_next_board(board, action, coord):
+    """ Generates the next state of board with an action taken
+    :param board: 2D Array of Dictionaries
+    :param action: Reveal, Flag or Chord (Left, Right or Middle Click)
+    :param coord: A tuple where the action is being taken place
+    :return: A new board
+    """
+    result = copy.deepcopy(board)
+    update_board(result, action, coord)
     return result
 
 
-def is_board_over(board):
-    """ Checks the board to see if the game is over and if it's a win
+def count_board(board):
+    """ Counts the bombs and visible cells of a board with a full scan
     :param board: 2D Array of Dictionaries
-    :return: Tuple of two Booleans
+    :return: A Dictionary with "total_bombs", "visible_bombs" and "visible_non_bombs"
     """
-    result = copy.deepcopy(board)
+    if isinstance(board, Board):
+        return _count_packed_board(board)
 
-    total_cells = len(result) * len(result[0])
     total_bombs = 0
     visible_bombs = 0
     visible_non_bombs = 0
-    for y in range(len(result)):
-        for x in range(len(result[0])):
-            cell = result[y][x]
+    for y in range(len(board)):
+        for x in range(len(board[0])):
+            cell = board[y][x]
             if cell["value"] == 'X':
                 total_bombs += 1
                 if cell["visible"]:
                     visible_bombs += 1
             elif cell["visible"]:
                 visible_non_bombs += 1
+    return {
+        "total_bombs": total_bombs,
+        "visible_bombs": visible_bombs,
+        "visible_non_bombs": visible_non_bombs
+    }
+
+
+def _count_packed_board(board):
+    """ Counts the bombs and visible cells of a Board without creating any cells
+    :param board: A Board
+    :return: A Dictionary with "total_bombs", "visible_bombs" and "visible_non_bombs"
+    """
+    values = board.values
+    width = board.width
+    bomb = ord('X')
+    visible_cells = 0
+    visible_bombs = 0
+    for y, states in enumerate(board.state_rows):
+        hidden_cells = states.count(0) + states.count(FLAGGED)
+        if hidden_cells == width:
+            continue
+        visible_cells += width - hidden_cells
+        start = y * width
+        visible_bombs += sum(1 for (value, state) in zip(values[start:start + width], states)
+                             if state & VISIBLE and value == bomb)
+    return {
+        "total_bombs": values.count(bomb),
+        "visible_bombs": visible_bombs,
+        "visible_non_bombs": visible_cells - visible_bombs
+    }
+
 
-    if visible_bombs > 0:
+def get_result(counts, total_cells):
+    """ Decides if the game is over and if it's a win from a board's counts
+    :param counts: A Dictionary with "total_bombs", "visible_bombs" and "visible_non_bombs"
+    :param total_cells: The number of cells on the board
+    :return: Tuple of two Booleans
+    """
+    if counts["visible_bombs"] > 0:
         return True, False
-    elif visible_non_bombs == total_cells - total_bombs:
+    elif counts["visible_non_bombs"] == total_cells - counts["total_bombs"]:
         return True, True
     else:
         return False, False
 
 
+def is_board_over(board):
+    """ Checks the board to see if the game is over and if it's a win
+    Scans every cell, games keep running counts instead and only need this to check them.
+    :param board: 2D Array of Dictionaries
+    :return: Tuple of two Booleans
+    """
+    return get_result(count_board(board), len(board) * len(board[0]))
+
+
 def get_next_game(game, action, coord):
     """ Generate and return the next state of game
     :param game: A game dictionary
-    :param action: An action to perform (either the string "LEFT_CLICK" or "RIGHT_CLICK")
+    :param action: An action to perform (the string "LEFT_CLICK", "RIGHT_CLICK" or "CHORD")
     :param coord: A location to perform the action
     :return: A new game dictionary
     """
-    result = copy.deepcopy(game)
-    result["board"] = get_next_board(result["board"], action, coord)
-    is_over, is_win = is_board_over(result["board"])
-    result["game_over"] = is_over
-    result["is_win"] = is_win
+    # The bomb set is never modified so it can be shared, and copying a Board shares its unchanged rows
+    result = dict(game)
+    result["board"] = copy.deepcopy(game["board"])
+    changed = update_board(result["board"], action, coord)
+    _update_result(result, [] if action == "RIGHT_CLICK" else changed)
     return result
+
+
+def apply_moves(game, moves):
+    """ Applies a sequence of moves, copying the game only once at the start
+    Stops early if the game ends, so the moves after the one that ended it aren't applied.
+    :param game: A game dictionary, which isn't changed
+    :param moves: An iterable of (action, coord) pairs, like get_next_game takes
+    :return: A tuple of the final game dictionary and a list with a Dictionary for each move applied,
+        with its "action", "coord" and the coords it "changed"
+    """
+    result = Game(game)
+    summaries = []
+    for (action, coord) in moves:
+        if result["game_over"]:
+            break
+        summaries.append({"action": action, "coord": coord, "changed": result.play(action, coord)})
+    return result.state, summaries
+
+
+def _update_result(game, revealed):
+    """ Adds newly revealed cells to a game's running counts and updates whether it's over
+    :param game: A game dictionary, modified in place
+    :param revealed: The coords revealed by the last move
+    """
+    board = game["board"]
+    if isinstance(board, Board):
+        (values, width, bomb) = (board.values, board.width, ord('X'))
+        bombs = sum(1 for (x, y) in revealed if values[y * width + x] == bomb)
+    else:
+        bombs = sum(1 for (x, y) in revealed if board[y][x]["value"] == 'X')
+    game["visible_bombs"] += bombs
+    game["visible_non_bombs"] += len(revealed) - bombs
+    is_over, is_win = get_result(game, game["board_width"] * game["board_height"])
+    game["game_over"] = is_over
+    game["is_win"] = is_win
+
+
+class Game:
+    """
+    A game that each move changes in place, for when keeping every state around isn't needed.
+    Moves only touch the cells they change and return those cells, while the game dictionary is
+    still available through game["board"] and friends, or as a whole through state.
+    """
+
+    def __init__(self, game):
+        self.state = dict(game)
+        self.state["board"] = copy.deepcopy(game["board"])
+
+    def __getitem__(self, key):
+        return self.state[key]
+
+    def reveal(self, x, y):
+        """ Reveals a cell, flood filling from hidden 0 cells
+        :return: A list of the coords that were revealed
+        """
+        changed = reveal_on_board(self.state["board"], (x, y))
+        _update_result(self.state, changed)
+        return changed
+
+    def flag(self, x, y):
+        """ Toggles the flag on a cell
+        :return: A list of the coords that were changed
+        """
+        return flag_on_board(self.state["board"], (x, y))
+
+    def chord(self, x, y):
+        """ Reveals the unflagged neighbors of a number that has as many flagged neighbors
+        :return: A list of the coords that were revealed
+        """
+        changed = chord_on_board(self.state["board"], (x, y))
+        _update_result(self.state, changed)
+        return changed
+
+    def play(self, action, coord):
+        """ Performs an action the same way get_next_game does, but in place
+        :param action: An action to perform (the string "LEFT_CLICK", "RIGHT_CLICK" or "CHORD")
+        :param coord: A location to perform the action
+        :return: A list of the coords that were changed
+        """
+        (x, y) = coord
+        if action == "LEFT_CLICK":
+            return self.reveal(x, y)
+        elif action == "RIGHT_CLICK":
+            return self.flag(x, y)
+        elif action == "CHORD":
+            return self.chord(x, y)
+        return []
+
+
+def _get_change(game, rows, values):
+    """ Records the parts of a game that a move changes, sharing the arrays rather than copying them
+    :param game: A game dictionary with a Board
+    :param rows: The rows of states to record
+    :param values: Whether to record the values array
+    :return: A tuple of the game's other keys as a Dictionary, its rows by row and its values or None
+    """
+    board = game["board"]
+    fields = {key: value for (key, value) in game.items() if key != "board"}
+    return fields, {y: board.state_rows[y] for y in rows}, board.values if values else None
+
+
+def _apply_change(game, change):
+    """ Builds the game a change was recorded from, out of a game that differs from it by the same rows
+    :param game: A game dictionary with a Board, which isn't changed
+    :param change: A tuple from _get_change
+    :return: A tuple of a new game dictionary and the change that turns it back into game
+    """
+    (fields, rows, values) = change
+    undo = _get_change(game, rows, values is not None)
+    board = game["board"].copy()
+    for (y, row) in rows.items():
+        board.state_rows[y] = row
+        board._row_strings[y] = None
+    if values is not None:
+        board.values = values
+        board._row_strings = [None] * board.height
+    result = dict(fields)
+    result["board"] = board
+    return result, undo
+
+
+class History:
+    """
+    A game that moves can be undone and redone on.
+    Only the current game is kept whole. Every other state is kept as the rows of cell states its move
+    changed (and the values, for a move that changed them) along with the game's other keys, so a
+    long history costs memory for the rows that actually changed rather than for every row of every
+    state. Undoing or redoing copies the current board, which takes O(height), and patches those rows.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        # Changes that turn the current game into the one before or after it, latest last
+        self._undo_changes = []
+        self._redo_changes = []
+
+    def can_undo(self):
+        return bool(self._undo_changes)
+
+    def can_redo(self):
+        return bool(self._redo_changes)
+
+    def play(self, action, coord):
+        """ Advances the current game, throwing away any states that could have been redone
+        :param action: An action to perform (the string "LEFT_CLICK", "RIGHT_CLICK" or "CHORD")
+        :param coord: A location to perform the action
+        :return: The new current game
+        """
+        game = get_next_game(self.game, action, coord)
+        # A copied board owns exactly the rows, and values, that the move wrote to
+        board = game["board"]
+        self._undo_changes.append(_get_change(self.game, board._owned_rows, board._values_owned))
+        self._redo_changes = []
+        self.game = game
+        return game
+
+    def undo(self):
+        """ Steps back to the previous game, if there is one
+        :return: The new current game
+        """
+        if self.can_undo():
+            (self.game, change) = _apply_change(self.game, self._undo_changes.pop())
+            self._redo_changes.append(change)
+        return self.game
+
+    def redo(self):
+        """ Steps forward to the next game, if there is one
+        :return: The new current game
+        """
+        if self.can_redo():
+            (self.game, change) = _apply_change(self.game, self._redo_changes.pop())
+            self._undo_changes.append(change)
+        return self.game
@@ -0,0 +1,251 @@
+import argparse
+import json
+import platform
+import random
+import time
+import tracemalloc
+import minesweeper
+import minesweeper_server
+
+DEFAULT_SIZES = [10, 100, 500, 1000, 2000]
+DEFAULT_DENSITIES = [0.1, 0.15, 0.2]
+DEFAULT_SEED = 1234
+
+# A result is flagged as a regression when it is this much slower than the run it's compared to
+DEFAULT_THRESHOLD = 0.2
+
+
+def measure(function, *args, repeat=3, setup=None):
+    """ Times a function and measures the memory it allocates
+    The timing runs don't trace memory, since tracing slows Python down a lot
+    :param function: The function to measure
+    :param args: Arguments to call the function with
+    :param repeat: How many timing runs to take the best of
+    :param setup: A function that makes fresh arguments before each call, instead of args, for
+        functions that would otherwise be measured reusing what an earlier call cached. It isn't
+        timed or traced.
+    :return: A Dictionary with the best "seconds" and the "peak_bytes" allocated during one call
+    """
+    best = None
+    for _ in range(repeat):
+        call_args = args if setup is None else setup()
+        start = time.perf_counter()
+        function(*call_args)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    call_args = args if setup is None else setup()
+    tracemalloc.start()
+    try:
+        function(*call_args)
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"seconds": best, "peak_bytes": peak_bytes}
+
+
+def get_cold_board(board):
+    """ Copies a Board without the rows board_to_string has already rendered
+    :param board: A Board
+    :return: A new Board
+    """
+    result = board.copy()
+    result._row_strings = [None] * result.height
+    return result
+
+
+def get_board_after_move(board, action, coord):
+    """ Renders a cold copy of a Board, then plays a move on it, so only the rows it changed need rendering again
+    :param board: A Board
+    :param action: An action to perform (the string "LEFT_CLICK", "RIGHT_CLICK" or "CHORD")
+    :param coord: A location to perform the action
+    :return: A new Board
+    """
+    result = get_cold_board(board)
+    minesweeper.board_to_string(result)
+    minesweeper.update_board(result, action, coord)
+    return result
+
+
+def create_seeded_game(size, density, seed):
+    """ Creates a square game with a reproducible set of bombs
+    :param size: The board's width and height
+    :param density: The fraction of cells that are bombs
+    :param seed: The seed for the bomb locations
+    :return: A game dictionary
+    """
+    bombs = minesweeper.create_bomb_set(size, size, int(size * size * density), seed=seed)
+    return minesweeper.create_game(size, size, bombs)
+
+
+def play_random_game(game, num_moves, seed):
+    """ Plays random moves with get_next_game until the game is over or num_moves were played
+    :param game: A game dictionary
+    :param num_moves: The most moves to play
+    :param seed: The seed for the moves
+    :return: The final game dictionary
+    """
+    rng = random.Random(seed)
+    for _ in range(num_moves):
+        if game["game_over"]:
+            break
+        action = "RIGHT_CLICK" if rng.random() < 0.2 else "LEFT_CLICK"
+        coord = (rng.randrange(game["board_width"]), rng.randrange(game["board_height"]))
+        game = minesweeper.get_next_game(game, action, coord)
+    return game
+
+
+def start_server_session(width, height):
+    """ Starts a server with one session on an empty board
+    :param width: The board's width
+    :param height: The board's height
+    :return: A list of the GameServer and the session's LocalClient
+    """
+    server = minesweeper_server.GameServer()
+    client = server.connect_local()
+    server.handle(client, {"type": "new", "width": width, "height": height, "bombs": 0})
+    client.outbox.get_nowait()
+    return [server, client]
+
+
+def play_server_move(server, client):
+    """ Reveals a cell in a client's session, and encodes the diff it gets back like a connection would
+    :param server: A GameServer
+    :param client: A LocalClient in a session
+    :return: The encoded diff
+    """
+    server.handle(client, {"type": "reveal", "x": 0, "y": 0})
+    return json.dumps(client.outbox.get_nowait(), separators=(",", ":"))
+
+
+def run_benchmarks(sizes=None, densities=None, seed=DEFAULT_SEED, num_moves=1000, repeat=3):
+    """ Runs every benchmark on every board size
+    :param sizes: The board sizes to run, defaults to DEFAULT_SIZES
+    :param densities: The bomb densities to sweep, defaults to DEFAULT_DENSITIES
+    :param seed: The seed for every board and move
+    :param num_moves: How many moves the random games play
+    :param repeat: How many timing runs to take the best of
+    :return: A Dictionary describing the run and its "results"
+    """
+    sizes = DEFAULT_SIZES if sizes is None else sizes
+    densities = DEFAULT_DENSITIES if densities is None else densities
+    results = []
+
+    def record(name, size, density, args, setup=None):
+        result = {"benchmark": name, "size": size, "density": density}
+        result.update(measure(*args, repeat=repeat, setup=setup))
+        results.append(result)
+
+    for size in sizes:
+        for density in densities:
+            record("create_game", size, density, [create_seeded_game, size, density, seed])
+
+        # Everything else runs on a board of the middle density
+        density = densities[len(densities) // 2]
+        game = create_seeded_game(size, density, seed)
+        coord = (size // 2, size // 2)
+        record("get_next_game", size, density, [minesweeper.get_next_game, game, "LEFT_CLICK", coord])
+        record("is_board_over", size, density, [minesweeper.is_board_over, game["board"]])
+        # Each render gets a board it hasn't rendered before, or else it'd only join cached rows
+        board = game["board"]
+        record("board_to_string", size, density, [minesweeper.board_to_string],
+               lambda: [get_cold_board(board)])
+        record("board_to_string_move", size, density, [minesweeper.board_to_string],
+               lambda: [get_board_after_move(board, "LEFT_CLICK", coord)])
+        record("random_game", size, density, [play_random_game, game, num_moves, seed])
+
+        # The worst single click reveals the entire board but one bomb in the corner
+        open_game = minesweeper.create_game(size, size, {(size - 1, size - 1)})
+        record("flood_fill", size, 0.0, [minesweeper.get_next_game, open_game, "LEFT_CLICK", (0, 0)])
+
+    # The server's worst move reveals the whole of the biggest board it allows, which should fit MOVE_BUDGET
+    width = int(minesweeper_server.MAX_CELLS ** 0.5)
+    height = minesweeper_server.MAX_CELLS // width
+    record("server_worst_move", width, 0.0, [play_server_move], lambda: start_server_session(width, height))
+
+    return {
+        "python": platform.python_version(),
+        "numpy": minesweeper.np is not None,
+        "seed": seed,
+        "num_moves": num_moves,
+        "results": results
+    }
+
+
+def compare_results(old_run, new_run, threshold=DEFAULT_THRESHOLD):
+    """ Finds the benchmarks that got slower between two runs
+    :param old_run: A Dictionary from run_benchmarks
+    :param new_run: A Dictionary from run_benchmarks
+    :param threshold: How much slower, as a fraction, counts as a regression
+    :return: A list of Dictionaries with the benchmark, its size and density, and both times
+    """
+    old_times = {}
+    for result in old_run["results"]:
+        old_times[(result["benchmark"], result["size"], result["density"])] = result["seconds"]
+
+    regressions = []
+    for result in new_run["results"]:
+        key = (result["benchmark"], result["size"], result["density"])
+        if key in old_times and result["seconds"] > old_times[key] * (1 + threshold):
+            regressions.append({
+                "benchmark": result["benchmark"],
+                "size": result["size"],
+                "density": result["density"],
+                "old_seconds": old_times[key],
+                "new_seconds": result["seconds"]
+            })
+    return regressions
+
+
+def results_to_string(run):
+    """ Generates a table from a run
+    :param run: A Dictionary from run_benchmarks
+    :return: A String with one line per result
+    """
+    lines = ["{:<20} {:>6} {:>8} {:>12} {:>12}".format("benchmark", "size", "density", "ms", "peak KiB")]
+    for result in run["results"]:
+        lines.append("{:<20} {:>6} {:>8.2f} {:>12.3f} {:>12.1f}".format(
+            result["benchmark"],
+            result["size"],
+            result["density"],
+            result["seconds"] * 1000,
+            result["peak_bytes"] / 1024
+        ))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the minesweeper engine")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--densities", type=float, nargs="+", default=DEFAULT_DENSITIES)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--moves", type=int, default=1000, help="moves played by the random games")
+    parser.add_argument("--repeat", type=int, default=3, help="timing runs to take the best of")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="a JSON file from an earlier run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    run = run_benchmarks(args.sizes, args.densities, args.seed, args.moves, args.repeat)
+    print(results_to_string(run))
+    for result in run["results"]:
+        if result["benchmark"] == "server_worst_move" and result["seconds"] > minesweeper_server.MOVE_BUDGET:
+            print("The server's worst move takes longer than its MOVE_BUDGET of "
+                  "{}s".format(minesweeper_server.MOVE_BUDGET))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(run, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare_results(json.load(file), run, args.threshold)
+        for regression in regressions:
+            print("REGRESSION {benchmark} size {size} density {density}: "
+                  "{old_seconds:.6f}s -> {new_seconds:.6f}s".format(**regression))
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
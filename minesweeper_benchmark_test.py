@@ -0,0 +1,51 @@
+import json
+import minesweeper
+from minesweeper_benchmark import *
+
+
+def test_run_benchmarks():
+    run = run_benchmarks(sizes=[5, 10], densities=[0.1, 0.2], num_moves=20, repeat=1)
+
+    # Every benchmark runs for every size, and the results survive a trip through JSON
+    names = [result["benchmark"] for result in run["results"] if result["size"] == 10]
+    assert names == ["create_game", "create_game", "get_next_game", "is_board_over", "board_to_string",
+                     "board_to_string_move", "random_game", "flood_fill"]
+    assert run["results"][-1]["benchmark"] == "server_worst_move"
+    assert all(result["seconds"] >= 0 and result["peak_bytes"] >= 0 for result in run["results"])
+    assert json.loads(json.dumps(run)) == run
+
+    # Renders are measured on boards that haven't cached them
+    game = create_seeded_game(10, 0.2, seed=3)
+    minesweeper.board_to_string(game["board"])
+    cold = get_cold_board(game["board"])
+    assert cold._row_strings == [None] * 10
+    assert minesweeper.board_to_string(cold) == minesweeper.board_to_string(game["board"])
+    moved = get_board_after_move(game["board"], "RIGHT_CLICK", (3, 4))
+    assert [row is None for row in moved._row_strings] == [y == 4 for y in range(10)]
+
+    # The server's worst move reveals every cell of the board
+    (server, client) = start_server_session(20, 10)
+    diff = json.loads(play_server_move(server, client))
+    assert len(diff["cells"]) == 200 and diff["is_win"]
+
+    # The random games are reproducible from the seed
+    game = create_seeded_game(10, 0.2, seed=3)
+    assert play_random_game(game, 20, seed=4) == play_random_game(game, 20, seed=4)
+
+
+def test_compare_results():
+    old_run = {"results": [
+        {"benchmark": "flood_fill", "size": 10, "density": 0.0, "seconds": 1.0, "peak_bytes": 0},
+        {"benchmark": "create_game", "size": 10, "density": 0.1, "seconds": 1.0, "peak_bytes": 0}
+    ]}
+    new_run = {"results": [
+        {"benchmark": "flood_fill", "size": 10, "density": 0.0, "seconds": 1.1, "peak_bytes": 0},
+        {"benchmark": "create_game", "size": 10, "density": 0.1, "seconds": 1.5, "peak_bytes": 0},
+        {"benchmark": "create_game", "size": 20, "density": 0.1, "seconds": 9.0, "peak_bytes": 0}
+    ]}
+
+    # Only results slower than the threshold, that were in both runs, are regressions
+    assert compare_results(old_run, new_run) == [{
+        "benchmark": "create_game", "size": 10, "density": 0.1, "old_seconds": 1.0, "new_seconds": 1.5
+    }]
+    assert compare_results(old_run, new_run, threshold=0.05)[0]["benchmark"] == "flood_fill"
@@ -0,0 +1,387 @@
+import collections
+import random
+import minesweeper
+
+DEFAULT_CHUNK_SIZE = 32
+DEFAULT_CACHE_SIZE = 1024
+
+# Floods stop after revealing this many cells, since a sparse unbounded board can open up forever
+DEFAULT_MAX_REVEAL = 1000000
+
+
+class ChunkedBoard:
+    """
+    A board split into square chunks whose mines and numbers are made from a seed the first time
+    they're needed, so it can be huge or unbounded.
+    A chunk's mines only depend on the seed and where the chunk is, so generated chunks are kept in
+    an LRU cache and simply made again if they're needed after being evicted. The VISIBLE and
+    FLAGGED state is kept for every chunk that's been played on, so memory grows with the area
+    explored rather than the size of the board.
+    Coords can be negative when the board is unbounded.
+    """
+
+    def __init__(self, seed, density, width=None, height=None, safe_coord=None,
+                 chunk_size=DEFAULT_CHUNK_SIZE, cache_size=DEFAULT_CACHE_SIZE):
+        """
+        :param seed: An int or string the mines are made from
+        :param density: The fraction of cells in each chunk that are mines
+        :param width: The board's width, or None for no limit
+        :param height: The board's height, or None for no limit
+        :param safe_coord: A tuple where the first click will be, no mines are placed on it or its neighbors
+        :param chunk_size: How many cells wide and high each chunk is
+        :param cache_size: How many chunks of mines, and of values, to keep generated
+        """
+        self.seed = seed
+        self.density = density
+        self.width = width
+        self.height = height
+        self.safe_coord = safe_coord
+        self.chunk_size = chunk_size
+        self.cache_size = cache_size
+        self._mines = collections.OrderedDict()
+        self._values = collections.OrderedDict()
+        self._states = {}
+
+    def in_bounds(self, coord):
+        (x, y) = coord
+        return ((self.width is None or 0 <= x < self.width) and
+                (self.height is None or 0 <= y < self.height))
+
+    def get_chunk(self, coord):
+        """ Finds which chunk a cell is in
+        :return: A tuple of the chunk's coord and the cell's index in the chunk
+        """
+        (x, y) = coord
+        (chunk_x, local_x) = divmod(x, self.chunk_size)
+        (chunk_y, local_y) = divmod(y, self.chunk_size)
+        return (chunk_x, chunk_y), local_y * self.chunk_size + local_x
+
+    def _get_safe_cells(self):
+        if self.safe_coord is None:
+            return set()
+        (x, y) = self.safe_coord
+        return {(x + delta_x, y + delta_y) for (delta_x, delta_y) in minesweeper.DIRECTIONS + [(0, 0)]}
+
+    def get_chunk_cells(self, chunk):
+        """ Gets the indexes of a chunk's cells that can hold mines
+        :param chunk: A tuple of the chunk's coord
+        :return: A list of indexes
+        """
+        size = self.chunk_size
+        (origin_x, origin_y) = (chunk[0] * size, chunk[1] * size)
+        safe = self._get_safe_cells()
+        return [local_y * size + local_x for local_y in range(size) for local_x in range(size)
+                if self.in_bounds((origin_x + local_x, origin_y + local_y))
+                and (origin_x + local_x, origin_y + local_y) not in safe]
+
+    def get_chunk_size(self, chunk):
+        """ Gets how many of a chunk's cells are on the board
+        :return: A tuple of the width and height of the part of the chunk on the board
+        """
+        size = self.chunk_size
+        (origin_x, origin_y) = (chunk[0] * size, chunk[1] * size)
+        width = size if self.width is None else max(0, min(origin_x + size, self.width) - max(origin_x, 0))
+        height = size if self.height is None else max(0, min(origin_y + size, self.height) - max(origin_y, 0))
+        return width, height
+
+    def count_chunk_mines(self, chunk):
+        """ Gets how many mines a chunk has, without generating it
+        :return: An int
+        """
+        size = self.chunk_size
+        (origin_x, origin_y) = (chunk[0] * size, chunk[1] * size)
+        (width, height) = self.get_chunk_size(chunk)
+        safe = sum(1 for (x, y) in self._get_safe_cells() if self.in_bounds((x, y))
+                   and origin_x <= x < origin_x + size and origin_y <= y < origin_y + size)
+        return round((width * height - safe) * self.density)
+
+    def count_mines(self):
+        """ Gets how many mines a bounded board has, without going through every chunk
+        Every chunk with the same size on the board has the same number of mines, so only the
+        chunks along the right and bottom edges and those with safe cells need counting on their own.
+        :return: An int, or None if the board is unbounded
+        """
+        if self.width is None or self.height is None:
+            return None
+        size = self.chunk_size
+        (columns, rows) = (-(-self.width // size), -(-self.height // size))
+        if columns * rows == 0:
+            return 0
+        # How many chunks are each width and each height, only the last column and row can be narrower
+        widths = collections.Counter({size: columns - 1})
+        heights = collections.Counter({size: rows - 1})
+        widths[self.width - (columns - 1) * size] += 1
+        heights[self.height - (rows - 1) * size] += 1
+        total = sum(num_columns * num_rows * round(width * height * self.density)
+                    for (width, num_columns) in widths.items() for (height, num_rows) in heights.items())
+        safe_chunks = {self.get_chunk(coord)[0] for coord in self._get_safe_cells() if self.in_bounds(coord)}
+        for chunk in safe_chunks:
+            (width, height) = self.get_chunk_size(chunk)
+            total += self.count_chunk_mines(chunk) - round(width * height * self.density)
+        return total
+
+    def get_mines(self, chunk):
+        """ Gets a chunk's mines, generating them if they aren't cached
+        :param chunk: A tuple of the chunk's coord
+        :return: A bytearray with a 1 for each mine, indexed like get_chunk
+        """
+        mines = self._get_cached(self._mines, chunk)
+        if mines is None:
+            # A string seed is hashed the same way in every process, unlike a tuple
+            rng = random.Random("{}:{}:{}".format(self.seed, chunk[0], chunk[1]))
+            mines = bytearray(self.chunk_size * self.chunk_size)
+            for i in rng.sample(self.get_chunk_cells(chunk), self.count_chunk_mines(chunk)):
+                mines[i] = 1
+            self._put_cached(self._mines, chunk, mines)
+        return mines
+
+    def get_values(self, chunk):
+        """ Gets the character code of the value of each of a chunk's cells, generating them if they aren't cached
+        The numbers on a chunk's edges count the mines in the chunks around it.
+        :param chunk: A tuple of the chunk's coord
+        :return: A bytearray indexed like get_chunk
+        """
+        values = self._get_cached(self._values, chunk)
+        if values is None:
+            size = self.chunk_size
+            stride = size + 2
+            (chunk_x, chunk_y) = chunk
+
+            # The chunk's mines with a border of one cell taken from the chunks around it
+            padded = bytearray(stride * stride)
+            mines = self.get_mines(chunk)
+            for local_y in range(size):
+                start = (local_y + 1) * stride + 1
+                padded[start:start + size] = mines[local_y * size:(local_y + 1) * size]
+            above = self.get_mines((chunk_x, chunk_y - 1))
+            padded[1:size + 1] = above[(size - 1) * size:]
+            below = self.get_mines((chunk_x, chunk_y + 1))
+            padded[(size + 1) * stride + 1:(size + 1) * stride + size + 1] = below[:size]
+            left = self.get_mines((chunk_x - 1, chunk_y))
+            right = self.get_mines((chunk_x + 1, chunk_y))
+            for local_y in range(size):
+                padded[(local_y + 1) * stride] = left[local_y * size + size - 1]
+                padded[(local_y + 1) * stride + size + 1] = right[local_y * size]
+            padded[0] = self.get_mines((chunk_x - 1, chunk_y - 1))[-1]
+            padded[size + 1] = self.get_mines((chunk_x + 1, chunk_y - 1))[(size - 1) * size]
+            padded[(size + 1) * stride] = self.get_mines((chunk_x - 1, chunk_y + 1))[size - 1]
+            padded[-1] = self.get_mines((chunk_x + 1, chunk_y + 1))[0]
+
+            values = bytearray(b'0') * (size * size)
+            bomb = ord('X')
+            offsets = [delta_y * stride + delta_x for (delta_x, delta_y) in minesweeper.DIRECTIONS]
+            for local_y in range(size):
+                for local_x in range(size):
+                    center = (local_y + 1) * stride + local_x + 1
+                    if padded[center]:
+                        values[local_y * size + local_x] = bomb
+                    else:
+                        values[local_y * size + local_x] += sum(padded[center + offset] for offset in offsets)
+            self._put_cached(self._values, chunk, values)
+        return values
+
+    def _get_cached(self, cache, chunk):
+        result = cache.get(chunk)
+        if result is not None:
+            cache.move_to_end(chunk)
+        return result
+
+    def _put_cached(self, cache, chunk, result):
+        cache[chunk] = result
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def get_value(self, coord):
+        """ Gets the value of a cell
+        :return: A Char, 'X' for a mine or the number of mines around it
+        """
+        (chunk, i) = self.get_chunk(coord)
+        return chr(self.get_values(chunk)[i])
+
+    def get_state(self, coord):
+        """ Gets the VISIBLE and FLAGGED bits of a cell
+        :return: An int
+        """
+        (chunk, i) = self.get_chunk(coord)
+        states = self._states.get(chunk)
+        return states[i] if states is not None else 0
+
+    def set_state(self, coord, state):
+        (chunk, i) = self.get_chunk(coord)
+        states = self._states.get(chunk)
+        if states is None:
+            states = self._states[chunk] = bytearray(self.chunk_size * self.chunk_size)
+        states[i] = state
+
+    def get_cell(self, coord):
+        """ Gets a copy of a cell
+        :return: A cell Dictionary
+        """
+        state = self.get_state(coord)
+        return minesweeper.create_cell(bool(state & minesweeper.VISIBLE), bool(state & minesweeper.FLAGGED),
+                                       self.get_value(coord))
+
+    def get_window(self, x, y, width, height):
+        """ Gets a rectangle of cells, like a board
+        :return: 2D Array of Dictionaries
+        """
+        return [[self.get_cell((cell_x, cell_y)) for cell_x in range(x, x + width)] for cell_y in range(y, y + height)]
+
+    def window_to_string(self, x, y, width, height):
+        """ Generates a string from a rectangle of the board, like board_to_string
+        :return: A String
+        """
+        return minesweeper.board_to_string(self.get_window(x, y, width, height))
+
+    @property
+    def explored_chunks(self):
+        """ How many chunks have been played on """
+        return len(self._states)
+
+
+class ChunkedGame:
+    """
+    A game on a ChunkedBoard that each move changes in place, with the same moves as Game.
+    Reveals flood fill across chunk boundaries, and the running counts are kept like a game
+    dictionary's. An unbounded game can be lost but never won.
+    A flood fill that reaches max_reveal stops with its frontier kept, and state["cut_short"] set,
+    until resume is called or a cell on the frontier is revealed again, which carries it on.
+    """
+
+    def __init__(self, board, max_reveal=DEFAULT_MAX_REVEAL):
+        """
+        :param board: A ChunkedBoard
+        :param max_reveal: The most cells a single flood fill reveals
+        """
+        self.board = board
+        self.max_reveal = max_reveal
+        self.state = {
+            "board_width": board.width,
+            "board_height": board.height,
+            "visible_bombs": 0,
+            "visible_non_bombs": 0,
+            "game_over": False,
+            "is_win": False,
+            "cut_short": False
+        }
+        self._total_bombs = None
+        # The revealed cells a flood fill that was cut short still has to expand from, in order
+        self._frontier = collections.deque()
+        self._frontier_cells = set()
+
+    def __getitem__(self, key):
+        if key == "total_bombs":
+            return self.total_bombs
+        return self.state[key]
+
+    @property
+    def total_bombs(self):
+        """ How many mines a bounded board has, or None if it's unbounded """
+        if self._total_bombs is None:
+            self._total_bombs = self.board.count_mines()
+        return self._total_bombs
+
+    def reveal(self, x, y):
+        """ Reveals a cell, flood filling from hidden 0 cells
+        Revealing a cell on the frontier of a flood fill that was cut short carries that flood fill on.
+        :return: A list of the coords that were revealed
+        """
+        if (x, y) in self._frontier_cells:
+            return self.resume()
+        return self._flood_fill([(x, y)])
+
+    def resume(self):
+        """ Carries on a flood fill that was cut short at max_reveal, for up to max_reveal more cells
+        :return: A list of the coords that were revealed
+        """
+        return self._flood_fill([], self._frontier)
+
+    def flag(self, x, y):
+        """ Toggles the flag on a cell
+        :return: A list of the coords that were changed
+        """
+        if not self.board.in_bounds((x, y)):
+            return []
+        self.board.set_state((x, y), self.board.get_state((x, y)) ^ minesweeper.FLAGGED)
+        return [(x, y)]
+
+    def chord(self, x, y):
+        """ Reveals the unflagged neighbors of a number that has as many flagged neighbors
+        :return: A list of the coords that were revealed
+        """
+        board = self.board
+        if not board.in_bounds((x, y)) or not board.get_state((x, y)) & minesweeper.VISIBLE:
+            return []
+        value = board.get_value((x, y))
+        if not '1' <= value <= '8':
+            return []
+        neighbors = [(x + delta_x, y + delta_y) for (delta_x, delta_y) in minesweeper.DIRECTIONS
+                     if board.in_bounds((x + delta_x, y + delta_y))]
+        flags = sum(1 for coord in neighbors if board.get_state(coord) & minesweeper.FLAGGED)
+        if flags != int(value):
+            return []
+        return self._flood_fill(neighbors)
+
+    def play(self, action, coord):
+        """ Performs an action the same way Game.play does
+        :param action: An action to perform (the string "LEFT_CLICK", "RIGHT_CLICK" or "CHORD")
+        :param coord: A location to perform the action
+        :return: A list of the coords that were changed
+        """
+        (x, y) = coord
+        if action == "LEFT_CLICK":
+            return self.reveal(x, y)
+        elif action == "RIGHT_CLICK":
+            return self.flag(x, y)
+        elif action == "CHORD":
+            return self.chord(x, y)
+        return []
+
+    def _flood_fill(self, coords, frontier=()):
+        """ Reveals cells, flood filling outward from hidden 0 cells
+        :param coords: The coords to reveal
+        :param frontier: Revealed cells to carry on expanding from, after the coords
+        :return: A list of the coords that were revealed
+        """
+        board = self.board
+        # Cells are revealed as they're pushed, so no cell is pushed twice
+        revealed = []
+        for coord in coords:
+            if board.in_bounds(coord) and not board.get_state(coord):
+                board.set_state(coord, minesweeper.VISIBLE)
+                revealed.append(coord)
+        # Breadth first, so the revealed area grows outward as a blob and touches as few chunks as it can
+        queue = collections.deque(revealed)
+        queue.extend(frontier)
+        if frontier is self._frontier:
+            self._frontier = collections.deque()
+            self._frontier_cells = set()
+        while queue and len(revealed) < self.max_reveal:
+            (x, y) = queue.popleft()
+            if board.get_value((x, y)) != '0':
+                continue
+            for (delta_x, delta_y) in minesweeper.DIRECTIONS:
+                neighbor = (x + delta_x, y + delta_y)
+                if board.in_bounds(neighbor) and not board.get_state(neighbor):
+                    board.set_state(neighbor, minesweeper.VISIBLE)
+                    revealed.append(neighbor)
+                    queue.append(neighbor)
+        # Whatever's left to expand from is kept, so the flood can be carried on later
+        queue = [coord for coord in queue if board.get_value(coord) == '0']
+        self._frontier.extend(queue)
+        self._frontier_cells.update(queue)
+        self.state["cut_short"] = bool(self._frontier)
+
+        for coord in revealed:
+            if board.get_value(coord) == 'X':
+                self.state["visible_bombs"] += 1
+            else:
+                self.state["visible_non_bombs"] += 1
+        if self.state["visible_bombs"] > 0:
+            (self.state["game_over"], self.state["is_win"]) = (True, False)
+        elif self.total_bombs is not None:
+            counts = {"total_bombs": self.total_bombs, "visible_bombs": 0,
+                      "visible_non_bombs": self.state["visible_non_bombs"]}
+            (self.state["game_over"], self.state["is_win"]) = minesweeper.get_result(
+                counts, board.width * board.height)
+        return revealed
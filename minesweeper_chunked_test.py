@@ -0,0 +1,77 @@
+import random
+from minesweeper import *
+from minesweeper_chunked import *
+
+
+def test_chunked_board():
+    # A bounded chunked board has the same numbers as a regular board with the same mines
+    board = ChunkedBoard(7, 0.15, width=70, height=45, safe_coord=(10, 10), chunk_size=16, cache_size=4)
+    bombs = {(x, y) for y in range(45) for x in range(70) if board.get_value((x, y)) == 'X'}
+    game = create_game(70, 45, bombs)
+    assert board.get_window(0, 0, 70, 45) == game["board"]
+    assert len(bombs) == ChunkedGame(board).total_bombs
+    assert not bombs & {(10, 10), (11, 11), (9, 9)}
+
+    # The total is worked out without visiting every chunk, and agrees with counting each one
+    for (width, height, safe_coord) in [(70, 45, (15, 16)), (64, 32, (0, 0)), (1, 100, None), (33, 17, (40, 5))]:
+        board = ChunkedBoard(1, 0.17, width=width, height=height, safe_coord=safe_coord, chunk_size=16)
+        assert board.count_mines() == sum(board.count_chunk_mines((chunk_x, chunk_y))
+                                          for chunk_y in range(-(-height // 16)) for chunk_x in range(-(-width // 16)))
+    # Each 32x32 chunk of a huge board has round(1024 * 0.2) mines
+    assert ChunkedBoard(1, 0.2, width=1000000000, height=1000000000).count_mines() == (1000000000 // 32) ** 2 * 205
+    assert ChunkedBoard(1, 0.2).count_mines() is None
+
+    # Chunks are made the same way after they're evicted, and by any other board with the same seed
+    def get_values(chunked_board):
+        return [chunked_board.get_value((x, y)) for y in range(-20, 20) for x in range(-20, 20)]
+    values = get_values(ChunkedBoard("seed", 0.2, chunk_size=8, cache_size=2))
+    assert get_values(ChunkedBoard("seed", 0.2, chunk_size=8)) == values
+    assert get_values(ChunkedBoard("other", 0.2, chunk_size=8)) != values
+
+
+def test_chunked_game():
+    # Every move does the same as it does on a regular game, including floods across chunks
+    board = ChunkedBoard(3, 0.1, width=50, height=40, safe_coord=(25, 20), chunk_size=8, cache_size=8)
+    bombs = {(x, y) for y in range(40) for x in range(50) if board.get_value((x, y)) == 'X'}
+    chunked_game = ChunkedGame(board)
+    game = Game(create_game(50, 40, bombs))
+    rng = random.Random(1)
+    moves = [('LEFT_CLICK', (25, 20))] + [(rng.choice(['LEFT_CLICK', 'RIGHT_CLICK', 'CHORD']),
+                                           (rng.randrange(-1, 51), rng.randrange(40))) for _ in range(200)]
+    for (action, coord) in moves:
+        if game["game_over"]:
+            break
+        assert sorted(chunked_game.play(action, coord)) == sorted(game.play(action, coord))
+        for key in ["visible_bombs", "visible_non_bombs", "game_over", "is_win"]:
+            assert chunked_game[key] == game[key]
+    assert board.window_to_string(0, 0, 50, 40) == board_to_string(game["board"])
+
+    # An unbounded board only keeps state for the chunks that were played on
+    board = ChunkedBoard(5, 0.2, safe_coord=(1000000, -1000000))
+    game = ChunkedGame(board)
+    revealed = game.reveal(1000000, -1000000)
+    assert len(revealed) >= 9 and board.explored_chunks <= 4
+    assert game["total_bombs"] is None and not game["game_over"]
+
+    # Floods stop at max_reveal, and say so
+    game = ChunkedGame(ChunkedBoard(5, 0.01, safe_coord=(0, 0)), max_reveal=500)
+    assert 500 <= len(game.reveal(0, 0)) < 508 and game["cut_short"]
+
+    # A flood that was cut short carries on from where it stopped, until it's revealed what a whole flood would
+    board = ChunkedBoard(2, 0.02, width=60, height=50, safe_coord=(30, 25), chunk_size=16)
+    bombs = {(x, y) for y in range(50) for x in range(60) if board.get_value((x, y)) == 'X'}
+    full = Game(create_game(60, 50, bombs))
+    expected = full.reveal(30, 25)
+    game = ChunkedGame(board, max_reveal=300)
+    revealed = game.reveal(30, 25)
+    assert len(revealed) < len(expected) and game["cut_short"]
+    # Revealing a 0 on the edge of the flood again carries it on
+    (x, y) = next((x, y) for (x, y) in revealed if board.get_value((x, y)) == '0' and any(
+        board.in_bounds((x + delta_x, y + delta_y)) and not board.get_state((x + delta_x, y + delta_y))
+        for (delta_x, delta_y) in DIRECTIONS))
+    revealed += game.reveal(x, y)
+    while game["cut_short"]:
+        revealed += game.resume()
+    assert sorted(revealed) == sorted(expected)
+    assert game["visible_non_bombs"] == full["visible_non_bombs"] and game["is_win"] == full["is_win"]
+    assert game.resume() == []
@@ -0,0 +1,195 @@
+import numpy as np
+import minesweeper
+import minesweeper_vector
+
+# What an observation shows for cells that aren't numbers
+OBS_HIDDEN = -1
+OBS_FLAGGED = -2
+OBS_MINE = 9
+
+
+class MinesweeperEnv:
+    """
+    A reinforcement learning environment around a Game, with reset(seed) and step(action) like Gym.
+    An action is an int, below width * height it reveals the cell at that index (y * width + x),
+    and the next width * height flag or unflag a cell.
+    The observation is a (height, width) int8 array of the numbers on the visible cells, OBS_HIDDEN,
+    OBS_FLAGGED or OBS_MINE, and the action mask is a Boolean array of the actions that change something.
+    Both are the same arrays every step, and each step only writes the cells its move changed.
+    """
+
+    def __init__(self, board_width, board_height, num_bombs,
+                 win_reward=1.0, lose_reward=-1.0, progress_reward=1.0, invalid_reward=-0.1):
+        """
+        :param board_width:
+        :param board_height:
+        :param num_bombs:
+        :param win_reward: Added when a move wins
+        :param lose_reward: Added when a move reveals a bomb
+        :param progress_reward: Shared out between the safe cells, so revealing every one adds up to this
+        :param invalid_reward: For actions the action mask rules out, which don't change anything
+        """
+        self.board_width = board_width
+        self.board_height = board_height
+        self.num_bombs = num_bombs
+        self.win_reward = win_reward
+        self.lose_reward = lose_reward
+        self.progress_reward = progress_reward
+        self.invalid_reward = invalid_reward
+        self.num_actions = 2 * board_width * board_height
+        self.observation = np.full((board_height, board_width), OBS_HIDDEN, dtype=np.int8)
+        self.action_mask = np.ones(self.num_actions, dtype=bool)
+        # Views of the action mask by cell
+        self.reveal_mask = self.action_mask[:self.num_actions // 2].reshape(board_height, board_width)
+        self.flag_mask = self.action_mask[self.num_actions // 2:].reshape(board_height, board_width)
+        self.game = None
+
+    def reset(self, seed=None):
+        """ Starts a new game
+        :param seed: A seed or a random.Random for the bombs
+        :return: A tuple of the observation and an info Dictionary with the "action_mask"
+        """
+        bombs = minesweeper.create_bomb_set(self.board_width, self.board_height, self.num_bombs, seed=seed)
+        self.game = minesweeper.Game(minesweeper.create_game(self.board_width, self.board_height, bombs))
+        self.observation.fill(OBS_HIDDEN)
+        self.action_mask.fill(True)
+        return self.observation, {"action_mask": self.action_mask}
+
+    def get_move(self, action):
+        """ Translates an action into a move like get_next_game takes
+        :return: A Dictionary with the "action" and "coord" of the move
+        """
+        (kind, cell) = divmod(int(action), self.board_width * self.board_height)
+        (y, x) = divmod(cell, self.board_width)
+        return {"action": "RIGHT_CLICK" if kind else "LEFT_CLICK", "coord": (x, y)}
+
+    def step(self, action):
+        """ Plays one action
+        :param action: An int below num_actions
+        :return: A tuple of the observation, the reward, whether the game is over, whether it was
+            cut short (never), and an info Dictionary with the "action_mask"
+        """
+        if self.game is None or self.game["game_over"]:
+            raise ValueError("The game is over, call reset to start a new one")
+        if not self.action_mask[action]:
+            return self.observation, self.invalid_reward, False, False, {"action_mask": self.action_mask}
+
+        move = self.get_move(action)
+        (x, y) = move["coord"]
+        reward = 0.0
+        if move["action"] == "LEFT_CLICK":
+            changed = self.game.reveal(x, y)
+            self.update_cells(changed)
+            safe_cells = self.board_width * self.board_height - self.game["total_bombs"]
+            safe_revealed = len(changed) - self.game["visible_bombs"]
+            reward += self.progress_reward * safe_revealed / safe_cells
+            if self.game["is_win"]:
+                reward += self.win_reward
+            elif self.game["game_over"]:
+                reward += self.lose_reward
+        else:
+            self.update_cells(self.game.flag(x, y))
+        return self.observation, reward, self.game["game_over"], False, {"action_mask": self.action_mask}
+
+    def update_cells(self, coords):
+        """ Copies cells from the game into the observation and action mask
+        :param coords: The coords that changed
+        """
+        board = self.game["board"]
+        for (x, y) in coords:
+            state = board.state_rows[y][x]
+            if state & minesweeper.VISIBLE:
+                value = board.values[y * self.board_width + x]
+                self.observation[y, x] = OBS_MINE if value == ord('X') else value - ord('0')
+            else:
+                self.observation[y, x] = OBS_FLAGGED if state & minesweeper.FLAGGED else OBS_HIDDEN
+            self.reveal_mask[y, x] = not state
+            self.flag_mask[y, x] = not state & minesweeper.VISIBLE
+
+
+class MinesweeperVectorEnv:
+    """
+    Many environments like MinesweeperEnv stepped together on a BoardBatch.
+    Observations are a (num_envs, height, width) array and action masks a (num_envs, num_actions)
+    array, both updated in place. An environment whose game ends starts a new one straight away,
+    so the observation returned for it is of the new board, while the reward and terminated are
+    for the move that ended the old one.
+    """
+
+    def __init__(self, num_envs, board_width, board_height, num_bombs,
+                 win_reward=1.0, lose_reward=-1.0, progress_reward=1.0, invalid_reward=-0.1):
+        self.num_envs = num_envs
+        self.board_width = board_width
+        self.board_height = board_height
+        self.num_bombs = num_bombs
+        self.win_reward = win_reward
+        self.lose_reward = lose_reward
+        self.progress_reward = progress_reward
+        self.invalid_reward = invalid_reward
+        cells = board_width * board_height
+        self.num_actions = 2 * cells
+        self.observations = np.full((num_envs, board_height, board_width), OBS_HIDDEN, dtype=np.int8)
+        self.action_masks = np.ones((num_envs, self.num_actions), dtype=bool)
+        self.reveal_masks = self.action_masks[:, :cells].reshape(num_envs, board_height, board_width)
+        self.flag_masks = self.action_masks[:, cells:].reshape(num_envs, board_height, board_width)
+        # What each cell shows once it's visible
+        self._cell_values = np.zeros((num_envs, board_height, board_width), dtype=np.int8)
+        self.batch = None
+        self.rng = None
+
+    def reset(self, seed=None):
+        """ Starts a new game in every environment
+        :param seed: A seed or a numpy.random.Generator for the bombs of this and every later game
+        :return: A tuple of the observations and an info Dictionary with the "action_masks"
+        """
+        self.rng = np.random.default_rng(seed)
+        self.batch = minesweeper_vector.BoardBatch.create(
+            self.num_envs, self.board_width, self.board_height, self.num_bombs, self.rng)
+        self._set_cell_values(np.arange(self.num_envs))
+        self._update_views()
+        return self.observations, {"action_masks": self.action_masks}
+
+    def step(self, actions):
+        """ Plays one action in every environment
+        :param actions: An array of one int below num_actions per environment
+        :return: A tuple of the observations, an array of rewards, an array of whether each game
+            ended, an array of whether each was cut short (never), and an info Dictionary with the "action_masks"
+        """
+        actions = np.asarray(actions)
+        envs = np.arange(self.num_envs)
+        (kinds, cells) = np.divmod(actions, self.board_width * self.board_height)
+        (ys, xs) = np.divmod(cells, self.board_width)
+        valid = self.action_masks[envs, actions]
+        moves = np.where(valid, np.where(kinds == 0, minesweeper_vector.REVEAL, minesweeper_vector.FLAG),
+                         minesweeper_vector.NOTHING)
+
+        batch = self.batch
+        revealed = batch.step(moves, xs, ys)
+        lost = batch.game_over & ~batch.is_win
+        safe_cells = self.board_width * self.board_height - batch.total_bombs
+        rewards = self.progress_reward * (revealed - lost) / safe_cells
+        rewards += np.where(batch.is_win, self.win_reward, 0.0) + np.where(lost, self.lose_reward, 0.0)
+        rewards += np.where(valid, 0.0, self.invalid_reward)
+        terminated = batch.game_over.copy()
+
+        finished = np.flatnonzero(terminated)
+        if len(finished):
+            batch.reset(finished, batch.create_mines(
+                len(finished), self.board_width, self.board_height, self.num_bombs, self.rng))
+            self._set_cell_values(finished)
+        self._update_views()
+        return self.observations, rewards, terminated, np.zeros(self.num_envs, dtype=bool), \
+            {"action_masks": self.action_masks}
+
+    def _set_cell_values(self, indexes):
+        self._cell_values[indexes] = np.where(self.batch.mines[indexes], OBS_MINE, self.batch.numbers[indexes])
+
+    def _update_views(self):
+        """ Rewrites the observations and action masks in place from the batch """
+        batch = self.batch
+        self.observations.fill(OBS_HIDDEN)
+        np.copyto(self.observations, OBS_FLAGGED, where=batch.flagged)
+        np.copyto(self.observations, self._cell_values, where=batch.visible)
+        np.logical_or(batch.visible, batch.flagged, out=self.reveal_masks)
+        np.logical_not(self.reveal_masks, out=self.reveal_masks)
+        np.logical_not(batch.visible, out=self.flag_masks)
@@ -0,0 +1,88 @@
+import numpy as np
+from minesweeper import *
+from minesweeper_env import *
+
+
+def test_env():
+    env = MinesweeperEnv(6, 5, 2)
+    (observation, info) = env.reset(seed=3)
+    assert observation.shape == (5, 6) and (observation == OBS_HIDDEN).all()
+    assert info["action_mask"].shape == (60,) and info["action_mask"].all()
+
+    # Replace the game with a known one
+    # 000000
+    # 011100
+    # 01X210
+    # 012X10
+    # 001110
+    env.game = Game(create_game(6, 5, {(2, 2), (3, 3)}))
+    (observation, reward, terminated, truncated, info) = env.step(1 * 6 + 3)
+    assert env.get_move(9) == {"action": "LEFT_CLICK", "coord": (3, 1)}
+    assert env.get_move(30 + 9) == {"action": "RIGHT_CLICK", "coord": (3, 1)}
+    assert observation[1, 3] == 1 and (observation == OBS_HIDDEN).sum() == 29
+    assert reward == 1 / 28 and not terminated and not truncated
+
+    # The observation and mask are the same arrays every step, and match the board
+    (next_observation, reward, terminated, _, next_info) = env.step(0)
+    assert next_observation is observation and next_info["action_mask"] is info["action_mask"]
+    board = env.game["board"]
+    assert reward == 26 / 28
+    for y in range(5):
+        for x in range(6):
+            cell = board[y][x]
+            expected = int(cell["value"]) if cell["visible"] else OBS_HIDDEN
+            assert observation[y, x] == expected
+            assert info["action_mask"][y * 6 + x] == (not cell["visible"])
+
+    # Flags show in the observation and block revealing
+    (observation, reward, _, _, info) = env.step(30 + 2 * 6 + 2)
+    assert observation[2, 2] == OBS_FLAGGED and reward == 0.0 and not info["action_mask"][2 * 6 + 2]
+    (observation, reward, terminated, _, _) = env.step(2 * 6 + 2)
+    assert reward == env.invalid_reward and not terminated
+
+    # Revealing the last safe cell wins
+    (observation, reward, terminated, _, _) = env.step(4 * 6 + 3)
+    assert terminated and env.game["is_win"] and reward == 1 / 28 + env.win_reward
+
+    env = MinesweeperEnv(2, 1, 1)
+    env.reset()
+    env.game = Game(create_game(2, 1, {(0, 0)}))
+    (observation, reward, terminated, _, _) = env.step(0)
+    assert terminated and observation[0, 0] == OBS_MINE and reward == env.lose_reward
+
+
+def test_vector_env():
+    env = MinesweeperVectorEnv(64, 8, 8, 10)
+    (observations, info) = env.reset(seed=1)
+    masks = info["action_masks"]
+    assert observations.shape == (64, 8, 8) and masks.shape == (64, 128)
+    assert np.shares_memory(env.reveal_masks, masks) and np.shares_memory(env.flag_masks, masks)
+
+    rng = np.random.default_rng(2)
+    finished = 0
+    for _ in range(30):
+        # Play a random legal action in every environment
+        actions = [rng.choice(np.flatnonzero(mask)) for mask in masks]
+        (next_observations, rewards, terminated, truncated, next_info) = env.step(actions)
+        assert next_observations is observations and next_info["action_masks"] is masks
+        assert not truncated.any() and (rewards >= env.lose_reward).all()
+        finished += terminated.sum()
+
+        batch = env.batch
+        hidden = ~batch.visible & ~batch.flagged
+        assert ((observations == OBS_HIDDEN) == hidden).all()
+        assert ((observations == OBS_FLAGGED) == (batch.flagged & ~batch.visible)).all()
+        assert (observations[batch.visible] == np.where(batch.mines, OBS_MINE, batch.numbers)[batch.visible]).all()
+        assert (env.reveal_masks == hidden).all() and (env.flag_masks == ~batch.visible).all()
+        # Finished games were replaced with new ones
+        assert not batch.game_over.any()
+    assert finished > 0
+
+    # Actions the mask rules out don't change anything
+    actions = np.argmin(masks, axis=1)
+    ruled_out = ~masks[np.arange(64), actions]
+    before = observations.copy()
+    (_, rewards, _, _, _) = env.step(actions)
+    assert ruled_out.any()
+    assert (rewards[ruled_out] == env.invalid_reward).all()
+    assert (observations[ruled_out] == before[ruled_out]).all()
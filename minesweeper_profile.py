@@ -0,0 +1,285 @@
+import collections
+import contextlib
+import copy
+import functools
+import math
+import time
+import minesweeper
+
+
+def _changed_cells(args, result):
+    return len(result)
+
+
+def _board_cells(args, result):
+    board = args[0]
+    return len(board) * len(board[0])
+
+
+def _updated_cells(args, result):
+    return len(args[1])
+
+
+# The engine's phases as (owner, attribute, cells), where cells works out how many cells a call
+# visited from its arguments and result
+ENGINE_PHASES = [
+    (minesweeper, "create_game", None),
+    (minesweeper, "get_next_game", None),
+    (minesweeper, "get_next_board", None),
+    (minesweeper, "update_board", None),
+    (minesweeper, "reveal_on_board", _changed_cells),
+    (minesweeper, "chord_on_board", _changed_cells),
+    (minesweeper, "flag_on_board", _changed_cells),
+    (minesweeper, "count_board", _board_cells),
+    (minesweeper, "is_board_over", None),
+    (minesweeper, "_update_result", _updated_cells),
+    (minesweeper, "board_to_string", _board_cells),
+    (minesweeper.Board, "copy", None),
+    (minesweeper.Game, "__init__", None),
+    (minesweeper.Game, "play", None)
+]
+
+# The functions that copy boards: Board.copy for packed boards, and copy.deepcopy, which the engine
+# uses for any board and which deep copies boards that are lists. While profiling, every deep copy
+# counts as a board copy, but the engine doesn't deep copy anything else.
+COPY_FUNCTIONS = [
+    (minesweeper.Board, "copy"),
+    (copy, "deepcopy")
+]
+
+
+class Histogram:
+    """
+    Counts values into power of two buckets, so it takes the same memory however many values it's
+    seen, and its percentiles are upper bounds within a factor of two.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        # Values in [2 ** (exponent - 1), 2 ** exponent) by exponent
+        self.buckets = collections.Counter()
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        self.buckets[math.frexp(value)[1]] += 1
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        """ Estimates a percentile from the buckets
+        :param percent: From 0 to 100
+        :return: The top of the bucket the percentile falls in, or the largest value if that's lower
+        """
+        needed = percent / 100 * self.count
+        seen = 0
+        for exponent in sorted(self.buckets):
+            seen += self.buckets[exponent]
+            if seen >= needed:
+                return min(2.0 ** exponent, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "buckets": {2.0 ** exponent: count for (exponent, count) in sorted(self.buckets.items())}
+        }
+
+
+class PhaseStats:
+    """
+    What one phase has done since the profiler was reset.
+    """
+
+    def __init__(self):
+        # Seconds per call
+        self.seconds = Histogram()
+        self.cells = 0
+        # The board copies made during its calls, including by the phases it called
+        self.copies = 0
+        # The deepest this phase has been called inside other instrumented phases, counting itself
+        self.max_depth = 0
+
+    def to_dict(self):
+        return {
+            "calls": self.seconds.count,
+            "seconds": self.seconds.to_dict(),
+            "cells": self.cells,
+            "copies": self.copies,
+            "max_depth": self.max_depth
+        }
+
+
+class Profiler:
+    """
+    Times phases by swapping functions and methods for wrapped versions, and puts the originals back
+    when it's removed, so code that isn't being profiled runs exactly as it would without it.
+    Wrapping module functions works for calls made from inside the module too, since those look
+    the name up each time, but not for names imported into other modules before instrumenting.
+    """
+
+    def __init__(self):
+        self.phases = collections.defaultdict(PhaseStats)
+        self.depth = 0
+        # How many board copies have been made
+        self.copies = 0
+        self._originals = []
+
+    def _wrap(self, owner, name, make_wrapper):
+        original = owner.__dict__[name] if isinstance(owner, type) else getattr(owner, name)
+        setattr(owner, name, functools.wraps(original)(make_wrapper(original)))
+        self._originals.append((owner, name, original))
+
+    def instrument(self, owner, name, cells=None, phase=None):
+        """ Wraps a function or method to record its calls
+        :param owner: The module or class it belongs to
+        :param name: Its attribute name
+        :param cells: A function from the call's arguments tuple and result to how many cells it visited
+        :param phase: The name to record it under, defaults to the attribute name, after the class for methods
+        """
+        if phase is None:
+            phase = owner.__name__ + "." + name if isinstance(owner, type) else name
+        stats = self.phases[phase]
+        profiler = self
+
+        def make_wrapper(original):
+            def wrapper(*args, **kwargs):
+                profiler.depth += 1
+                if profiler.depth > stats.max_depth:
+                    stats.max_depth = profiler.depth
+                copies = profiler.copies
+                start = time.perf_counter()
+                try:
+                    result = original(*args, **kwargs)
+                finally:
+                    stats.seconds.add(time.perf_counter() - start)
+                    stats.copies += profiler.copies - copies
+                    profiler.depth -= 1
+                if cells is not None:
+                    stats.cells += cells(args, result)
+                return result
+            return wrapper
+
+        self._wrap(owner, name, make_wrapper)
+
+    def instrument_phases(self, phases):
+        """ Wraps a list of (owner, attribute, cells) phases, like ENGINE_PHASES """
+        for (owner, name, cells) in phases:
+            self.instrument(owner, name, cells)
+
+    def count_copies(self, owner, name):
+        """ Wraps a function or method that copies a board, so each phase records the copies made
+        while it runs. A call counts as one copy when it returns, unless it's inside another call to
+        the same function, like deepcopy copying each row of a list board, or another copy was
+        counted during it, like a Board's __deepcopy__ calling its copy method.
+        Wrap these before the phases, so a phase that is a copy function sees its own copies.
+        :param owner: The module or class it belongs to
+        :param name: Its attribute name
+        """
+        profiler = self
+
+        def make_wrapper(original):
+            depth = [0]
+
+            def wrapper(*args, **kwargs):
+                copies = profiler.copies
+                depth[0] += 1
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    depth[0] -= 1
+                    if depth[0] == 0 and profiler.copies == copies:
+                        profiler.copies += 1
+            return wrapper
+
+        self._wrap(owner, name, make_wrapper)
+
+    def remove(self):
+        """ Puts back everything that was wrapped """
+        for (owner, name, original) in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals = []
+
+    def reset(self):
+        """ Forgets everything recorded so far, while leaving the phases wrapped """
+        for stats in self.phases.values():
+            stats.__init__()
+        self.copies = 0
+
+    def get_stats(self):
+        """ Gets everything recorded so far
+        :return: A Dictionary from each phase called at least once to its stats as a Dictionary
+        """
+        return {phase: stats.to_dict() for (phase, stats) in self.phases.items() if stats.seconds.count}
+
+    def get_summary(self, limit=None):
+        """ Describes the phases that took the most time, a line each
+        :param limit: How many phases to describe, defaults to all of them
+        :return: A list of Strings
+        """
+        phases = sorted((stats.seconds.total, phase, stats) for (phase, stats) in self.phases.items()
+                        if stats.seconds.count)
+        lines = []
+        for (total, phase, stats) in reversed(phases[-limit if limit else 0:]):
+            lines.append("{} x{} mean {:.3f}ms p99 {:.3f}ms cells {} copies {} depth {}".format(
+                phase, stats.seconds.count, 1000 * stats.seconds.mean, 1000 * stats.seconds.percentile(99),
+                stats.cells, stats.copies, stats.max_depth))
+        return lines
+
+
+_profiler = None
+
+
+def enable():
+    """ Starts profiling the engine, until disable is called
+    :return: The Profiler, which more phases can be added to
+    """
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler()
+        for (owner, name) in COPY_FUNCTIONS:
+            _profiler.count_copies(owner, name)
+        _profiler.instrument_phases(ENGINE_PHASES)
+    return _profiler
+
+
+def disable():
+    """ Stops profiling, putting back every function that was wrapped
+    :return: The Profiler that was running, to read its stats from, or None
+    """
+    global _profiler
+    profiler = _profiler
+    if profiler is not None:
+        profiler.remove()
+        _profiler = None
+    return profiler
+
+
+def get_profiler():
+    """
+    :return: The Profiler that's running, or None when profiling is off
+    """
+    return _profiler
+
+
+@contextlib.contextmanager
+def profile():
+    """ Profiles the engine for the length of a with block
+    :return: The Profiler
+    """
+    profiler = enable()
+    try:
+        yield profiler
+    finally:
+        disable()
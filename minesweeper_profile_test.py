@@ -0,0 +1,51 @@
+import copy
+import minesweeper
+from minesweeper_profile import *
+
+
+def test_profile():
+    original = minesweeper.get_next_game
+    game = minesweeper.create_game(10, 10, {(9, 9)})
+    with profile() as profiler:
+        assert get_profiler() is profiler and minesweeper.get_next_game is not original
+        game = minesweeper.get_next_game(game, "LEFT_CLICK", (0, 0))
+        assert minesweeper.is_board_over(game["board"]) == (True, True)
+        stats = profiler.get_stats()
+
+    # The reveal is nested inside update_board inside get_next_game
+    assert stats["get_next_game"]["calls"] == 1 and stats["get_next_game"]["copies"] == 1
+    assert stats["Board.copy"]["copies"] == 1
+    assert stats["reveal_on_board"]["cells"] == 99 and stats["reveal_on_board"]["max_depth"] == 3
+    assert stats["_update_result"]["cells"] == 99
+    assert stats["count_board"]["cells"] == 100 and stats["count_board"]["max_depth"] == 2
+    assert "flag_on_board" not in stats
+    assert profiler.get_summary(2)[0].startswith("get_next_game x1")
+    assert len(profiler.get_summary()) == len(stats)
+
+    # Copies are counted as they're made, once each, and a board that's a list is deep copied
+    with profile() as profiler:
+        board = minesweeper.get_next_board(minesweeper.create_board(3, 3).to_list(), "RIGHT_CLICK", (0, 0))
+        minesweeper.Game(minesweeper.create_game(3, 3, set())).play("RIGHT_CLICK", (1, 1))
+        stats = profiler.get_stats()
+    assert board[0][0]["flagged"] and profiler.copies == 4
+    assert stats["get_next_board"]["copies"] == 1 and stats["update_board"]["copies"] == 0
+    # Placing the bombs and then the numbers copies the board twice
+    assert stats["create_game"]["copies"] == 2 and stats["Game.__init__"]["copies"] == 1
+    assert stats["Board.copy"]["copies"] == 3
+    assert stats["Game.play"]["copies"] == 0
+
+    # Once it's off every function is back the way it was, so nothing pays for it
+    assert get_profiler() is None and minesweeper.get_next_game is original
+    assert not hasattr(minesweeper.Board.copy, "__wrapped__") and not hasattr(minesweeper.Game.play, "__wrapped__")
+    assert not hasattr(copy.deepcopy, "__wrapped__")
+
+
+def test_histogram():
+    histogram = Histogram()
+    for value in [0.001] * 98 + [0.5, 3.0]:
+        histogram.add(value)
+    assert histogram.count == 100 and histogram.max == 3.0
+    assert 0.001 <= histogram.percentile(50) <= 0.002
+    assert 0.5 <= histogram.percentile(99) <= 1.0
+    assert histogram.percentile(100) == 3.0
+    assert sum(histogram.to_dict()["buckets"].values()) == 100
@@ -0,0 +1,276 @@
+import mmap
+import struct
+import minesweeper
+
+# A game file is a header, then one bit per cell for the mines, then two bits per cell for the
+# VISIBLE and FLAGGED state, cells in row order and the lowest bits first
+GAME_MAGIC = b"MSWG"
+# A replay file is a header, then one record per move
+REPLAY_MAGIC = b"MSWR"
+VERSION = 1
+# Version 2 replays keep the safe coord and allow moves off the board
+REPLAY_VERSION = 2
+
+GAME_HEADER = struct.Struct("<4sBBxxIIqIII")
+REPLAY_HEADER = struct.Struct("<4sBBxxIIIqiiI")
+# Coords are signed, since moves off the board are allowed and change nothing
+MOVE = struct.Struct("<Bii")
+
+# The headers' flags
+HAS_SEED = 1
+HAS_SAFE_COORD = 2
+
+# Seeds are stored as signed 64 bit ints
+MIN_SEED = -2 ** 63
+MAX_SEED = 2 ** 63 - 1
+
+ACTION_CODES = {
+    "LEFT_CLICK": 0,
+    "RIGHT_CLICK": 1,
+    "CHORD": 2
+}
+ACTIONS = {code: action for (action, code) in ACTION_CODES.items()}
+
+_TO_DIGITS = bytes.maketrans(b"\x00\x01\x02\x03", b"0123")
+_FROM_DIGITS = bytes.maketrans(b"0123", b"\x00\x01\x02\x03")
+_MINE_DIGITS = bytes.maketrans(b"012345678X", b"0000000001")
+_VALUES_FROM_DIGITS = bytes.maketrans(b"1", b"X")
+
+
+def _pack(digits, base, num_bytes):
+    """ Packs a string of digits into bytes, the first digit in the lowest bits
+    Going through an int keeps the work in C, which is linear for power of two bases.
+    :param digits: Bytes of ASCII digits
+    :param base: 2 or 4
+    :param num_bytes: The length of the result
+    :return: bytes
+    """
+    if not digits:
+        return bytes(num_bytes)
+    return int(digits[::-1], base).to_bytes(num_bytes, "little")
+
+
+def _unpack_bits(data, num_bits):
+    """ Unpacks bytes into one byte, 0 or 1, per bit, the lowest bits first
+    :return: bytes
+    """
+    if not num_bits:
+        return b""
+    digits = format(int.from_bytes(data, "little"), "b").zfill(num_bits)[::-1][:num_bits]
+    return digits.encode().translate(_FROM_DIGITS)
+
+
+def _unpack_pairs(data, num_pairs):
+    """ Unpacks bytes into one byte, 0 to 3, per two bits, the lowest bits first
+    :return: bytes
+    """
+    bits = _unpack_bits(data, 2 * num_pairs)
+    # Every byte of the two ints is 0 or 1, so adding them never carries from one byte to the next
+    low = int.from_bytes(bits[0::2], "little")
+    high = int.from_bytes(bits[1::2], "little")
+    return (low + 2 * high).to_bytes(num_pairs, "little")
+
+
+def _check_seed(seed):
+    if not isinstance(seed, int) or not MIN_SEED <= seed <= MAX_SEED:
+        raise ValueError("Seeds must be ints from " + str(MIN_SEED) + " to " + str(MAX_SEED) + ", not " + repr(seed))
+
+
+def save_game(game, path, seed=None):
+    """ Writes a game to a file
+    :param game: A game dictionary
+    :param path: Where to write it
+    :param seed: The int seed the bombs were made from, if there is one, to keep in the header
+    """
+    if seed is not None:
+        _check_seed(seed)
+    board = game["board"]
+    if not isinstance(board, minesweeper.Board):
+        board = minesweeper.Board.from_list(board)
+    cells = board.width * board.height
+
+    mine_digits = bytes(board.values).translate(_MINE_DIGITS)
+    state_digits = b"".join(board.state_rows).translate(_TO_DIGITS)
+    header = GAME_HEADER.pack(GAME_MAGIC, VERSION, HAS_SEED if seed is not None else 0, board.width,
+                              board.height, seed or 0, game["total_bombs"], game["visible_bombs"],
+                              game["visible_non_bombs"])
+    with open(path, "wb") as file:
+        file.write(header)
+        file.write(_pack(mine_digits, 2, (cells + 7) // 8))
+        file.write(_pack(state_digits, 4, (cells + 3) // 4))
+
+
+def _read_game_header(data):
+    (magic, version, flags, width, height, seed, total_bombs, visible_bombs,
+     visible_non_bombs) = GAME_HEADER.unpack_from(data)
+    if magic != GAME_MAGIC or version != VERSION:
+        raise ValueError("Not a version " + str(VERSION) + " game file")
+    return {
+        "board_width": width,
+        "board_height": height,
+        "seed": seed if flags & HAS_SEED else None,
+        "total_bombs": total_bombs,
+        "visible_bombs": visible_bombs,
+        "visible_non_bombs": visible_non_bombs
+    }
+
+
+def load_game(path):
+    """ Reads a whole game from a file written by save_game
+    :param path: The file
+    :return: A game dictionary
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    header = _read_game_header(data)
+    (width, height) = (header["board_width"], header["board_height"])
+    cells = width * height
+    mines_start = GAME_HEADER.size
+    states_start = mines_start + (cells + 7) // 8
+
+    mines = _unpack_bits(data[mines_start:states_start], cells)
+    states = _unpack_pairs(data[states_start:states_start + (cells + 3) // 4], cells)
+    board = minesweeper.Board(width, height)
+    board.values = bytearray(mines.translate(_TO_DIGITS).translate(_VALUES_FROM_DIGITS))
+    board = minesweeper.place_nums_on_board(board)
+    for y in range(height):
+        board.own_row(y)[:] = states[y * width:(y + 1) * width]
+
+    # Finding the bombs in the bytes is much quicker than checking every cell
+    bomb_set = set()
+    i = mines.find(1)
+    while i != -1:
+        bomb_set.add((i % width, i // width))
+        i = mines.find(1, i + 1)
+
+    (game_over, is_win) = minesweeper.get_result(header, cells)
+    return {
+        "board_width": width,
+        "board_height": height,
+        "bombs": bomb_set,
+        "game_over": game_over,
+        "is_win": is_win,
+        "board": board,
+        "total_bombs": header["total_bombs"],
+        "visible_bombs": header["visible_bombs"],
+        "visible_non_bombs": header["visible_non_bombs"]
+    }
+
+
+class MappedGame:
+    """
+    A game file opened with mmap, so cells are read from the file as they're asked for and a huge
+    board never has to be loaded all at once. Use it as a context manager, or call close.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.header = _read_game_header(self._map)
+        self.width = self.header["board_width"]
+        self.height = self.header["board_height"]
+        self._mines_start = GAME_HEADER.size
+        self._states_start = self._mines_start + (self.width * self.height + 7) // 8
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def is_mine(self, coord):
+        (x, y) = coord
+        i = y * self.width + x
+        return bool(self._map[self._mines_start + i // 8] >> (i % 8) & 1)
+
+    def get_state(self, coord):
+        """ Gets the VISIBLE and FLAGGED bits of a cell """
+        (x, y) = coord
+        i = y * self.width + x
+        return self._map[self._states_start + i // 4] >> (2 * (i % 4)) & 3
+
+    def get_cell(self, coord):
+        """ Gets a cell, working out its number from the mines around it
+        :param coord: A tuple of the cell
+        :return: A cell Dictionary
+        """
+        (x, y) = coord
+        if self.is_mine(coord):
+            value = 'X'
+        else:
+            value = str(sum(1 for (delta_x, delta_y) in minesweeper.DIRECTIONS
+                            if 0 <= x + delta_x < self.width and 0 <= y + delta_y < self.height
+                            and self.is_mine((x + delta_x, y + delta_y))))
+        state = self.get_state(coord)
+        return minesweeper.create_cell(bool(state & minesweeper.VISIBLE), bool(state & minesweeper.FLAGGED), value)
+
+    def get_window(self, x, y, width, height):
+        """ Reads a rectangle of the board, with the numbers on its edges counting mines outside it
+        :return: 2D Array of Dictionaries, cut off where it runs past the board
+        """
+        return [[self.get_cell((cell_x, cell_y)) for cell_x in range(x, min(x + width, self.width))]
+                for cell_y in range(y, min(y + height, self.height))]
+
+
+def open_game(path):
+    """ Opens a game file without reading all of it
+    :param path: A file written by save_game
+    :return: A MappedGame
+    """
+    return MappedGame(path)
+
+
+def save_replay(path, board_width, board_height, num_bombs, seed, moves, safe_coord=None):
+    """ Writes a replay, which is only the seed the bombs came from and the moves, to a file
+    :param path: Where to write it
+    :param board_width:
+    :param board_height:
+    :param num_bombs:
+    :param seed: The int seed create_bomb_set made the bombs from, which a replay can't do without
+    :param moves: An iterable of (action, coord) pairs, coords off the board included
+    :param safe_coord: The safe_coord create_bomb_set was given, if any
+    """
+    _check_seed(seed)
+    moves = list(moves)
+    (flags, (safe_x, safe_y)) = (0, (0, 0)) if safe_coord is None else (HAS_SAFE_COORD, safe_coord)
+    with open(path, "wb") as file:
+        file.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, flags, board_width, board_height, num_bombs,
+                                      seed, safe_x, safe_y, len(moves)))
+        file.write(b"".join(MOVE.pack(ACTION_CODES[action], x, y) for (action, (x, y)) in moves))
+
+
+def load_replay(path):
+    """ Reads a replay written by save_replay
+    :param path: The file
+    :return: A Dictionary with the "board_width", "board_height", "num_bombs", "seed", "safe_coord" and "moves"
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    (magic, version, flags, width, height, num_bombs, seed, safe_x, safe_y,
+     num_moves) = REPLAY_HEADER.unpack_from(data)
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        raise ValueError("Not a version " + str(REPLAY_VERSION) + " replay file")
+    moves = [(ACTIONS[action], (x, y)) for (action, x, y) in MOVE.iter_unpack(data[REPLAY_HEADER.size:])]
+    return {
+        "board_width": width,
+        "board_height": height,
+        "num_bombs": num_bombs,
+        "seed": seed,
+        "safe_coord": (safe_x, safe_y) if flags & HAS_SAFE_COORD else None,
+        "moves": moves[:num_moves]
+    }
+
+
+def play_replay(replay):
+    """ Plays a replay back from the start
+    :param replay: A Dictionary from load_replay
+    :return: A tuple of the final game dictionary and the per move summaries, like apply_moves
+    """
+    bombs = minesweeper.create_bomb_set(replay["board_width"], replay["board_height"], replay["num_bombs"],
+                                        seed=replay["seed"], safe_coord=replay["safe_coord"])
+    game = minesweeper.create_game(replay["board_width"], replay["board_height"], bombs)
+    return minesweeper.apply_moves(game, replay["moves"])
@@ -0,0 +1,83 @@
+import os
+import tempfile
+from minesweeper import *
+from minesweeper_save import *
+
+
+def test_save_game():
+    bombs = create_bomb_set(9, 7, 10, seed=1, safe_coord=(4, 3))
+    game = create_game(9, 7, bombs)
+    (game, _) = apply_moves(game, [('RIGHT_CLICK', (0, 0)), ('LEFT_CLICK', (4, 3)), ('RIGHT_CLICK', (8, 6))])
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "game.msw")
+        save_game(game, path, seed=1)
+        # A header, a bit per cell for the mines and two bits per cell for the state
+        assert os.path.getsize(path) == GAME_HEADER.size + 8 + 16
+        loaded = load_game(path)
+        assert loaded == game
+        assert board_to_string(loaded["board"]) == board_to_string(game["board"])
+
+        # Memory mapping reads single cells and windows without loading the board
+        with open_game(path) as mapped:
+            assert mapped.header["seed"] == 1 and mapped.header["visible_non_bombs"] == game["visible_non_bombs"]
+            assert mapped.get_window(0, 0, 9, 7) == game["board"]
+            assert mapped.get_window(7, 5, 4, 4) == [row[7:] for row in game["board"].to_list()[5:]]
+            assert mapped.get_cell((0, 0))["flagged"] and mapped.is_mine(next(iter(bombs)))
+
+        # Boards of dictionaries save the same way, and a game that's over loads as over
+        game = get_next_game(game, 'LEFT_CLICK', next(iter(bombs)))
+        game["board"] = game["board"].to_list()
+        save_game(game, path)
+        loaded = load_game(path)
+        assert loaded["game_over"] and not loaded["is_win"] and loaded["board"] == game["board"]
+        with open_game(path) as mapped:
+            assert mapped.header["seed"] is None
+
+        try:
+            save_game(game, path, seed=2 ** 64)
+            assert False
+        except ValueError:
+            pass
+
+        with open(path, "wb") as file:
+            file.write(b"not a game" * 10)
+        try:
+            load_game(path)
+            assert False
+        except ValueError:
+            pass
+
+
+def test_save_replay():
+    moves = [('LEFT_CLICK', (5, 5)), ('RIGHT_CLICK', (0, 1)), ('CHORD', (5, 5)), ('LEFT_CLICK', (9, 0))]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "replay.msr")
+        save_replay(path, 10, 10, 12, 42, moves)
+        assert os.path.getsize(path) == REPLAY_HEADER.size + 4 * MOVE.size
+        replay = load_replay(path)
+    assert replay == {"board_width": 10, "board_height": 10, "num_bombs": 12, "seed": 42, "safe_coord": None,
+                      "moves": moves}
+
+    # Playing it back gives the same game as playing the moves on the same bombs
+    game = create_game(10, 10, create_bomb_set(10, 10, 12, seed=42))
+    assert play_replay(replay) == apply_moves(game, moves)
+
+    # The safe coord is kept, and moves off the board are saved like any other
+    moves = [('LEFT_CLICK', (-1, 3)), ('LEFT_CLICK', (2, 2)), ('RIGHT_CLICK', (10, -5))]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "replay.msr")
+        save_replay(path, 10, 10, 30, -7, moves, safe_coord=(2, 2))
+        replay = load_replay(path)
+    assert replay["safe_coord"] == (2, 2) and replay["moves"] == moves
+    game = create_game(10, 10, create_bomb_set(10, 10, 30, seed=-7, safe_coord=(2, 2)))
+    (final, summaries) = play_replay(replay)
+    assert (final, summaries) == apply_moves(game, moves) and not final["game_over"]
+
+    # Seeds that can't be stored, or replayed, are refused
+    for seed in [None, 2 ** 64, "seed"]:
+        try:
+            save_replay(os.path.join(tempfile.gettempdir(), "unused.msr"), 10, 10, 12, seed, [])
+            assert False
+        except ValueError:
+            pass
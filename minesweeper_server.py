@@ -0,0 +1,383 @@
+import argparse
+import asyncio
+import itertools
+import json
+import minesweeper
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# How many times a second shared sessions apply their queued moves and send out what changed
+DEFAULT_TICK_RATE = 20
+
+# How long the worst move may hold up every other session, in seconds
+MOVE_BUDGET = 0.1
+# The biggest board a session can ask for by default. A move costs around a microsecond and a half
+# per cell it changes, building and encoding its diff included, so revealing the whole of an empty
+# board this size takes about half of MOVE_BUDGET on one core
+MAX_CELLS = 200 * 200
+
+# How many messages a client can fall behind on reading before it's disconnected, so a client that
+# never reads can't make the server hold on to every diff sent to it
+MAX_OUTBOX = 64
+# How many moves a shared session queues for one tick, which bounds how long a tick can take
+MAX_QUEUED_MOVES = 256
+
+MOVES = {
+    "reveal": "LEFT_CLICK",
+    "flag": "RIGHT_CLICK",
+    "chord": "CHORD"
+}
+
+
+class Session:
+    """
+    One game on the server and the clients playing it.
+    """
+
+    def __init__(self, session_id, game):
+        self.id = session_id
+        self.game = minesweeper.Game(game)
+        self.clients = set()
+
+
+class SharedSession(Session):
+    """
+    A game many players share. Their moves are queued rather than played straight away, and each
+    tick plays all of them in the order they came in, then sends everyone one diff of every cell
+    that changed, so overlapping flood fills from different players are only sent once.
+    """
+
+    def __init__(self, session_id, game):
+        super().__init__(session_id, game)
+        self.moves = []
+
+    def tick(self):
+        """ Plays the queued moves, skipping any after one that ends the game
+        :return: A diff of every cell the moves changed, or None if none did
+        """
+        (moves, self.moves) = (self.moves, [])
+        # A dictionary keeps the cells in the order they changed, once each
+        changed = {}
+        for (action, coord) in moves:
+            if self.game["game_over"]:
+                break
+            changed.update(dict.fromkeys(self.game.play(action, coord)))
+        if not changed:
+            return None
+        return get_diff(self.game, changed)
+
+
+class Client:
+    """
+    One connection to the server. Messages for it are put on its outbox, which its connection
+    sends on in order, and which holds at most max_outbox of them.
+    """
+
+    def __init__(self, max_outbox=MAX_OUTBOX):
+        self.outbox = asyncio.Queue(max_outbox)
+        self.session = None
+        # The connection's writer, for clients connected over TCP
+        self.writer = None
+        self.dropped = False
+
+    def send(self, message):
+        """
+        :return: False if the outbox is full and the message wasn't queued, else True
+        """
+        try:
+            self.outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+
+def get_diff(game, changed):
+    """ Describes the cells a move changed
+    :param game: A Game
+    :param changed: The coords the move changed
+    :return: A Dictionary with the changed "cells" as [x, y, char] lists, like board_to_string
+        shows them, and whether the game is over and won
+    """
+    board = game["board"]
+    if isinstance(board, minesweeper.Board):
+        # Reading the arrays directly saves making a cell for every coord
+        (values, state_rows, width) = (board.values, board.state_rows, board.width)
+        hidden = minesweeper.HIDDEN_CHARS
+        cells = [[x, y, chr(values[y * width + x] if state_rows[y][x] & minesweeper.VISIBLE
+                            else hidden[state_rows[y][x]])] for (x, y) in changed]
+    else:
+        cells = [[x, y, minesweeper.cell_to_char(board[y][x])] for (x, y) in changed]
+    return {
+        "type": "diff",
+        "cells": cells,
+        "game_over": game["game_over"],
+        "is_win": game["is_win"]
+    }
+
+
+class GameServer:
+    """
+    Hosts many games in one process. Each message is handled in full before the next, so every other
+    session waits for as long as a move takes. Moves cost time in proportion to the cells they change,
+    and boards are capped at max_cells, so the worst move, one that reveals the whole board, stays
+    within MOVE_BUDGET. A shared session's tick plays all its queued moves at once, and since each
+    cell is only revealed once, a tick costs at most that plus a little per move, for at most
+    MAX_QUEUED_MOVES moves. Moves past that get an error until the tick.
+    A client whose outbox fills up, because it isn't reading what it's sent, is disconnected.
+    Messages are JSON objects with a "type":
+        new: starts a session with a "width", "height", "bombs", optional "seed", and "shared" set to
+            true for a SharedSession
+        join: joins the session with the given "session" id
+        reveal, flag and chord: play a move at "x" and "y" in the client's session
+    Clients are sent a "session" message when they start or join a session, with the board as a
+    string, a "diff" message to every client in the session after each move that changed anything,
+    or each tick that did in a shared session, and an "error" message for anything that can't be done.
+    """
+
+    def __init__(self, tick_rate=DEFAULT_TICK_RATE, max_cells=MAX_CELLS):
+        """
+        :param tick_rate: How many times a second shared sessions play their queued moves
+        :param max_cells: The biggest board a session can ask for, raising it raises the worst
+            latency every session can see
+        """
+        self.sessions = {}
+        self.tick_rate = tick_rate
+        self.max_cells = max_cells
+        self._session_ids = itertools.count(1)
+        # The shared sessions with moves waiting for the next tick
+        self._waiting = {}
+        self._server = None
+        self._ticker = None
+
+    def handle(self, client, message):
+        """ Handles one message from a client
+        :param client: The Client it came from
+        :param message: The decoded message
+        """
+        try:
+            kind = message["type"]
+            if kind == "new":
+                self.new_session(client, int(message["width"]), int(message["height"]), int(message["bombs"]),
+                                 message.get("seed"), bool(message.get("shared", False)))
+            elif kind == "join":
+                session = self.sessions.get(message["session"])
+                if session is None:
+                    raise ValueError("No session " + str(message["session"]))
+                self.join(client, session)
+            elif kind in MOVES:
+                self.play(client, MOVES[kind], (int(message["x"]), int(message["y"])))
+            else:
+                raise ValueError("Unknown message type " + str(kind))
+        # JSON numbers too big for a float, like 1e400, decode as infinity, which int can't convert
+        except (KeyError, TypeError, ValueError, OverflowError) as error:
+            self.send(client, {"type": "error", "message": str(error)})
+
+    def new_session(self, client, width, height, num_bombs, seed=None, shared=False):
+        if width <= 0 or height <= 0 or width * height > self.max_cells:
+            raise ValueError("Boards need between 1 and " + str(self.max_cells) + " cells")
+        bombs = minesweeper.create_bomb_set(width, height, num_bombs, seed=seed)
+        session_type = SharedSession if shared else Session
+        session = session_type(next(self._session_ids), minesweeper.create_game(width, height, bombs))
+        self.sessions[session.id] = session
+        self.join(client, session)
+
+    def join(self, client, session):
+        self.leave(client)
+        client.session = session
+        session.clients.add(client)
+        game = session.game
+        self.send(client, {
+            "type": "session",
+            "session": session.id,
+            "shared": isinstance(session, SharedSession),
+            "width": game["board_width"],
+            "height": game["board_height"],
+            "bombs": game["total_bombs"],
+            "board": minesweeper.board_to_string(game["board"]),
+            "game_over": game["game_over"],
+            "is_win": game["is_win"]
+        })
+
+    def leave(self, client):
+        """ Takes a client out of its session, ending the session if nobody's left in it """
+        session = client.session
+        if session is None:
+            return
+        session.clients.discard(client)
+        client.session = None
+        if not session.clients:
+            del self.sessions[session.id]
+            self._waiting.pop(session.id, None)
+
+    def play(self, client, action, coord):
+        session = client.session
+        if session is None:
+            raise ValueError("Start or join a session first")
+        if session.game["game_over"]:
+            raise ValueError("The game is over")
+        (x, y) = coord
+        if not (0 <= x < session.game["board_width"] and 0 <= y < session.game["board_height"]):
+            raise ValueError("Off the board")
+        if isinstance(session, SharedSession):
+            if len(session.moves) >= MAX_QUEUED_MOVES:
+                raise ValueError("Too many moves are waiting for the next tick")
+            session.moves.append((action, coord))
+            self._waiting[session.id] = session
+            return
+        changed = session.game.play(action, coord)
+        if changed:
+            self.broadcast(session, get_diff(session.game, changed))
+
+    def broadcast(self, session, message):
+        # Sending can drop a client from the session
+        for client in list(session.clients):
+            self.send(client, message)
+
+    def send(self, client, message):
+        """ Sends a message to a client, disconnecting it if it's fallen too far behind """
+        if not client.dropped and not client.send(message):
+            self.drop(client)
+
+    def drop(self, client):
+        """ Disconnects a client, taking it out of its session """
+        client.dropped = True
+        self.leave(client)
+        if client.writer is not None:
+            client.writer.close()
+
+    def tick(self):
+        """ Plays the moves queued in every shared session and sends out their diffs """
+        (waiting, self._waiting) = (self._waiting, {})
+        for session in waiting.values():
+            diff = session.tick()
+            if diff is not None:
+                self.broadcast(session, diff)
+
+    async def _run_ticks(self):
+        loop = asyncio.get_running_loop()
+        interval = 1 / self.tick_rate
+        next_tick = loop.time()
+        while True:
+            # Ticks are kept to a fixed schedule, so a slow one doesn't push the rest back
+            next_tick += interval
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            self.tick()
+
+    async def _handle_connection(self, reader, writer):
+        client = Client()
+        client.writer = writer
+        sender = asyncio.ensure_future(self._send_messages(client, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line or client.dropped:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    self.send(client, {"type": "error", "message": "Messages must be JSON, one per line"})
+                    continue
+                self.handle(client, message)
+        except ConnectionError:
+            pass
+        finally:
+            self.leave(client)
+            sender.cancel()
+            writer.close()
+
+    async def _send_messages(self, client, writer):
+        while True:
+            message = await client.outbox.get()
+            writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+            # Only wait on the socket once everything queued so far is written
+            if client.outbox.empty():
+                await writer.drain()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """ Starts listening for TCP connections, which send and receive one JSON message per line
+        :param port: The port, or 0 for any free port
+        :return: The port it's listening on
+        """
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self._ticker = asyncio.ensure_future(self._run_ticks())
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._ticker.cancel()
+        self._server.close()
+        await self._server.wait_closed()
+
+    def connect_local(self):
+        """ Connects a client in this process, without a socket
+        :return: A LocalClient
+        """
+        return LocalClient(self)
+
+
+class LocalClient(Client):
+    """
+    A client in the same process as the server, for tests. Messages go through JSON like they
+    would over a socket.
+    """
+
+    def __init__(self, server):
+        super().__init__()
+        self.server = server
+
+    async def request(self, message):
+        self.server.handle(self, json.loads(json.dumps(message)))
+
+    async def receive(self):
+        return json.loads(json.dumps(await self.outbox.get()))
+
+    async def close(self):
+        self.server.leave(self)
+
+
+class TCPClient:
+    """
+    A client that connects to a server over TCP.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        (reader, writer) = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, message):
+        self.writer.write(json.dumps(message).encode() + b"\n")
+        await self.writer.drain()
+
+    async def receive(self):
+        return json.loads(await self.reader.readline())
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Host minesweeper games over TCP")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--tick-rate", type=float, default=DEFAULT_TICK_RATE,
+                        help="Ticks a second for shared games")
+    parser.add_argument("--max-cells", type=int, default=MAX_CELLS,
+                        help="The biggest board a game can have, which bounds how long one move can take")
+    args = parser.parse_args()
+
+    async def serve():
+        server = GameServer(args.tick_rate, args.max_cells)
+        port = await server.start(args.host, args.port)
+        print("Listening on " + args.host + ":" + str(port))
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+if __name__ == '__main__':
+    main()
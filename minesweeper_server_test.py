@@ -0,0 +1,205 @@
+import asyncio
+from minesweeper import *
+from minesweeper_server import *
+
+
+def test_local_client():
+    async def play():
+        server = GameServer()
+        client = server.connect_local()
+        await client.request({"type": "new", "width": 9, "height": 9, "bombs": 10, "seed": 3})
+        start = await client.receive()
+        assert start["type"] == "session" and start["board"] == '\n'.join(['#' * 9] * 9)
+
+        game = Game(create_game(9, 9, create_bomb_set(9, 9, 10, seed=3)))
+        safe = next((x, y) for y in range(9) for x in range(9) if (x, y) not in game["bombs"])
+        await client.request({"type": "reveal", "x": safe[0], "y": safe[1]})
+        diff = await client.receive()
+        # Only the cells that changed come back
+        changed = game.reveal(*safe)
+        assert sorted(diff["cells"]) == sorted([x, y, cell_to_char(game["board"][y][x])] for (x, y) in changed)
+        assert diff["game_over"] == game["game_over"]
+
+        # A second client joining sees the board so far, and both see each other's moves
+        other = server.connect_local()
+        await other.request({"type": "join", "session": start["session"]})
+        joined = await other.receive()
+        assert joined["board"] == board_to_string(game["board"])
+        hidden = next((x, y) for y in range(9) for x in range(9) if not game["board"][y][x]["visible"])
+        await other.request({"type": "flag", "x": hidden[0], "y": hidden[1]})
+        assert (await client.receive())["cells"] == [[hidden[0], hidden[1], 'F']]
+        assert (await other.receive())["cells"] == [[hidden[0], hidden[1], 'F']]
+
+        # Moves that change nothing send nothing, and mistakes send an error to that client only
+        await client.request({"type": "reveal", "x": hidden[0], "y": hidden[1]})
+        await client.request({"type": "reveal", "x": 9, "y": 0})
+        await client.request({"type": "dance"})
+        await client.request({"type": "reveal", "x": 1e400, "y": 0})
+        assert [(await client.receive())["type"] for _ in range(3)] == ["error", "error", "error"]
+        assert other.outbox.empty()
+
+        # The session ends once everyone has left
+        await client.close()
+        assert start["session"] in server.sessions
+        await other.close()
+        assert not server.sessions
+
+    asyncio.run(play())
+
+
+def test_tcp_client():
+    async def play():
+        server = GameServer()
+        port = await server.start(port=0)
+        clients = [await TCPClient.connect(port=port) for _ in range(20)]
+        for client in clients:
+            await client.request({"type": "new", "width": 5, "height": 5, "bombs": 0})
+        ids = {(await client.receive())["session"] for client in clients}
+        assert len(ids) == len(server.sessions) == 20
+
+        # With no bombs one reveal wins the game, and only its own client hears about it
+        for client in clients:
+            await client.request({"type": "reveal", "x": 2, "y": 2})
+        for client in clients:
+            diff = await client.receive()
+            assert len(diff["cells"]) == 25 and diff["game_over"] and diff["is_win"]
+
+        await clients[0].request({"type": "chord", "x": 0, "y": 0})
+        assert (await clients[0].receive())["type"] == "error"
+
+        # Numbers that overflow a float get an error back rather than dropping the connection
+        clients[1].writer.write(b'{"type":"new","width":1e400,"height":5,"bombs":0}\n')
+        assert (await clients[1].receive())["type"] == "error"
+        await clients[1].request({"type": "new", "width": 5, "height": 5, "bombs": 10 ** 400})
+        assert (await clients[1].receive())["type"] == "error"
+        for client in clients:
+            await client.close()
+        await server.stop()
+
+    asyncio.run(play())
+
+
+def test_worst_move():
+    async def play():
+        server = GameServer()
+        client = server.connect_local()
+        await client.request({"type": "new", "width": MAX_CELLS + 1, "height": 1, "bombs": 0})
+        assert (await client.receive())["type"] == "error"
+
+        # Revealing the whole of the biggest empty board sends one diff of every cell,
+        # minesweeper_benchmark times it against MOVE_BUDGET
+        await client.request({"type": "new", "width": 200, "height": MAX_CELLS // 200, "bombs": 0})
+        await client.receive()
+        await client.request({"type": "reveal", "x": 0, "y": 0})
+        diff = await client.receive()
+        assert len(diff["cells"]) == MAX_CELLS and diff["is_win"] and client.outbox.empty()
+
+    asyncio.run(play())
+
+
+def test_shared_session():
+    async def play():
+        server = GameServer()
+        clients = [server.connect_local() for _ in range(3)]
+        await clients[0].request({"type": "new", "width": 30, "height": 20, "bombs": 0, "shared": True})
+        start = await clients[0].receive()
+        assert start["shared"]
+        for client in clients[1:]:
+            await client.request({"type": "join", "session": start["session"]})
+            await client.receive()
+
+        # Moves wait for the tick, then everyone gets one diff with each changed cell once,
+        # even though the two reveals flood fill the same region
+        await clients[1].request({"type": "flag", "x": 29, "y": 19})
+        await clients[1].request({"type": "reveal", "x": 0, "y": 0})
+        await clients[2].request({"type": "reveal", "x": 15, "y": 10})
+        assert all(client.outbox.empty() for client in clients)
+        server.tick()
+        for client in clients:
+            diff = await client.receive()
+            assert len(diff["cells"]) == 30 * 20 and len({(x, y) for (x, y, _) in diff["cells"]}) == 30 * 20
+            assert [29, 19, 'F'] in diff["cells"] and not diff["game_over"]
+            assert client.outbox.empty()
+
+        # A tick with nothing queued sends nothing, and moves after the game ends are dropped
+        server.tick()
+        assert all(client.outbox.empty() for client in clients)
+        await clients[0].request({"type": "flag", "x": 29, "y": 19})
+        await clients[0].request({"type": "reveal", "x": 29, "y": 19})
+        await clients[0].request({"type": "flag", "x": 29, "y": 19})
+        server.tick()
+        diff = await clients[2].receive()
+        assert diff["cells"] == [[29, 19, '0']] and diff["is_win"]
+
+    asyncio.run(play())
+
+
+def test_slow_clients():
+    async def play():
+        server = GameServer()
+        (player, watcher) = [server.connect_local() for _ in range(2)]
+        await player.request({"type": "new", "width": 30, "height": 20, "bombs": 0, "shared": True})
+        start = await player.receive()
+        await watcher.request({"type": "join", "session": start["session"]})
+        await watcher.receive()
+
+        # A session only queues so many moves for each tick
+        for _ in range(MAX_QUEUED_MOVES):
+            await player.request({"type": "flag", "x": 0, "y": 0})
+        await player.request({"type": "flag", "x": 0, "y": 0})
+        assert (await player.receive())["type"] == "error"
+        assert len(server.sessions[start["session"]].moves) == MAX_QUEUED_MOVES
+        server.tick()
+        assert server.sessions[start["session"]].moves == []
+
+        # A client that stops reading is disconnected once its outbox fills, and the rest play on.
+        # The tick above sent the first diff.
+        for _ in range(MAX_OUTBOX - 1):
+            await player.receive()
+            await player.request({"type": "flag", "x": 0, "y": 0})
+            server.tick()
+        assert watcher.outbox.full() and not watcher.dropped
+        await player.receive()
+        await player.request({"type": "flag", "x": 0, "y": 0})
+        server.tick()
+        assert watcher.dropped and watcher.session is None
+        assert server.sessions[start["session"]].clients == {player}
+        assert (await player.receive())["type"] == "diff"
+
+    asyncio.run(play())
+
+    async def connect():
+        server = GameServer()
+        port = await server.start(port=0)
+        client = await TCPClient.connect(port=port)
+        await client.request({"type": "new", "width": 5, "height": 5, "bombs": 0})
+        await client.receive()
+        # Over TCP the connection is closed
+        (connected,) = [client for session in server.sessions.values() for client in session.clients]
+        server.drop(connected)
+        assert await asyncio.wait_for(client.reader.read(), 1) == b""
+        assert not server.sessions
+        await client.close()
+        await server.stop()
+
+    asyncio.run(connect())
+
+
+def test_shared_session_ticks():
+    async def play():
+        server = GameServer(tick_rate=100)
+        port = await server.start(port=0)
+        (first, second) = [await TCPClient.connect(port=port) for _ in range(2)]
+        await first.request({"type": "new", "width": 8, "height": 8, "bombs": 0, "shared": True})
+        session = (await first.receive())["session"]
+        await second.request({"type": "join", "session": session})
+        await second.receive()
+        await second.request({"type": "reveal", "x": 3, "y": 3})
+        for client in (first, second):
+            diff = await asyncio.wait_for(client.receive(), 1)
+            assert len(diff["cells"]) == 64 and diff["is_win"]
+        await first.close()
+        await second.close()
+        await server.stop()
+
+    asyncio.run(play())
@@ -0,0 +1,190 @@
+import argparse
+import concurrent.futures
+import os
+import random
+import time
+import minesweeper
+import minesweeper_solver
+
+# The same difficulties the UI offers
+DIFFICULTIES = minesweeper.DIFFICULTIES
+
+
+def random_strategy(game, rng, changed):
+    """ Reveals a random hidden cell
+    :param game: A minesweeper.Game
+    :param rng: A random.Random
+    :param changed: The coords the last move changed, or None at the start of a game
+    :return: A Dictionary with the "action" and "coord" of the move
+    """
+    board = game["board"]
+    while True:
+        (x, y) = (rng.randrange(game["board_width"]), rng.randrange(game["board_height"]))
+        if not board[y][x]["visible"]:
+            return {"action": "LEFT_CLICK", "coord": (x, y)}
+
+
+class SolverStrategy:
+    """
+    Reveals a cell the solver proves safe, or else the hidden cell least likely to be a mine.
+    Mines the solver finds are left unflagged, since flagging them doesn't help to win.
+    The solver carries over between moves of a game and only looks at what each move changed.
+    """
+
+    def __init__(self, time_budget=0.05):
+        self.time_budget = time_budget
+        self.solver = None
+
+    def __call__(self, game, rng, changed):
+        if changed is None:
+            self.solver = minesweeper_solver.Solver(game)
+            # Nothing to go on yet, and the middle is the likeliest place to open up a region
+            return {"action": "LEFT_CLICK", "coord": (game["board_width"] // 2, game["board_height"] // 2)}
+        solver = self.solver.update(game, changed)
+        if solver.safe:
+            return {"action": "LEFT_CLICK", "coord": min(solver.safe)}
+
+        (probabilities, other_probability) = minesweeper_solver.get_mine_probabilities(
+            game, solver, self.time_budget, rng)
+        candidates = [(probability, coord) for (coord, probability) in probabilities.items()
+                      if coord not in solver.mines]
+        if other_probability is not None:
+            # Any hidden cell off the frontier will do, so take a random one
+            board = game["board"]
+            while True:
+                coord = (rng.randrange(game["board_width"]), rng.randrange(game["board_height"]))
+                if coord not in probabilities and not board[coord[1]][coord[0]]["visible"]:
+                    candidates.append((other_probability, coord))
+                    break
+        return {"action": "LEFT_CLICK", "coord": min(candidates)[1]}
+
+
+def play_game(strategy, difficulty, seed, max_moves=None):
+    """ Plays one game with a strategy
+    :param strategy: A function from a minesweeper.Game, a random.Random and the coords the last move
+        changed (None for the first move) to a Dictionary with the "action" and "coord" of the next move
+    :param difficulty: A Dictionary with the board_width, board_height and num_bombs, like get_difficulty
+    :param seed: The seed for the bombs and the strategy
+    :param max_moves: How many moves to give up after, defaults to two per cell
+    :return: A Dictionary with whether the game was a "win", how many "moves" it took and the "seconds"
+    """
+    start = time.perf_counter()
+    (width, height) = (difficulty["board_width"], difficulty["board_height"])
+    if max_moves is None:
+        max_moves = 2 * width * height
+    rng = random.Random(seed)
+    bombs = minesweeper.create_bomb_set(width, height, difficulty["num_bombs"], seed=rng)
+    game = minesweeper.Game(minesweeper.create_game(width, height, bombs))
+
+    moves = 0
+    changed = None
+    while not game["game_over"] and moves < max_moves:
+        move = strategy(game, rng, changed)
+        changed = game.play(move["action"], move["coord"])
+        moves += 1
+    return {"win": game["is_win"], "moves": moves, "seconds": time.perf_counter() - start}
+
+
+def create_totals():
+    """ Get an empty set of totals to add games to
+    :return: A Dictionary of totals
+    """
+    return {"games": 0, "wins": 0, "moves": 0, "max_moves": 0, "game_seconds": 0.0, "max_game_seconds": 0.0}
+
+
+def add_totals(totals, other):
+    """ Adds one set of totals to another in place
+    :param totals: A Dictionary from create_totals
+    :param other: A Dictionary from create_totals
+    :return: totals
+    """
+    for key in ("games", "wins", "moves", "game_seconds"):
+        totals[key] += other[key]
+    for key in ("max_moves", "max_game_seconds"):
+        totals[key] = max(totals[key], other[key])
+    return totals
+
+
+def simulate_chunk(strategy, difficulty, seeds, max_moves=None):
+    """ Plays a game for each seed, keeping only the totals
+    :return: A Dictionary from create_totals
+    """
+    totals = create_totals()
+    for seed in seeds:
+        result = play_game(strategy, difficulty, seed, max_moves)
+        add_totals(totals, {
+            "games": 1,
+            "wins": int(result["win"]),
+            "moves": result["moves"],
+            "max_moves": result["moves"],
+            "game_seconds": result["seconds"],
+            "max_game_seconds": result["seconds"]
+        })
+    return totals
+
+
+def _simulate_chunk_from_args(args):
+    return simulate_chunk(*args)
+
+
+def simulate(strategy, difficulty, seeds, processes=None, chunk_size=None, max_moves=None):
+    """ Plays a game for each seed across a pool of processes
+    Each process gets a range of seeds at a time and sends back only its totals, so no boards are
+    passed between processes. The strategy has to be picklable, so a function defined at the top of
+    a module or an instance of a class defined at the top of a module, rather than a lambda.
+    :param strategy: A strategy like play_game takes
+    :param difficulty: A Dictionary with the board_width, board_height and num_bombs, like get_difficulty
+    :param seeds: A range of seeds, one per game
+    :param processes: How many processes to use, defaults to one per CPU, and 1 plays in this process
+    :param chunk_size: How many games each process plays at a time, defaults to a few chunks per process
+    :param max_moves: How many moves to give up on a game after, defaults to two per cell
+    :return: A Dictionary of totals, with the "win_rate", "mean_moves", "wall_seconds" and "games_per_second"
+    """
+    start = time.perf_counter()
+    processes = processes or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = minesweeper_solver.get_chunk_size(len(seeds), processes)
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+    jobs = [(strategy, difficulty, chunk, max_moves) for chunk in chunks]
+
+    totals = create_totals()
+    if processes == 1:
+        for job in jobs:
+            add_totals(totals, _simulate_chunk_from_args(job))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+            for chunk_totals in executor.map(_simulate_chunk_from_args, jobs):
+                add_totals(totals, chunk_totals)
+
+    wall_seconds = time.perf_counter() - start
+    totals["win_rate"] = totals["wins"] / totals["games"] if totals["games"] else 0.0
+    totals["mean_moves"] = totals["moves"] / totals["games"] if totals["games"] else 0.0
+    totals["wall_seconds"] = wall_seconds
+    totals["games_per_second"] = totals["games"] / wall_seconds if wall_seconds else 0.0
+    return totals
+
+
+STRATEGIES = {
+    "random": random_strategy,
+    "solver": SolverStrategy()
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many games of minesweeper with a strategy")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="solver")
+    parser.add_argument("--difficulty", choices=sorted(DIFFICULTIES), default="hard")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, help="defaults to one per CPU")
+    parser.add_argument("--chunk-size", type=int)
+    args = parser.parse_args()
+
+    seeds = range(args.first_seed, args.first_seed + args.games)
+    totals = simulate(STRATEGIES[args.strategy], DIFFICULTIES[args.difficulty], seeds, args.processes, args.chunk_size)
+    print("{games} games, {win_rate:.1%} won, {mean_moves:.1f} moves on average, "
+          "{games_per_second:.1f} games per second".format(**totals))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+from minesweeper_simulator import *
+
+
+def test_play_game():
+    # Games are reproducible from the seed
+    first = play_game(SolverStrategy(), DIFFICULTIES["easy"], seed=5)
+    second = play_game(SolverStrategy(), DIFFICULTIES["easy"], seed=5)
+    assert (first["win"], first["moves"]) == (second["win"], second["moves"])
+
+    # Games give up after max_moves
+    def flag_strategy(game, rng, changed):
+        return {"action": "RIGHT_CLICK", "coord": (0, 0)}
+    result = play_game(flag_strategy, DIFFICULTIES["easy"], seed=5, max_moves=7)
+    assert (result["win"], result["moves"]) == (False, 7) and result["seconds"] >= 0
+
+
+def test_simulate():
+    seeds = range(40)
+    totals = simulate(SolverStrategy(), DIFFICULTIES["easy"], seeds, processes=1)
+    assert totals["games"] == 40
+    assert totals["win_rate"] == totals["wins"] / 40 and totals["win_rate"] > 0.5
+    assert totals["mean_moves"] == totals["moves"] / 40 and totals["max_moves"] >= totals["mean_moves"]
+
+    # Spreading the games over processes gives the same totals
+    pooled = simulate(SolverStrategy(), DIFFICULTIES["easy"], seeds, processes=2, chunk_size=7)
+    assert [pooled[key] for key in ("games", "wins", "moves", "max_moves")] == \
+        [totals[key] for key in ("games", "wins", "moves", "max_moves")]
+
+    # Playing randomly loses almost every game
+    assert simulate(random_strategy, DIFFICULTIES["hard"], seeds, processes=1)["win_rate"] < 0.1
@@ -0,0 +1,680 @@
+import concurrent.futures
+import copy
+import math
+import os
+import random
+import time
+import minesweeper
+
+
+class Solver:
+    """
+    Works out which hidden cells are provably safe and which are provably mines, from the numbers
+    that are visible. Only numbers on the frontier, next to hidden cells, take part, and after a
+    move update only reprocesses the numbers around the cells that move revealed.
+    Flags are ignored, since a player's flags can be wrong.
+    """
+
+    def __init__(self, game):
+        self.safe = set()
+        self.mines = set()
+        # The visible numbers that still have neighbors that haven't been worked out
+        self.frontier = set()
+        self.board = None
+        # Neighbor lists by coord, filled in as they're needed
+        self._neighbors = {}
+        self.width = game["board_width"]
+        self.height = game["board_height"]
+        self.update(game)
+
+    def copy(self):
+        """ Copies this solver, so it can be rewound to this point
+        :return: A new Solver
+        """
+        other = copy.copy(self)
+        other.safe = set(self.safe)
+        other.mines = set(self.mines)
+        other.frontier = set(self.frontier)
+        return other
+
+    def update(self, game, revealed=None):
+        """ Catches up with the next state of the game
+        :param game: The game after one or more moves
+        :param revealed: The coords revealed since the last update, or None to look at every cell
+        :return: This solver
+        """
+        board = game["board"]
+        self.board = board if isinstance(board, minesweeper.Board) else minesweeper.Board.from_list(board)
+
+        if revealed is None:
+            revealed = [(x, y) for y in range(self.height) for x in range(self.width) if self.is_visible((x, y))]
+            self.safe = {coord for coord in self.safe if not self.is_visible(coord)}
+            self.mines = {coord for coord in self.mines if not self.is_visible(coord)}
+
+        # Each revealed cell is a new constraint, and changes the constraints of the numbers around it
+        queue = []
+        for coord in revealed:
+            self.safe.discard(coord)
+            self.mines.discard(coord)
+            queue.append(coord)
+            queue.extend(self.get_neighbors(coord))
+        self.propagate(queue)
+        return self
+
+    def is_visible(self, coord):
+        (x, y) = coord
+        return bool(self.board.state_rows[y][x] & minesweeper.VISIBLE)
+
+    def get_number(self, coord):
+        """ Gets the number on a visible cell
+        :return: The number as an int, or None if the cell is hidden or isn't a number
+        """
+        (x, y) = coord
+        if not self.board.state_rows[y][x] & minesweeper.VISIBLE:
+            return None
+        value = self.board.values[y * self.width + x]
+        if ord('1') <= value <= ord('8'):
+            return value - ord('0')
+        return None
+
+    def get_neighbors(self, coord):
+        neighbors = self._neighbors.get(coord)
+        if neighbors is None:
+            (x, y) = coord
+            neighbors = [(x + delta_x, y + delta_y) for (delta_x, delta_y) in minesweeper.DIRECTIONS
+                         if 0 <= x + delta_x < self.width and 0 <= y + delta_y < self.height]
+            self._neighbors[coord] = neighbors
+        return neighbors
+
+    def get_constraint(self, coord):
+        """ Gets what a visible number says about its neighbors that haven't been worked out yet
+        :param coord: A tuple of the number
+        :return: A tuple of the set of unknown neighbors and how many of them are mines, or None
+        """
+        number = self.get_number(coord)
+        if number is None:
+            return None
+        unknown = set()
+        mines = 0
+        state_rows = self.board.state_rows
+        for neighbor in self.get_neighbors(coord):
+            (x, y) = neighbor
+            if neighbor in self.mines:
+                mines += 1
+            elif state_rows[y][x] & minesweeper.VISIBLE:
+                # After a loss the bomb that was clicked is visible, and still one of the number's mines
+                if self.board.values[y * self.width + x] == ord('X'):
+                    mines += 1
+            elif neighbor not in self.safe:
+                unknown.add(neighbor)
+        if not unknown:
+            return None
+        return unknown, number - mines
+
+    def propagate(self, queue):
+        """ Deduces everything the queued numbers, and the numbers affected by what they reveal, can show
+        :param queue: A list of coords whose constraints may have changed
+        """
+        # A number is often queued by several of its neighbors before it's looked at, only look once
+        queued = set(queue)
+        queue = list(queued)
+        while queue:
+            coord = queue.pop()
+            queued.discard(coord)
+            constraint = self.get_constraint(coord)
+            if constraint is None:
+                self.frontier.discard(coord)
+                continue
+            self.frontier.add(coord)
+            (unknown, mines) = constraint
+
+            if mines == 0:
+                deduced = self.safe
+            elif mines == len(unknown):
+                deduced = self.mines
+            else:
+                self.propagate_subsets(coord, unknown, mines, queue, queued)
+                continue
+
+            for cell in unknown:
+                deduced.add(cell)
+                self.enqueue(self.get_neighbors(cell), queue, queued)
+
+    def enqueue(self, coords, queue, queued):
+        for coord in coords:
+            if coord not in queued:
+                queued.add(coord)
+                queue.append(coord)
+
+    def propagate_subsets(self, coord, unknown, mines, queue, queued):
+        """ Compares a number with the nearby numbers whose unknown neighbors include all of its own, or
+        are all included in its own, since the cells only the larger one can see must then hold the
+        difference of their mines
+        :param coord: A tuple of the number
+        :param unknown: The number's unknown neighbors
+        :param mines: How many of them are mines
+        :param queue: The list of coords to add newly affected numbers to
+        :param queued: The set of coords in queue
+        """
+        (x, y) = coord
+        for other_y in range(max(0, y - 2), min(self.height, y + 3)):
+            for other_x in range(max(0, x - 2), min(self.width, x + 3)):
+                # Numbers that aren't on the frontier yet are still queued, and will compare themselves with this one
+                if (other_x, other_y) == coord or (other_x, other_y) not in self.frontier:
+                    continue
+                constraint = self.get_constraint((other_x, other_y))
+                if constraint is None:
+                    continue
+                (other_unknown, other_mines) = constraint
+                if unknown < other_unknown:
+                    (difference, difference_mines) = (other_unknown - unknown, other_mines - mines)
+                elif other_unknown < unknown:
+                    (difference, difference_mines) = (unknown - other_unknown, mines - other_mines)
+                else:
+                    continue
+                if difference_mines == 0:
+                    deduced = self.safe
+                elif difference_mines == len(difference):
+                    deduced = self.mines
+                else:
+                    continue
+                for cell in difference:
+                    deduced.add(cell)
+                    self.enqueue(self.get_neighbors(cell), queue, queued)
+                # The constraints around here changed, so look at this number again
+                self.enqueue([coord], queue, queued)
+                return
+
+
+def find_safe_and_mines(game):
+    """ Works out which hidden cells of a game are provably safe and which are provably mines
+    :param game: A game from create_game or get_next_game
+    :return: A tuple of two sets of coords, the safe cells and the mines
+    """
+    solver = Solver(game)
+    return solver.safe, solver.mines
+
+
+def hint(game, solver=None):
+    """ Suggests a move that can't lose: revealing a safe cell, or else flagging an unflagged mine
+    :param game: A game from create_game or get_next_game
+    :param solver: A Solver that's up to date with game, so nothing has to be recomputed
+    :return: A Dictionary with the "action" and "coord" of the move, or None if nothing can be deduced
+    """
+    if solver is None:
+        solver = Solver(game)
+    if solver.safe:
+        return {"action": "LEFT_CLICK", "coord": min(solver.safe, key=lambda coord: (coord[1], coord[0]))}
+    for coord in sorted(solver.mines, key=lambda coord: (coord[1], coord[0])):
+        (x, y) = coord
+        if not game["board"][y][x]["flagged"]:
+            return {"action": "RIGHT_CLICK", "coord": coord}
+    return None
+
+
+# Components with more cells than this are sampled instead of enumerated
+MAX_EXACT_CELLS = 40
+
+# How many samples to take of a component that's too big to enumerate, time allowing
+MAX_SAMPLES = 2000
+# Components with fewer samples than this are treated like the cells off the frontier
+MIN_SAMPLES = 30
+
+# Configuration counts of components already enumerated, keyed by get_component_signature
+_component_cache = {}
+_MAX_CACHED_COMPONENTS = 10000
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+def get_frontier_components(solver):
+    """ Splits the unknown cells next to visible numbers into groups that don't share any number
+    :param solver: A Solver that's up to date with the game
+    :return: A list of components, each a tuple of its sorted cells and its constraints, where each
+        constraint is a tuple of the indexes of the cells it covers and how many of them are mines
+    """
+    constraints = [solver.get_constraint(coord) for coord in solver.frontier]
+
+    # Union find over the cells, joining every cell of a constraint together
+    parents = {}
+
+    def find(cell):
+        while parents[cell] != cell:
+            parents[cell] = parents[parents[cell]]
+            cell = parents[cell]
+        return cell
+
+    for (unknown, _) in constraints:
+        cells = list(unknown)
+        for cell in cells:
+            parents.setdefault(cell, cell)
+        for cell in cells[1:]:
+            parents[find(cell)] = find(cells[0])
+
+    groups = {}
+    for (unknown, mines) in constraints:
+        groups.setdefault(find(next(iter(unknown))), []).append((unknown, mines))
+
+    components = []
+    for group in groups.values():
+        cells = sorted({cell for (unknown, _) in group for cell in unknown}, key=lambda coord: (coord[1], coord[0]))
+        index = {cell: i for i, cell in enumerate(cells)}
+        component_constraints = {(tuple(sorted(index[cell] for cell in unknown)), mines) for (unknown, mines) in group}
+        components.append((cells, sorted(component_constraints)))
+    return components
+
+
+def get_component_signature(cells, constraints):
+    """ Describes a component's shape without its position, so identical components share cached counts
+    :return: A hashable signature
+    """
+    return len(cells), tuple(constraints)
+
+
+def count_configurations(num_cells, constraints, deadline=None, clock=time.perf_counter):
+    """ Counts every way of placing mines in a component that satisfies its constraints
+    :param num_cells: How many cells the component has
+    :param constraints: A list of tuples of cell indexes and how many of them are mines
+    :param deadline: A clock reading to give up at by raising _OutOfTime, or None
+    :param clock: The function that reads the time
+    :return: A Dictionary from the number of mines to a list of the configuration count and,
+        for each cell, how many of those configurations have a mine there
+    """
+    cell_constraints = [[] for _ in range(num_cells)]
+    for (i, (indexes, _)) in enumerate(constraints):
+        for cell in indexes:
+            cell_constraints[cell].append(i)
+    remaining = [mines for (_, mines) in constraints]
+    unassigned = [len(indexes) for (indexes, _) in constraints]
+    assignment = [0] * num_cells
+    results = {}
+    visited = [0]
+
+    def search(cell, mines):
+        visited[0] += 1
+        if deadline is not None and visited[0] % 1024 == 0 and clock() > deadline:
+            raise _OutOfTime()
+        if cell == num_cells:
+            if mines not in results:
+                results[mines] = [0, [0] * num_cells]
+            result = results[mines]
+            result[0] += 1
+            for i in range(num_cells):
+                result[1][i] += assignment[i]
+            return
+        for value in (0, 1):
+            if all(0 <= remaining[i] - value <= unassigned[i] - 1 for i in cell_constraints[cell]):
+                for i in cell_constraints[cell]:
+                    remaining[i] -= value
+                    unassigned[i] -= 1
+                assignment[cell] = value
+                search(cell + 1, mines + value)
+                for i in cell_constraints[cell]:
+                    remaining[i] += value
+                    unassigned[i] += 1
+        assignment[cell] = 0
+
+    search(0, 0)
+    return results
+
+
+def sample_configurations(num_cells, constraints, rng, deadline, max_samples=MAX_SAMPLES, clock=time.perf_counter):
+    """ Estimates count_configurations by finding random configurations, for components too big to enumerate
+    Each sample is found by a search that tries mine and no mine in a random order, so it's an
+    approximation that favors configurations the search reaches more easily. A sample that's still
+    searching at the deadline is thrown away.
+    :param clock: The function that reads the time, which deadline is a reading of
+    :return: The same shape as count_configurations, with sample counts in place of configuration counts
+    """
+    cell_constraints = [[] for _ in range(num_cells)]
+    for (i, (indexes, _)) in enumerate(constraints):
+        for cell in indexes:
+            cell_constraints[cell].append(i)
+
+    results = {}
+    for sample in range(max_samples):
+        if clock() > deadline:
+            break
+        remaining = [mines for (_, mines) in constraints]
+        unassigned = [len(indexes) for (indexes, _) in constraints]
+        assignment = [None] * num_cells
+        # options[cell] are the values still to try for that cell, the search is at the last one
+        options = [rng.sample((0, 1), 2)]
+        steps = 0
+        while options and len(options) <= num_cells:
+            steps += 1
+            if steps % 1024 == 0 and clock() > deadline:
+                return results
+            cell = len(options) - 1
+            if assignment[cell] is not None:
+                for i in cell_constraints[cell]:
+                    remaining[i] += assignment[cell]
+                    unassigned[i] += 1
+                assignment[cell] = None
+            if not options[-1]:
+                options.pop()
+                continue
+            value = options[-1].pop()
+            if all(0 <= remaining[i] - value <= unassigned[i] - 1 for i in cell_constraints[cell]):
+                for i in cell_constraints[cell]:
+                    remaining[i] -= value
+                    unassigned[i] -= 1
+                assignment[cell] = value
+                options.append(rng.sample((0, 1), 2))
+        if not options:
+            break
+
+        mines = sum(assignment)
+        if mines not in results:
+            results[mines] = [0, [0] * num_cells]
+        results[mines][0] += 1
+        for i in range(num_cells):
+            results[mines][1][i] += assignment[i]
+    return results
+
+
+def _log_comb(n, k):
+    if not 0 <= k <= n:
+        return None
+    return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+
+
+def _multiply(first, second):
+    """ Multiplies two polynomials stored as Dictionaries from power to coefficient """
+    result = {}
+    for (i, a) in first.items():
+        for (j, b) in second.items():
+            result[i + j] = result.get(i + j, 0.0) + a * b
+    return result
+
+
+def _smooth_samples(result):
+    """ Keeps sampled counts from calling a cell certain just because no sample happened to put a mine
+    there, or every sample did, by counting each cell's mines as (mines + 0.5) / (samples + 1) of the samples
+    :param result: A Dictionary from sample_configurations
+    :return: A new Dictionary of the same shape
+    """
+    return {mines: [count, [(cell_count + 0.5) * count / (count + 1) for cell_count in cell_counts]]
+            for (mines, (count, cell_counts)) in result.items()}
+
+
+def get_mine_probabilities(game, solver=None, time_budget=0.5, seed=None, clock=time.perf_counter):
+    """ Works out the chance that each hidden cell is a mine
+    The frontier is split into components that don't affect each other, each component's
+    configurations are counted (or sampled, if it's big or time runs out), and the components are
+    combined with the number of mines left for the rest of the hidden cells.
+    Each component gets an equal share of the time budget, half of it for counting and at least
+    half for sampling. A component that still gets fewer than MIN_SAMPLES samples is left out, and
+    its cells are treated like the cells off the frontier.
+    :param game: A game from create_game or get_next_game
+    :param solver: A Solver that's up to date with game, so nothing has to be recomputed
+    :param time_budget: Roughly how many seconds to spend
+    :param seed: A seed or a random.Random for the sampling
+    :param clock: The function that reads the time
+    :return: A tuple of a Dictionary from each deduced cell and each frontier cell of a component
+        that was counted or sampled well enough to its probability, and the probability for every
+        other hidden cell, or None if there are no other hidden cells
+    """
+    start = clock()
+    rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+    if solver is None:
+        solver = Solver(game)
+
+    all_components = get_frontier_components(solver)
+    components = []
+    results = []
+    for (i, (cells, constraints)) in enumerate(all_components):
+        signature = get_component_signature(cells, constraints)
+        if signature in _component_cache:
+            components.append((cells, constraints))
+            results.append(_component_cache[signature])
+            continue
+        # Each component's share of the time runs up to its deadline, so time one doesn't use goes to the next
+        share = time_budget / len(all_components)
+        deadline = start + share * (i + 1)
+        now = clock()
+        try:
+            if len(cells) > MAX_EXACT_CELLS:
+                raise _OutOfTime()
+            result = count_configurations(len(cells), constraints, now + max(0.0, deadline - now) / 2, clock)
+            if len(_component_cache) >= _MAX_CACHED_COMPONENTS:
+                _component_cache.clear()
+            _component_cache[signature] = result
+        except _OutOfTime:
+            # Sampling always gets some time of its own, even once counting has used up the share
+            sample_deadline = max(deadline, clock() + share / 2)
+            result = sample_configurations(len(cells), constraints, rng, sample_deadline, clock=clock)
+            if sum(count for (count, _) in result.values()) < MIN_SAMPLES:
+                continue
+            result = _smooth_samples(result)
+        components.append((cells, constraints))
+        results.append(result)
+
+    # Every hidden cell that isn't on the frontier or already deduced
+    frontier = {cell for (cells, _) in components for cell in cells}
+    hidden = game["board_width"] * game["board_height"] - game["visible_bombs"] - game["visible_non_bombs"]
+    num_other = hidden - len(frontier) - len(solver.mines) - len(solver.safe)
+    mines_left = game["total_bombs"] - game["visible_bombs"] - len(solver.mines)
+
+    # Scale each component's counts to its total, so the products stay in range as floats
+    polynomials = []
+    for result in results:
+        total = sum(count for (count, _) in result.values())
+        polynomials.append({mines: count / total for (mines, (count, _)) in result.items()})
+
+    # How much every total number of frontier mines is worth once the other cells hold the rest
+    log_weights = {}
+    for mines in range(mines_left + 1):
+        log_weight = _log_comb(num_other, mines_left - mines)
+        if log_weight is not None:
+            log_weights[mines] = log_weight
+    if not log_weights:
+        log_weights = {mines_left: 0.0}
+    largest = max(log_weights.values())
+    weights = {mines: math.exp(log_weight - largest) for (mines, log_weight) in log_weights.items()}
+
+    def weigh(polynomial):
+        return sum(coefficient * weights.get(mines, 0.0) for (mines, coefficient) in polynomial.items())
+
+    everything = {0: 1.0}
+    for polynomial in polynomials:
+        everything = _multiply(everything, polynomial)
+    total_weight = weigh(everything)
+
+    probabilities = {}
+    for coord in solver.safe:
+        probabilities[coord] = 0.0
+    for coord in solver.mines:
+        probabilities[coord] = 1.0
+    if total_weight == 0:
+        return probabilities, None
+
+    for (i, ((cells, _), result)) in enumerate(zip(components, results)):
+        others = {0: 1.0}
+        for (j, polynomial) in enumerate(polynomials):
+            if j != i:
+                others = _multiply(others, polynomial)
+        total = sum(count for (count, _) in result.values())
+        cell_weights = [0.0] * len(cells)
+        for (mines, (count, cell_counts)) in result.items():
+            weight = weigh({mines + other_mines: coefficient for (other_mines, coefficient) in others.items()})
+            for (cell, cell_count) in enumerate(cell_counts):
+                cell_weights[cell] += cell_count / total * weight
+        for (cell, cell_weight) in zip(cells, cell_weights):
+            # Rounding can take a certainty a hair past 1
+            probabilities[cell] = min(1.0, cell_weight / total_weight)
+
+    other_probability = None
+    if num_other > 0:
+        expected = sum(coefficient * weights.get(mines, 0.0) * (mines_left - mines)
+                       for (mines, coefficient) in everything.items())
+        other_probability = min(1.0, max(0.0, expected / total_weight / num_other))
+    return probabilities, other_probability
+
+
+def solve_from_click(board_width, board_height, bomb_set, first_click):
+    """ Plays a game using only deduction, from a first click until nothing more can be deduced
+    Besides the solver's deductions, this uses the number of mines left, like a player reading the counter.
+    :param board_width:
+    :param board_height:
+    :param bomb_set:
+    :param first_click: A tuple of the first cell revealed
+    :return: A tuple of the Game as far as it got and its up to date Solver
+    """
+    game = minesweeper.Game(minesweeper.create_game(board_width, board_height, bomb_set))
+    solver = Solver(game)
+    solver.safe.add(first_click)
+    _deduce(game, solver, [], {}, None)
+    return game, solver
+
+
+def is_no_guess(board_width, board_height, bomb_set, first_click):
+    """ Checks if a board can be cleared by deduction alone from a first click
+    :return: A Boolean
+    """
+    return solve_from_click(board_width, board_height, bomb_set, first_click)[0]["is_win"]
+
+
+def _deduce(game, solver, clicks, revealed_at, checkpoints):
+    """ Reveals the cells the solver proves safe until it gets stuck or the game is won
+    :param game: A Game
+    :param solver: A Solver that's up to date with game
+    :param clicks: The list of coords clicked so far, which this adds to
+    :param revealed_at: A Dictionary from each visible coord to the index of the click that revealed it
+    :param checkpoints: A list to add the number of clicks and a copy of the solver to before each
+        round of clicks, or None
+    """
+    while not game["game_over"]:
+        if not solver.safe:
+            if game["total_bombs"] != len(solver.mines):
+                return
+            # With every mine found, everything else is safe
+            solver.safe.update(_get_unknown_cells(game, solver))
+        if checkpoints is not None:
+            checkpoints.append((len(clicks), solver.copy()))
+        revealed = []
+        for coord in sorted(solver.safe):
+            changed = game.reveal(*coord)
+            if changed:
+                for cell in changed:
+                    revealed_at[cell] = len(clicks)
+                clicks.append(coord)
+                revealed.extend(changed)
+        solver.update(game, revealed)
+
+
+def _get_unknown_cells(game, solver):
+    """ Finds the hidden cells the solver hasn't worked out """
+    board = game["board"]
+    return [(x, y) for y in range(game["board_height"]) for x in range(game["board_width"])
+            if not board.state_rows[y][x] & minesweeper.VISIBLE and (x, y) not in solver.mines]
+
+
+def create_no_guess_bomb_set(board_width, board_height, num_bombs, first_click, seed=None, max_repairs=1000):
+    """ Picks bomb locations for a board that can be cleared by deduction alone from first_click
+    Rather than throwing away boards that need a guess, each time the solver gets stuck one cell
+    where it got stuck is swapped between mine and no mine with a cell away from everything
+    revealed so far. Every click before the first one that revealed a number next to the swap
+    would still be made the same way, so solving picks up again from there.
+    The 50ms target holds at beginner (9x9, 10 bombs) and intermediate (16x16, 40 bombs) density,
+    which take a median of about 2ms and 7ms, and at most about 40ms. Expert density (30x16, 99 bombs)
+    misses it, with a median of about 75ms and up to about 280ms.
+    :param board_width:
+    :param board_height:
+    :param num_bombs: How many bombs to place
+    :param first_click: A tuple of the first cell the player will reveal, which is always a 0
+    :param seed: A seed or a random.Random to make the bombs reproducible
+    :param max_repairs: How many swaps to try before starting over with new bombs
+    :return: A set of (x, y) tuples
+    """
+    rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+    repairs = max_repairs
+    while True:
+        if repairs >= max_repairs:
+            bombs = minesweeper.create_bomb_set(board_width, board_height, num_bombs, seed=rng, safe_coord=first_click)
+            game = minesweeper.Game(minesweeper.create_game(board_width, board_height, bombs))
+            solver = Solver(game)
+            solver.safe.add(first_click)
+            (clicks, revealed_at, checkpoints) = ([], {}, [])
+            repairs = 0
+
+        _deduce(game, solver, clicks, revealed_at, checkpoints)
+        if game["is_win"]:
+            return bombs
+
+        frontier = sorted({cell for coord in solver.frontier for cell in solver.get_constraint(coord)[0]})
+        interior = set(_get_unknown_cells(game, solver)).difference(frontier)
+        cell = rng.choice(frontier) if frontier else None
+        if cell in bombs:
+            others = sorted(interior - bombs)
+        else:
+            others = sorted(interior & bombs)
+        if cell is None or not others:
+            repairs = max_repairs
+            continue
+        other = rng.choice(others)
+        bombs = bombs ^ {cell, other}
+        repairs += 1
+
+        # Go back to before the first click that revealed a number that changed
+        changed = [neighbor for neighbor in solver.get_neighbors(cell) if neighbor in revealed_at]
+        first_changed = min(revealed_at[neighbor] for neighbor in changed) if changed else len(clicks)
+        while checkpoints[-1][0] > first_changed:
+            checkpoints.pop()
+        (num_clicks, checkpoint) = checkpoints.pop()
+        del clicks[num_clicks:]
+
+        game = minesweeper.Game(minesweeper.create_game(board_width, board_height, bombs))
+        revealed_at = {}
+        for (i, coord) in enumerate(clicks):
+            for revealed in game.reveal(*coord):
+                revealed_at[revealed] = i
+        solver = checkpoint.copy()
+        solver.update(game, [])
+
+
+def create_no_guess_game(board_width, board_height, num_bombs, first_click, seed=None):
+    """ Get a new Game data structure that can be cleared by deduction alone from first_click
+    This is the no guess counterpart of minesweeper.create_game, which takes a bomb set instead.
+    :param board_width:
+    :param board_height:
+    :param num_bombs: How many bombs to place
+    :param first_click: A tuple of the first cell the player will reveal
+    :param seed: A seed or a random.Random to make the bombs reproducible
+    :return: A game Dictionary
+    """
+    bombs = create_no_guess_bomb_set(board_width, board_height, num_bombs, first_click, seed)
+    return minesweeper.create_game(board_width, board_height, bombs)
+
+
+def _create_no_guess_bomb_set_from_args(args):
+    return create_no_guess_bomb_set(*args)
+
+
+def get_chunk_size(num_jobs, processes):
+    """ Picks how many jobs to send a process at a time
+    A few chunks per process keeps the processes busy without sending every job on its own.
+    :param num_jobs: How many jobs there are
+    :param processes: How many processes share them
+    :return: The number of jobs per chunk, at least 1
+    """
+    return max(1, num_jobs // (4 * processes))
+
+
+def create_no_guess_bomb_sets(board_width, board_height, num_bombs, first_click, seeds, processes=None):
+    """ Generates a batch of no guess boards across a pool of processes
+    :param board_width:
+    :param board_height:
+    :param num_bombs: How many bombs to place on each board
+    :param first_click: A tuple of the first cell the player will reveal
+    :param seeds: One seed per board
+    :param processes: How many processes to use, defaults to one per CPU
+    :return: A list of bomb sets, in the same order as seeds
+    """
+    jobs = [(board_width, board_height, num_bombs, first_click, seed) for seed in seeds]
+    processes = processes or os.cpu_count() or 1
+    chunksize = get_chunk_size(len(jobs), processes)
+    with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+        return list(executor.map(_create_no_guess_bomb_set_from_args, jobs, chunksize=chunksize))
@@ -0,0 +1,212 @@
+import itertools
+import random
+import minesweeper_solver
+from minesweeper import *
+from minesweeper_solver import *
+
+
+def test_find_safe_and_mines():
+    # 000000
+    # 011100
+    # 01X210
+    # 012X10
+    # 001110
+    bombs = {(2, 2), (3, 3)}
+    game = create_game(6, 5, bombs)
+
+    # Nothing can be deduced before anything is revealed
+    assert find_safe_and_mines(game) == (set(), set())
+
+    # A revealed region shows which of its hidden neighbors are mines
+    game = get_next_game(game, 'LEFT_CLICK', (0, 0))
+    assert find_safe_and_mines(game) == ({(3, 4)}, {(2, 2), (3, 3)})
+
+    # Nothing can be deduced from a single number with more hidden neighbors than mines
+    #  X10
+    #  110
+    game = create_game(3, 2, {(0, 0)})
+    game = get_next_game(game, 'LEFT_CLICK', (1, 0))
+    assert find_safe_and_mines(game) == (set(), set())
+
+    # A number whose hidden neighbors include all of another's, and has no more mines, shows the rest are safe
+    game = get_next_game(game, 'LEFT_CLICK', (0, 1))
+    assert find_safe_and_mines(game) == ({(2, 0), (2, 1)}, set())
+
+    # Can deduce from one number's hidden neighbors being a subset of another's
+    #  ###
+    #  121
+    # The 1s each see two of the three cells above, the 2 sees all three, so the middle is safe
+    game = create_game(3, 2, {(0, 0), (2, 0)})
+    for coord in [(0, 1), (1, 1), (2, 1)]:
+        game = get_next_game(game, 'LEFT_CLICK', coord)
+    assert find_safe_and_mines(game) == ({(1, 0)}, {(0, 0), (2, 0)})
+
+    # After a loss the visible bomb still counts as one of its neighbors' mines
+    #  X1#
+    #  ###
+    game = create_game(3, 2, {(0, 0)})
+    game = get_next_game(get_next_game(game, 'LEFT_CLICK', (1, 0)), 'LEFT_CLICK', (0, 0))
+    assert game["game_over"] and not game["is_win"]
+    assert find_safe_and_mines(game) == ({(2, 0), (0, 1), (1, 1), (2, 1)}, set())
+
+
+def test_solver_update():
+    rng = random.Random(5)
+    for _ in range(4):
+        bombs = create_bomb_set(16, 16, 40, seed=rng, safe_coord=(8, 8))
+        game = Game(create_game(16, 16, bombs))
+        solver = Solver(game)
+        revealed = game.reveal(8, 8)
+        while not game["game_over"]:
+            # Updating with just the revealed cells agrees with starting over, and is always right
+            solver.update(game, revealed)
+            fresh = Solver(game)
+            assert (solver.safe, solver.mines) == (fresh.safe, fresh.mines)
+            assert not solver.safe & bombs and solver.mines <= bombs
+
+            move = hint(game, solver)
+            if move is None:
+                hidden = [(x, y) for y in range(16) for x in range(16)
+                          if not game["board"][y][x]["visible"] and (x, y) not in solver.mines]
+                revealed = game.reveal(*rng.choice(hidden))
+            elif move["action"] == "RIGHT_CLICK":
+                revealed = game.flag(*move["coord"]) and []
+            else:
+                revealed = game.reveal(*move["coord"])
+                assert not game["game_over"] or game["is_win"]
+
+
+def test_hint():
+    #  X10
+    #  110
+    game = create_game(3, 2, {(0, 0)})
+    assert hint(game) is None
+
+    # Prefers revealing a safe cell, then flagging a mine that isn't flagged yet
+    game = get_next_game(get_next_game(game, 'LEFT_CLICK', (1, 0)), 'LEFT_CLICK', (0, 1))
+    assert hint(game) == {"action": "LEFT_CLICK", "coord": (2, 0)}
+    game = get_next_game(game, 'LEFT_CLICK', (2, 0))
+    assert hint(game) == {"action": "RIGHT_CLICK", "coord": (0, 0)}
+    game = get_next_game(game, 'RIGHT_CLICK', (0, 0))
+    assert hint(game) is None
+
+
+def get_brute_force_probabilities(game):
+    """ Tries every way of hiding the game's bombs that agrees with the visible numbers """
+    board = game["board"]
+    (width, height) = (game["board_width"], game["board_height"])
+    hidden = [(x, y) for y in range(height) for x in range(width) if not board[y][x]["visible"]]
+    mine_counts = dict.fromkeys(hidden, 0)
+    total = 0
+    for bombs in itertools.combinations(hidden, game["total_bombs"]):
+        guess = place_nums_on_board(place_bombs_on_board(create_board(width, height), set(bombs)))
+        if all(guess[y][x]["value"] == board[y][x]["value"]
+               for y in range(height) for x in range(width) if board[y][x]["visible"]):
+            total += 1
+            for coord in bombs:
+                mine_counts[coord] += 1
+    return {coord: count / total for (coord, count) in mine_counts.items()}
+
+
+def test_get_mine_probabilities():
+    #  X1#
+    #  ###
+    # One mine is next to the 1, and the 1 can see every hidden cell
+    game = get_next_game(create_game(3, 2, {(0, 0)}), 'LEFT_CLICK', (1, 0))
+    (probabilities, other) = get_mine_probabilities(game)
+    assert other is None and set(probabilities) == {(0, 0), (2, 0), (0, 1), (1, 1), (2, 1)}
+    assert all(abs(probability - 0.2) < 1e-9 for probability in probabilities.values())
+
+    # Agrees with trying every possible board, counting the cells away from the frontier too
+    rng = random.Random(9)
+    for _ in range(6):
+        bombs = create_bomb_set(5, 4, 4, seed=rng, safe_coord=(0, 0))
+        game = get_next_game(create_game(5, 4, bombs), 'LEFT_CLICK', (0, 0))
+        if game["game_over"]:
+            continue
+        expected = get_brute_force_probabilities(game)
+        (probabilities, other) = get_mine_probabilities(game)
+        for (coord, probability) in expected.items():
+            assert abs(probabilities.get(coord, other) - probability) < 1e-9
+
+    # Identical components are only enumerated once
+    minesweeper_solver._component_cache.clear()
+    get_mine_probabilities(game)
+    cached = dict(minesweeper_solver._component_cache)
+    assert get_mine_probabilities(game) == get_mine_probabilities(game)
+    assert minesweeper_solver._component_cache == cached
+
+
+def test_sample_configurations():
+    # Sampling finds only valid configurations, in roughly the right proportions
+    #  The three cells hold one mine, and the first two hold at most one between them
+    constraints = [((0, 1, 2), 1), ((0, 1), 1)]
+    exact = count_configurations(3, constraints)
+    assert exact == {1: [2, [1, 1, 0]]}
+    sampled = sample_configurations(3, constraints, random.Random(2), deadline=float("inf"), max_samples=400)
+    assert list(sampled) == [1] and sampled[1][0] == 400 and sampled[1][1][2] == 0
+    assert 150 < sampled[1][1][0] < 250
+
+    # Components too big to enumerate fall back to sampling, which with a clock that never moves
+    # takes every sample it's allowed
+    game = Game(create_game(60, 60, create_bomb_set(60, 60, 500, seed=4, safe_coord=(30, 30))))
+    game.reveal(30, 30)
+    (exact, exact_other) = get_mine_probabilities(game)
+    solver = Solver(game)
+    minesweeper_solver.MAX_EXACT_CELLS = 4
+    try:
+        minesweeper_solver._component_cache.clear()
+        (probabilities, other) = get_mine_probabilities(game, time_budget=0.0, seed=1, clock=lambda: 0.0)
+        assert set(probabilities) == set(exact)
+        assert all(abs(probabilities[coord] - exact[coord]) < 0.25 for coord in exact)
+
+        # With a clock that ticks once each time it's read, the time budget is kept to, and the
+        # sampling still never reports a cell that could be a mine as certain either way
+        for time_budget in [30, 200]:
+            ticks = itertools.count()
+            minesweeper_solver._component_cache.clear()
+            (probabilities, other) = get_mine_probabilities(game, solver, time_budget, 1, lambda: next(ticks))
+            assert next(ticks) <= time_budget
+            for (coord, probability) in exact.items():
+                probability = probabilities.get(coord, other)
+                assert 0.0 <= probability <= 1.0
+                if coord not in solver.safe and coord not in solver.mines:
+                    assert 0.0 < probability < 1.0
+            assert 0.0 < other < 1.0
+    finally:
+        minesweeper_solver.MAX_EXACT_CELLS = 40
+
+    # A sample that runs past the deadline is thrown away rather than counted
+    assert sample_configurations(3, constraints, random.Random(2), deadline=0.0) == {}
+
+
+def test_create_no_guess_bomb_set():
+    # A board with a 50/50 needs a guess, even knowing how many mines there are
+    #  X10
+    #  110
+    assert not is_no_guess(3, 2, {(0, 0)}, (2, 1))
+    assert is_no_guess(3, 3, {(0, 0)}, (2, 2))
+
+    for seed in range(5):
+        bombs = create_no_guess_bomb_set(20, 20, 40, (10, 10), seed=seed)
+        assert len(bombs) == 40 and (10, 10) not in bombs
+        assert is_no_guess(20, 20, bombs, (10, 10))
+        assert create_no_guess_bomb_set(20, 20, 40, (10, 10), seed=seed) == bombs
+
+    # Dense boards get repaired too
+    bombs = create_no_guess_bomb_set(30, 16, 99, (0, 0), seed=1)
+    assert len(bombs) == 99 and is_no_guess(30, 16, bombs, (0, 0))
+
+    game = create_no_guess_game(10, 10, 10, (5, 5), seed=2)
+    assert game["total_bombs"] == 10
+    assert get_next_game(game, 'LEFT_CLICK', (5, 5))["board"][5][5]["value"] == '0'
+    assert game["bombs"] == create_no_guess_bomb_set(10, 10, 10, (5, 5), seed=2)
+    assert is_no_guess(10, 10, game["bombs"], (5, 5))
+
+
+def test_create_no_guess_bomb_sets():
+    seeds = range(6)
+    batch = create_no_guess_bomb_sets(10, 10, 12, (0, 0), seeds, processes=2)
+    # Each process gets a few chunks, and there's always at least one job in a chunk
+    assert get_chunk_size(100, 2) == 12 and get_chunk_size(3, 8) == 1
+    assert batch == [create_no_guess_bomb_set(10, 10, 12, (0, 0), seed=seed) for seed in seeds]
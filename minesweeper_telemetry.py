@@ -0,0 +1,129 @@
+import collections
+import csv
+import json
+import time
+
+# How many of the latest samples of each metric are kept
+DEFAULT_WINDOW = 1000
+
+METRICS = ["frame_seconds", "draw_seconds", "draw_calls", "click_seconds", "click_to_draw_seconds"]
+
+
+def get_percentile(sorted_samples, percent):
+    """ Picks a percentile by nearest rank
+    :param sorted_samples: A sorted list of numbers
+    :param percent: From 0 to 100
+    :return: The sample at that percentile, or 0 if there are none
+    """
+    if not sorted_samples:
+        return 0
+    rank = max(1, -(-len(sorted_samples) * percent // 100))
+    return sorted_samples[int(rank) - 1]
+
+
+class Telemetry:
+    """
+    Measures how the UI performs: the time between frames and spent drawing each one, the draw
+    calls a frame makes, and how long a click takes to update the shape lists and to be drawn.
+    Only the latest samples are kept, so it can run for as long as the App does.
+    Every method takes an optional now, a time.perf_counter reading, so it can be driven by a test.
+    """
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        # The time from the start of one frame to the start of the next
+        self.frame_seconds = collections.deque(maxlen=window)
+        self.draw_seconds = collections.deque(maxlen=window)
+        self.draw_calls = collections.deque(maxlen=window)
+        # The time from a click to its move being played and the shape lists updated
+        self.click_seconds = collections.deque(maxlen=window)
+        # The time from a click to the end of the first frame drawn after it
+        self.click_to_draw_seconds = collections.deque(maxlen=window)
+        # A description of the latest click
+        self.last_click = None
+        self._frame_start = None
+        self._click_start = None
+        self._click_waiting_for_draw = False
+
+    def start_frame(self, now=None):
+        now = time.perf_counter() if now is None else now
+        if self._frame_start is not None:
+            self.frame_seconds.append(now - self._frame_start)
+        self._frame_start = now
+
+    def end_frame(self, draw_calls, now=None):
+        """
+        :param draw_calls: How many draw calls the frame made
+        """
+        now = time.perf_counter() if now is None else now
+        self.draw_seconds.append(now - self._frame_start)
+        self.draw_calls.append(draw_calls)
+        if self._click_waiting_for_draw:
+            self.click_to_draw_seconds.append(now - self._click_start)
+            self._click_waiting_for_draw = False
+
+    def start_click(self, description, now=None):
+        """
+        :param description: What was clicked, shown in the HUD
+        """
+        self.last_click = description
+        self._click_start = time.perf_counter() if now is None else now
+        self._click_waiting_for_draw = False
+
+    def end_click(self, now=None):
+        """ Marks the click's shape lists as updated, its draw is timed at the end of the next frame """
+        now = time.perf_counter() if now is None else now
+        self.click_seconds.append(now - self._click_start)
+        self._click_waiting_for_draw = True
+
+    def get_stats(self):
+        """
+        :return: A Dictionary from each of the METRICS to a Dictionary with its "count", "mean",
+            "p50", "p90", "p99" and "max"
+        """
+        result = {}
+        for metric in METRICS:
+            samples = sorted(getattr(self, metric))
+            result[metric] = {
+                "count": len(samples),
+                "mean": sum(samples) / len(samples) if samples else 0,
+                "p50": get_percentile(samples, 50),
+                "p90": get_percentile(samples, 90),
+                "p99": get_percentile(samples, 99),
+                "max": samples[-1] if samples else 0
+            }
+        return result
+
+    def get_summary(self):
+        """ Describes the stats for the HUD
+        :return: A list of Strings
+        """
+        stats = self.get_stats()
+        frame = stats["frame_seconds"]
+        lines = [
+            "frame p50 {:.1f}ms p99 {:.1f}ms ({:.0f} fps)".format(
+                1000 * frame["p50"], 1000 * frame["p99"], 1 / frame["mean"] if frame["mean"] else 0),
+            "draw p50 {:.1f}ms p99 {:.1f}ms, {} draw calls".format(
+                1000 * stats["draw_seconds"]["p50"], 1000 * stats["draw_seconds"]["p99"],
+                self.draw_calls[-1] if self.draw_calls else 0),
+            "click p50 {:.1f}ms, to draw p50 {:.1f}ms p99 {:.1f}ms".format(
+                1000 * stats["click_seconds"]["p50"], 1000 * stats["click_to_draw_seconds"]["p50"],
+                1000 * stats["click_to_draw_seconds"]["p99"])
+        ]
+        return [self.last_click or "No click"] + lines
+
+    def save_json(self, path):
+        """ Writes the stats and every kept sample to a JSON file """
+        with open(path, "w") as file:
+            json.dump({
+                "stats": self.get_stats(),
+                "samples": {metric: list(getattr(self, metric)) for metric in METRICS}
+            }, file, indent=2)
+
+    def save_csv(self, path):
+        """ Writes every kept sample to a CSV file, a row each with its metric, index and value """
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["metric", "index", "value"])
+            for metric in METRICS:
+                for (i, value) in enumerate(getattr(self, metric)):
+                    writer.writerow([metric, i, value])
@@ -0,0 +1,50 @@
+import csv
+import json
+import os
+import tempfile
+from minesweeper_telemetry import *
+
+
+def test_telemetry():
+    telemetry = Telemetry(window=50)
+    # Frames every 10ms that take 4ms to draw, then one slow frame
+    for i in range(60):
+        telemetry.start_frame(now=i * 0.01)
+        if i == 30:
+            telemetry.start_click("left click", now=0.301)
+            telemetry.end_click(now=0.303)
+        telemetry.end_frame(5, now=i * 0.01 + (0.05 if i == 59 else 0.004))
+
+    # Only the latest samples are kept, and the click is timed to the end of the frame after it
+    stats = telemetry.get_stats()
+    assert stats["frame_seconds"]["count"] == 50 and abs(stats["frame_seconds"]["p99"] - 0.01) < 1e-9
+    assert abs(stats["draw_seconds"]["p50"] - 0.004) < 1e-9 and abs(stats["draw_seconds"]["max"] - 0.05) < 1e-9
+    assert stats["draw_calls"]["mean"] == 5
+    assert abs(stats["click_seconds"]["p50"] - 0.002) < 1e-9
+    assert stats["click_to_draw_seconds"]["count"] == 1
+    assert abs(stats["click_to_draw_seconds"]["p50"] - (0.304 - 0.301)) < 1e-9
+    summary = telemetry.get_summary()
+    assert summary[0] == "left click" and summary[1].startswith("frame p50 10.0ms")
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "telemetry.json")
+        telemetry.save_json(json_path)
+        with open(json_path) as file:
+            saved = json.load(file)
+        assert saved["stats"] == json.loads(json.dumps(stats)) and len(saved["samples"]["draw_calls"]) == 50
+
+        csv_path = os.path.join(directory, "telemetry.csv")
+        telemetry.save_csv(csv_path)
+        with open(csv_path, newline="") as file:
+            rows = list(csv.DictReader(file))
+        assert len(rows) == 50 * 3 + 1 + 1
+        assert rows[0] == {"metric": "frame_seconds", "index": "0", "value": str(telemetry.frame_seconds[0])}
+
+
+def test_get_percentile():
+    assert get_percentile([], 50) == 0
+    samples = list(range(1, 101))
+    assert get_percentile(samples, 50) == 50
+    assert get_percentile(samples, 99) == 99
+    assert get_percentile(samples, 100) == 100
+    assert get_percentile([7], 1) == 7
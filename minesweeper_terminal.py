@@ -1,5 +1,4 @@
 from minesweeper import *
-import random
 
 
 def get_difficulty():
@@ -37,15 +36,7 @@ def bomb_location(difficulty):
     """
     :return: returns a set of bombs at random locations
     """
-    counter = 1
-    total_bombs = set()
-    while counter in range(1, difficulty["num_bombs"] + 1):
-        bomb_x = random.randint(0, difficulty["board_width"]-1)
-        bomb_y = random.randint(0, difficulty["board_height"]-1)
-        bombs = (bomb_x, bomb_y)
-        total_bombs.add(bombs)
-        counter += 1
-    return total_bombs
+    return create_bomb_set(difficulty["board_width"], difficulty["board_height"], difficulty["num_bombs"])
 
 
 def user_move(board):
@@ -61,7 +52,7 @@ def user_move(board):
                 x, y = 0, 0
     coord = x - 1, y - 1
     while action != 'L' or action != 'R':
-        action = (input("L to reveal or R to flag\n").upper())
+        action = (input("L to reveal, R to flag or C to reveal around a number\n").upper())
         if action == 'L':
             return {
                 "action": "LEFT_CLICK",
@@ -74,6 +65,12 @@ def user_move(board):
                 "coord": coord
             }
 
+        elif action == 'C':
+            return {
+                "action": "CHORD",
+                "coord": coord
+            }
+
 
 def main():
     version = get_difficulty()
@@ -1,3 +1,6 @@
+import copy
+import random
+import minesweeper
 from minesweeper import *
 
 
@@ -59,6 +62,48 @@ def test_create_board():
     assert create_board(1, 1) == [[{"visible": False, "flagged": False, "value": '0'}]]
 
 
+def test_board():
+    cells = [
+        [create_cell(value='X'), create_cell(visible=True, value='1')],
+        [create_cell(flagged=True, value='1'), create_cell(visible=True)]
+    ]
+    board = Board.from_list(cells)
+
+    # Can be indexed and compared like a 2D array of cells
+    assert len(board) == 2 and len(board[0]) == 2
+    assert board[0][1] == create_cell(visible=True, value='1')
+    assert board[1][0]["flagged"] and not board[1][0]["visible"]
+    assert board == cells and board.to_list() == cells
+    assert board_to_string(board) == board_to_string(cells) == "#1\nF0"
+
+    # Writing through a row or cell updates the packed arrays
+    board[0][0]["visible"] = True
+    board[1][1] = create_cell(value='2')
+    assert board.get_cell((0, 0)) == create_cell(visible=True, value='X')
+    assert board.values == bytearray(b'X112') and board.state_rows == [bytearray([1, 1]), bytearray([2, 0])]
+
+    # Copies share arrays with the original until one of them is written to
+    copied = copy.deepcopy(board)
+    assert copied.values is board.values and copied.state_rows[1] is board.state_rows[1]
+    copied[0][1]["flagged"] = True
+    assert copied != board and not board[0][1]["flagged"]
+    assert copied.values is board.values and copied.state_rows[1] is board.state_rows[1]
+    board[1][1]["value"] = '3'
+    assert board.values is not copied.values and copied[1][1]["value"] == '2'
+
+    # The engine gives the same results on a Board and a 2D array of cells
+    bombs = {(2, 2), (3, 3)}
+    packed = place_nums_on_board(place_bombs_on_board(Board(6, 5), bombs))
+    unpacked = packed.to_list()
+    assert not isinstance(unpacked, Board)
+    for (action, coord) in [("LEFT_CLICK", (3, 4)), ("RIGHT_CLICK", (0, 0)), ("LEFT_CLICK", (5, 0))]:
+        packed = get_next_board(packed, action, coord)
+        unpacked = get_next_board(unpacked, action, coord)
+        assert packed == unpacked
+        assert board_to_string(packed) == board_to_string(unpacked)
+        assert is_board_over(packed) == is_board_over(unpacked)
+
+
 def test_cell_to_char():
     # Can convert a hidden cell to a char correctly
     assert cell_to_char(create_cell()) == '#'
@@ -110,6 +155,19 @@ def test_board_to_string():
     assert board_to_string(create_board(5, 2)) == "#####\n#####"
     assert board_to_string(test_board) == "001F1\n11111\nX1000"
 
+    # Packed boards only render the rows that changed since the last call
+    packed = Board.from_list(test_board)
+    assert board_to_string(packed) == "001F1\n11111\nX1000"
+    first_row = packed._row_strings[0]
+    packed[2][0]["visible"] = False
+    packed[2][1]["flagged"] = True
+    assert packed._row_strings[0] is first_row and packed._row_strings[2] is None
+    assert board_to_string(packed) == "001F1\n11111\n#1000"
+    copied = get_next_board(packed, "RIGHT_CLICK", (0, 2))
+    assert board_to_string(copied) == "001F1\n11111\nF1000"
+    assert board_to_string(packed) == "001F1\n11111\n#1000"
+    assert copied._row_strings[0] is first_row
+
 
 def test_place_bombs_on_board():
     test_board = create_board(10, 10)
@@ -176,6 +234,26 @@ def test_place_nums_on_board():
     assert test_board == original_board
 
 
+def test_place_nums_on_packed_board():
+    bombs = {(0, 0), (3, 0), (3, 1), (2, 4), (3, 4), (4, 4), (-1, 2), (9, 9)}
+    with_bombs = place_bombs_on_board(create_board(5, 5), bombs)
+    expected = place_nums_on_board(with_bombs.to_list())
+
+    # Every way of counting neighbors agrees with the 2D array of cells
+    assert place_nums_on_board(with_bombs) == expected
+    scattered = with_bombs.copy()
+    minesweeper._place_nums_with_scatter(scattered)
+    assert scattered == expected
+    if minesweeper.np is not None:
+        summed = with_bombs.copy()
+        minesweeper._place_nums_with_numpy(summed)
+        assert summed == expected
+
+    # Large boards are generated without visiting every cell in Python
+    board = place_nums_on_board(place_bombs_on_board(create_board(2000, 2000), {(0, 0), (1999, 1999)}))
+    assert board.values.count(b'X') == 2 and board.values.count(b'1') == 6
+
+
 def test_get_next_board():
     # 000000
     # 011100
@@ -221,6 +299,56 @@ def test_get_next_board():
     assert board_to_string(next_board) == "F00000\n011100\n01#210\n012X10\n001110"
 
 
+def test_reveal_on_board():
+    # 000000
+    # 011100
+    # 01X210
+    # 012X10
+    # 001110
+    bombs = {(2, 2), (3, 3)}
+    test_board = place_nums_on_board(place_bombs_on_board(create_board(6, 5), bombs))
+
+    # Revealing a number only reveals that cell and reports it
+    assert reveal_on_board(test_board, (3, 4)) == [(3, 4)]
+    assert board_to_string(test_board) == "######\n######\n######\n######\n###1##"
+
+    # Revealing a visible or out of bounds cell changes nothing
+    assert reveal_on_board(test_board, (3, 4)) == []
+    assert reveal_on_board(test_board, (-1, 7)) == []
+
+    # Flagged cells stop the flood fill and are left hidden
+    assert flag_on_board(test_board, (0, 0)) == [(0, 0)]
+    revealed = reveal_on_board(test_board, (5, 0))
+    assert board_to_string(test_board) == "F00000\n011100\n01#210\n012#10\n001110"
+    assert len(revealed) == len(set(revealed)) == 26
+
+    # Can flood fill a board far larger than the recursion limit
+    big_board = place_nums_on_board(place_bombs_on_board(create_board(300, 300), {(299, 299)}))
+    assert len(update_board(big_board, "LEFT_CLICK", (0, 0))) == 300 * 300 - 1
+    assert is_board_over(big_board) == (True, True)
+
+
+def test_flood_fill_packed_board():
+    # A Board reveals exactly the cells a board of dictionaries does, with flags and visible cells in the way
+    rng = random.Random(5)
+    for _ in range(200):
+        (width, height) = (rng.randint(1, 12), rng.randint(1, 12))
+        bombs = create_bomb_set(width, height, rng.randint(0, width * height // 4), seed=rng)
+        cells = place_nums_on_board(place_bombs_on_board(create_board(width, height), bombs))
+        for _ in range(rng.randint(0, 6)):
+            cell = cells[rng.randrange(height)][rng.randrange(width)]
+            cell["flagged" if rng.random() < 0.5 else "visible"] = True
+        board = Board.from_list(cells)
+        coords = [(rng.randint(-1, width), rng.randint(-1, height)) for _ in range(rng.randint(1, 3))]
+        assert sorted(minesweeper._flood_fill(board, coords)) == sorted(minesweeper._flood_fill(cells, coords))
+        assert board == cells
+
+    # Opening a whole 1000x1000 board works a row at a time instead of a cell at a time
+    game = create_game(1000, 1000, set())
+    game = get_next_game(game, "LEFT_CLICK", (500, 500))
+    assert game["is_win"] and game["visible_non_bombs"] == 1000 * 1000
+
+
 def test_is_board_over():
     # 000000
     # 011100
@@ -256,6 +384,35 @@ def test_is_board_over():
     assert original_board == place_nums_on_board(place_bombs_on_board(create_board(6, 5), bombs))
 
 
+def test_create_bomb_set():
+    # Always places exactly the number of bombs asked for, inside the board
+    for num_bombs in [0, 1, 40, 99, 100]:
+        bombs = create_bomb_set(10, 10, num_bombs)
+        assert len(bombs) == num_bombs
+        assert all(0 <= x < 10 and 0 <= y < 10 for (x, y) in bombs)
+
+    # Is reproducible from a seed or a random.Random
+    assert create_bomb_set(20, 20, 40, seed=7) == create_bomb_set(20, 20, 40, seed=7)
+    assert create_bomb_set(20, 20, 40, seed=random.Random(7)) == create_bomb_set(20, 20, 40, seed=7)
+
+    # Keeps the first click and its neighbors clear
+    bombs = create_bomb_set(5, 5, 16, seed=1, safe_coord=(1, 1))
+    assert len(bombs) == 16 and not bombs & {(x, y) for x in range(3) for y in range(3)}
+
+    # Can place lots of bombs
+    bombs = create_bomb_set(1000, 1000, 200000, seed=3, safe_coord=(0, 0))
+    assert len(bombs) == 200000 and (0, 0) not in bombs and (1, 1) not in bombs
+    assert bombs == create_bomb_set(1000, 1000, 200000, seed=3, safe_coord=(0, 0))
+
+    # Refuses to place more bombs than there is room for
+    for (num_bombs, safe_coord) in [(101, None), (-1, None), (92, (5, 5))]:
+        try:
+            create_bomb_set(10, 10, num_bombs, safe_coord=safe_coord)
+            assert False
+        except ValueError:
+            pass
+
+
 def test_create_game():
     bombs1 = {(0, 0)}
     game1 = {
@@ -264,6 +421,9 @@ def test_create_game():
         "bombs": bombs1,
         "game_over": False,
         "is_win": False,
+        "total_bombs": 1,
+        "visible_bombs": 0,
+        "visible_non_bombs": 0,
         "board": [
             [
                 {"visible": False, "flagged": False, "value": 'X'},
@@ -284,6 +444,9 @@ def test_create_game():
         "bombs": bombs2,
         "game_over": False,
         "is_win": False,
+        "total_bombs": 1,
+        "visible_bombs": 0,
+        "visible_non_bombs": 0,
         "board": [
             [
                 {"visible": False, "flagged": False, "value": '1'},
@@ -309,12 +472,18 @@ def test_get_next_game():
         "bombs": bombs,
         "game_over": False,
         "is_win": False,
+        "total_bombs": 2,
+        "visible_bombs": 0,
+        "visible_non_bombs": 1,
         "board": get_next_board(test_game["board"], 'LEFT_CLICK', (3, 4))
     }
 
     # Function is pure
     assert test_game == create_game(6, 5, bombs)
 
+    # The running counts agree with a full scan of the board
+    assert count_board(next_game["board"]) == {"total_bombs": 2, "visible_bombs": 0, "visible_non_bombs": 1}
+
     # The game is won when every non bomb cell is revealed
     next_game2 = get_next_game(next_game, 'LEFT_CLICK', (0, 0))
     assert next_game2 == {
@@ -323,6 +492,9 @@ def test_get_next_game():
         "bombs": bombs,
         "game_over": True,
         "is_win": True,
+        "total_bombs": 2,
+        "visible_bombs": 0,
+        "visible_non_bombs": 28,
         "board": get_next_board(next_game["board"], 'LEFT_CLICK', (0, 0))
     }
     next_game3 = get_next_game(next_game2, 'RIGHT_CLICK', (2, 2))
@@ -332,6 +504,9 @@ def test_get_next_game():
         "bombs": bombs,
         "game_over": True,
         "is_win": True,
+        "total_bombs": 2,
+        "visible_bombs": 0,
+        "visible_non_bombs": 28,
         "board": get_next_board(next_game2["board"], 'RIGHT_CLICK', (2, 2))
     }
 
@@ -343,8 +518,141 @@ def test_get_next_game():
         "bombs": bombs,
         "game_over": True,
         "is_win": False,
+        "total_bombs": 2,
+        "visible_bombs": 1,
+        "visible_non_bombs": 28,
         "board": get_next_board(next_game3["board"], 'LEFT_CLICK', (3, 3))
     }
+    for game in [next_game, next_game2, next_game3, next_game4]:
+        assert is_board_over(game["board"]) == (game["game_over"], game["is_win"])
+
+
+def test_chord_on_board():
+    # 000000
+    # 011100
+    # 01X210
+    # 012X10
+    # 001110
+    bombs = {(2, 2), (3, 3)}
+    test_board = place_nums_on_board(place_bombs_on_board(create_board(6, 5), bombs))
+    reveal_on_board(test_board, (3, 2))
+
+    # Chording a number without enough flags around it does nothing
+    assert chord_on_board(test_board, (3, 2)) == []
+    flag_on_board(test_board, (2, 2))
+    assert chord_on_board(test_board, (3, 2)) == []
+
+    # Chording a satisfied number reveals its unflagged neighbors, flood filling from any 0
+    flag_on_board(test_board, (3, 3))
+    revealed = chord_on_board(test_board, (3, 2))
+    assert len(revealed) == len(set(revealed)) == 26
+    assert board_to_string(test_board) == "000000\n011100\n01F210\n012F10\n001#10"
+
+    # Chording a hidden, empty or out of bounds cell does nothing
+    assert chord_on_board(test_board, (0, 0)) == []
+    assert chord_on_board(test_board, (9, 9)) == []
+
+    # A wrong flag means chording reveals a bomb
+    wrong_board = place_nums_on_board(place_bombs_on_board(create_board(6, 5), bombs))
+    reveal_on_board(wrong_board, (3, 2))
+    flag_on_board(wrong_board, (2, 1))
+    flag_on_board(wrong_board, (3, 3))
+    assert (2, 2) in chord_on_board(wrong_board, (3, 2))
+    assert is_board_over(wrong_board) == (True, False)
+
+    # Chording is an action like any other
+    game = create_game(6, 5, bombs)
+    for (action, coord) in [('LEFT_CLICK', (3, 2)), ('RIGHT_CLICK', (2, 2)), ('RIGHT_CLICK', (3, 3))]:
+        game = get_next_game(game, action, coord)
+    next_game = get_next_game(game, 'CHORD', (3, 2))
+    assert board_to_string(next_game["board"]) == "000000\n011100\n01F210\n012F10\n001#10"
+    assert next_game["visible_non_bombs"] == 27 and not next_game["game_over"]
+    assert get_next_board(game["board"], 'CHORD', (3, 2)) == next_game["board"]
+    assert Game(game).play('CHORD', (3, 2)) == chord_on_board(copy.deepcopy(game["board"]), (3, 2))
+
+    # A chord that reveals the last safe cell wins
+    game = get_next_game(next_game, 'CHORD', (4, 4))
+    assert game["game_over"] and game["is_win"]
+
+
+def test_apply_moves():
+    bombs = {(2, 2), (3, 3), (0, 4)}
+    game = create_game(6, 5, bombs)
+    moves = [('RIGHT_CLICK', (0, 0)), ('LEFT_CLICK', (5, 0)), ('RIGHT_CLICK', (2, 2)), ('RIGHT_CLICK', (3, 3)),
+             ('CHORD', (3, 2)), ('LEFT_CLICK', (2, 2)), ('LEFT_CLICK', (1, 4))]
+
+    # Matches playing the moves one at a time, and leaves the game it started from alone
+    (final, summaries) = apply_moves(game, moves)
+    expected = game
+    for (action, coord) in moves:
+        next_game = get_next_game(expected, action, coord)
+        changed = [(x, y) for y in range(5) for x in range(6) if next_game["board"][y][x] != expected["board"][y][x]]
+        assert sorted(summaries.pop(0)["changed"]) == sorted(changed)
+        expected = next_game
+    assert final == expected and not final["game_over"]
+    assert game == create_game(6, 5, bombs)
+    assert apply_moves(game, moves)[1][2] == {"action": 'RIGHT_CLICK', "coord": (2, 2), "changed": [(2, 2)]}
+
+    # Stops at the move that ends the game
+    (final, summaries) = apply_moves(game, [('LEFT_CLICK', (3, 3)), ('LEFT_CLICK', (5, 0))])
+    assert final["game_over"] and not final["is_win"] and len(summaries) == 1
+
+    # Takes any iterable, and no moves is a copy of the game
+    (final, summaries) = apply_moves(game, iter([]))
+    assert final == game and final["board"] is not game["board"] and summaries == []
+
+
+def test_game():
+    bombs = {(2, 2), (3, 3), (0, 4)}
+    moves = [('RIGHT_CLICK', (0, 0)), ('LEFT_CLICK', (5, 4)), ('LEFT_CLICK', (0, 0)), ('RIGHT_CLICK', (0, 0)),
+             ('LOL', (1, 1)), ('LEFT_CLICK', (8, 8)), ('LEFT_CLICK', (0, 0)), ('LEFT_CLICK', (2, 2))]
+    pure_game = create_game(6, 5, bombs)
+    game = Game(pure_game)
+
+    # Changing a game in place gives the same results as the pure functions
+    for (action, coord) in moves:
+        next_pure_game = get_next_game(pure_game, action, coord)
+        changed = game.play(action, coord)
+        assert game.state == next_pure_game
+        assert sorted(changed) == sorted((x, y) for y in range(5) for x in range(6)
+                                         if pure_game["board"][y][x] != next_pure_game["board"][y][x])
+        pure_game = next_pure_game
+    assert game["game_over"] and not game["is_win"]
+
+    # The game it was created from is left alone
+    assert Game(create_game(6, 5, bombs)).state == create_game(6, 5, bombs)
+
+    # Can chord in place
+    game = Game(create_game(6, 5, bombs))
+    assert game.reveal(3, 2) == [(3, 2)]
+    assert game.flag(2, 2) == [(2, 2)] and game.flag(3, 3) == [(3, 3)]
+    assert len(game.chord(3, 2)) == 23 and not game["game_over"]
+
+
+def test_history():
+    bombs = {(2, 2), (3, 3)}
+    history = History(create_game(6, 5, bombs))
+
+    # Can play, undo and redo moves
+    history.play('LEFT_CLICK', (3, 4))
+    history.play('RIGHT_CLICK', (0, 0))
+    assert board_to_string(history.game["board"]) == "F#####\n######\n######\n######\n###1##"
+    assert board_to_string(history.undo()["board"]) == "######\n######\n######\n######\n###1##"
+    assert board_to_string(history.undo()["board"]) == "######\n######\n######\n######\n######"
+    assert not history.can_undo() and history.undo() == create_game(6, 5, bombs)
+    assert board_to_string(history.redo()["board"]) == "######\n######\n######\n######\n###1##"
+
+    # Playing a move after an undo throws away the moves that could have been redone
+    history.play('LEFT_CLICK', (3, 3))
+    assert not history.can_redo() and history.game["game_over"] and not history.game["is_win"]
+    assert board_to_string(history.undo()["board"]) == "######\n######\n######\n######\n###1##"
+    assert board_to_string(history.redo()["board"]) == "######\n######\n######\n###X##\n###1##"
+    assert history.game["game_over"] and history.game["visible_bombs"] == 1
+
+    # Each state before the current one only keeps the rows its move changed
+    assert [list(rows) for (fields, rows, values) in history._undo_changes] == [[4], [3]]
+    assert all(values is None and "board" not in fields for (fields, rows, values) in history._undo_changes)
+    assert history.undo()["bombs"] is history.game["bombs"] is bombs
 
 
 def run_tests():
@@ -353,6 +661,8 @@ def run_tests():
     test_create_cell()
     # Can create a board
     test_create_board()
+    # Can store a board in packed arrays
+    test_board()
 
     # Can convert a cell to a char
     test_cell_to_char()
@@ -363,16 +673,32 @@ def run_tests():
     test_place_bombs_on_board()
     # Can place the numbers on a board
     test_place_nums_on_board()
+    # Can place the numbers on a packed board
+    test_place_nums_on_packed_board()
 
     # Can advance the board to its next state
     test_get_next_board()
+    # Can reveal cells in place without recursion
+    test_reveal_on_board()
+    # Can reveal a packed board a run of cells at a time
+    test_flood_fill_packed_board()
     # Check check to see if a board is solved, and if it was a win or loss
     test_is_board_over()
 
+    # Can pick random bomb locations
+    test_create_bomb_set()
     # Can create a game
     test_create_game()
     # Can advance the game to its next state
     test_get_next_game()
+    # Can chord a number to reveal its neighbors
+    test_chord_on_board()
+    # Can apply many moves with a single copy
+    test_apply_moves()
+    # Can change a game in place
+    test_game()
+    # Can undo and redo moves
+    test_history()
 
     print("All tests passed!")
 
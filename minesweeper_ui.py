@@ -1,7 +1,12 @@
 import math
-import random
+import sys
+import time
 import arcade
+import PIL.Image
+import PIL.ImageDraw
 import minesweeper
+import minesweeper_profile
+import minesweeper_telemetry
 
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
@@ -18,44 +23,49 @@ BUTTON_WIDTH = CELL_SIZE_PX * 4
 BUTTON_HEIGHT = CELL_SIZE_PX * 1.25
 BUTTON_SPACING = 50
 
+# How many of the slowest phases the profiling overlay shows
+PROFILE_LINES = 8
+
+# How often the HUD and the profiling overlay are refreshed, in seconds, since working out their
+# stats and laying out changed text every frame would show up in the frame times they report
+OVERLAY_REFRESH_SECONDS = 0.25
+# The spacing between lines of the HUD and the profiling overlay
+OVERLAY_LINE_HEIGHT = 14
+
+# Where the E key exports telemetry to
+TELEMETRY_JSON_PATH = "telemetry.json"
+TELEMETRY_CSV_PATH = "telemetry.csv"
+
+# The name of the color each cell's text is drawn in, anything else uses the bomb color
+TEXT_COLOR_NAMES = {
+    '1': "one",
+    '2': "two",
+    '3': "three",
+    '4': "four",
+    '5': "five",
+    '6': "six",
+    '7': "seven",
+    '8': "eight"
+}
+
+# Every way a cell can look, each is rendered once into a texture when drawing with cell textures
+CELL_APPEARANCES = ["default", "flag", "bomb", "empty", '1', '2', '3', '4', '5', '6', '7', '8']
+
 
 def get_difficulty(value):
     """ User prompted for difficulty (easy, medium, or hard)
     :return: Board width, heights, and number of bombs
     """
-    if value is 1:
-        return {
-            "board_width": 10,
-            "board_height": 10,
-            "num_bombs": 10
-        }
-    if value is 2:
-        return {
-            "board_width": 15,
-            "board_height": 15,
-            "num_bombs": 20
-        }
-    if value is 3:
-        return {
-            "board_width": 20,
-            "board_height": 20,
-            "num_bombs": 40
-        }
+    names = list(minesweeper.DIFFICULTIES)
+    if value in range(1, len(names) + 1):
+        return dict(minesweeper.DIFFICULTIES[names[value - 1]])
 
 
 def get_bomb_set(difficulty):
     """
     :return: returns a set of bombs at random locations
     """
-    counter = 1
-    total_bombs = set()
-    while counter in range(1, difficulty["num_bombs"] + 1):
-        bomb_x = random.randint(0, difficulty["board_width"] - 1)
-        bomb_y = random.randint(0, difficulty["board_height"] - 1)
-        bombs = (bomb_x, bomb_y)
-        total_bombs.add(bombs)
-        counter += 1
-    return total_bombs
+    return minesweeper.create_bomb_set(difficulty["board_width"], difficulty["board_height"], difficulty["num_bombs"])
 
 
 def get_ui_data(game):
@@ -121,30 +131,102 @@ def get_ui_data(game):
     for y in range(game["board_height"]):
         row = []
         for x in range(game["board_width"]):
-            colors = result["colors"]
-            color = None
-            cell = game["board"][y][x]
-            if cell["flagged"]:
-                color = colors["flag"]
-            elif cell["visible"] or (game["game_over"] and not game["is_win"]):
-                if cell["value"] == 'X':
-                    color = colors["bomb"]
-                else:
-                    color = colors["empty"]
-            else:
-                color = colors["default"]
-            row.append({
-                "x": result["board"]["x"] + (x * CELL_SIZE_PX) + (CELL_SIZE_PX / 2),
-                "y": SCREEN_HEIGHT - (y * CELL_SIZE_PX) - (CELL_SIZE_PX / 2) - result["board"]["y"],
-                "height": CELL_SIZE_PX,
-                "width": CELL_SIZE_PX,
-                "color": color
-            })
+            row.append(get_cell_ui_data(game, result, (x, y)))
         result["board"]["cells"].append(row)
 
     return result
 
 
+def get_cell_ui_data(game, ui_data, coord):
+    """
+    Generates the UI data for a single cell, so a move only has to regenerate the cells it changed.
+
+    :param game: The game the cell belongs to
+    :param ui_data: The UI data from get_ui_data, for its colors and board position
+    :param coord: The cell's (x, y) location on the board
+    :return: A data structure that contains declarative UI data for the cell
+    """
+    (x, y) = coord
+    colors = ui_data["colors"]
+    color = None
+    text = None
+    appearance = None
+    cell = game["board"][y][x]
+    is_visible = cell["visible"] or (game["game_over"] and not game["is_win"])
+    if cell["flagged"]:
+        color = colors["flag"]
+        appearance = "flag"
+    elif is_visible:
+        if cell["value"] == 'X':
+            color = colors["bomb"]
+            appearance = "bomb"
+        else:
+            color = colors["empty"]
+            appearance = "empty" if cell["value"] == '0' else cell["value"]
+        if cell["value"] != '0':
+            text = cell["value"]
+    else:
+        color = colors["default"]
+        appearance = "default"
+    return {
+        "x": ui_data["board"]["x"] + (x * CELL_SIZE_PX) + (CELL_SIZE_PX / 2),
+        "y": SCREEN_HEIGHT - (y * CELL_SIZE_PX) - (CELL_SIZE_PX / 2) - ui_data["board"]["y"],
+        "height": CELL_SIZE_PX,
+        "width": CELL_SIZE_PX,
+        "color": color,
+        "text": text,
+        "text_color": colors[TEXT_COLOR_NAMES.get(text, "bomb")],
+        "appearance": appearance
+    }
+
+
+def create_cell_texture(appearance, colors):
+    """
+    Renders one of the CELL_APPEARANCES, with its fill, border and text, into a texture.
+
+    :param appearance: One of CELL_APPEARANCES
+    :param colors: The colors from get_ui_data
+    :return: An arcade Texture the size of a cell
+    """
+    if appearance in TEXT_COLOR_NAMES:
+        fill = colors["empty"]
+    else:
+        fill = colors[appearance]
+    image = PIL.Image.new("RGBA", (CELL_SIZE_PX, CELL_SIZE_PX), tuple(fill) + (255,))
+    draw = PIL.ImageDraw.Draw(image)
+    draw.rectangle((0, 0, CELL_SIZE_PX - 1, CELL_SIZE_PX - 1), outline=tuple(colors["border"]) + (255,))
+    if appearance in TEXT_COLOR_NAMES:
+        text = arcade.create_text_image(appearance, colors[TEXT_COLOR_NAMES[appearance]])
+        position = ((CELL_SIZE_PX - text.width) // 2, (CELL_SIZE_PX - text.height) // 2)
+        image.paste(text, position, text)
+    return arcade.Texture("cell-" + appearance, image)
+
+
+def set_text_lines(texts, lines):
+    """ Shows lines of text in arcade.Text objects, leaving the ones that don't change alone
+    so they aren't laid out again
+    :param texts: A list of arcade.Text
+    :param lines: A list of Strings, the texts past the end of it are blanked
+    """
+    for (i, text) in enumerate(texts):
+        line = lines[i] if i < len(lines) else ""
+        if text.text != line:
+            text.text = line
+
+
+def draw_text_lines(texts):
+    """ Draws the arcade.Text objects that have any text
+    :param texts: A list of arcade.Text, or None before they're created
+    :return: How many draw calls it made
+    """
+    draw_calls = 0
+    for text in texts or []:
+        if text.text:
+            text.draw()
+            draw_calls += 1
+    return draw_calls
+
+
 class App(arcade.Window):
     """
     The App class handles the implementation details of rendering our application at 60 FPS in an OS window
@@ -162,18 +244,46 @@ class App(arcade.Window):
 
     button_shape_list = None
     board_shape_list = None
+    cell_sprite_list = None
+    text_sprite_list = None
+
+    # cell_sprites[y][x] is the sprite tinted to that cell's color, text_sprites holds the numbers shown
+    cell_sprites = None
+    text_sprites = None
+    # Text textures are rendered once and reused for every cell showing the same text
+    text_textures = {}
+
+    # When True every cell is one sprite whose texture is swapped between the CELL_APPEARANCES,
+    # so the whole board is drawn in a single batch however big it is
+    use_cell_textures = True
+    cell_textures = None
+
+    # The running Profiler while profiling is on, toggled with the P key
+    profiler = None
+
+    # Frame times, click latency and draw calls, shown in the HUD while show_hud is on (the H key)
+    telemetry = None
+    show_hud = True
+
+    # The arcade.Text lines of the HUD and the profiling overlay, which are laid out once and again
+    # only when their text changes, and when they were last refreshed
+    hud_texts = None
+    profile_texts = None
+    overlay_refreshed_at = None
 
-    click_text = "No click"
     offset_x = 0
     offset_y = 0
 
     def __init__(self, width, height, title):
         super().__init__(width, height, title)
+        self.telemetry = minesweeper_telemetry.Telemetry()
 
         # Create a game to play
         difficulty = get_difficulty(self.difficulty)
         bomb_set = get_bomb_set(difficulty)
-        self.game = minesweeper.create_game(difficulty["board_width"], difficulty["board_height"], bomb_set)
+        self.game = minesweeper.Game(
+            minesweeper.create_game(difficulty["board_width"], difficulty["board_height"], bomb_set)
+        )
 
         arcade.set_background_color((60, 60, 60))
 
@@ -193,19 +303,21 @@ class App(arcade.Window):
 
     def generate_shape_list(self):
         """
-        Regenerate the shape list based on the current state of the game
+        Regenerate the shapes and sprites for the whole board based on the current state of the game
         """
         cells = self.ui_data["board"]["cells"]
         self.board_shape_list = arcade.ShapeElementList()
-        for row in cells:
-            for cell in row:
-                rect = arcade.create_rectangle_filled(
-                    cell["x"],
-                    cell["y"],
-                    cell["width"],
-                    cell["height"],
-                    cell["color"]
-                )
+        self.cell_sprite_list = arcade.SpriteList()
+        self.text_sprite_list = arcade.SpriteList()
+        self.cell_sprites = []
+        self.text_sprites = {}
+        if self.use_cell_textures:
+            self.generate_textured_sprite_list()
+            return
+        for y, row in enumerate(cells):
+            sprite_row = []
+            for x, cell in enumerate(row):
+                # The borders never change, only the fill color and the text do
                 border = arcade.create_rectangle_outline(
                     cell["x"],
                     cell["y"],
@@ -213,19 +325,83 @@ class App(arcade.Window):
                     cell["height"],
                     self.ui_data["colors"]["border"]
                 )
-                self.board_shape_list.append(rect)
                 self.board_shape_list.append(border)
 
+                # A white sprite can be tinted to any color without rebuilding anything
+                sprite = arcade.SpriteSolidColor(cell["width"], cell["height"], arcade.color.WHITE)
+                sprite.center_x = cell["x"]
+                sprite.center_y = cell["y"]
+                sprite.color = cell["color"]
+                self.cell_sprite_list.append(sprite)
+                sprite_row.append(sprite)
+                self.update_text_sprite((x, y), cell)
+            self.cell_sprites.append(sprite_row)
+
+    def generate_textured_sprite_list(self):
+        """
+        Create one sprite per cell, textured with how the cell currently looks
+        """
+        if self.cell_textures is None:
+            colors = self.ui_data["colors"]
+            self.cell_textures = {
+                appearance: create_cell_texture(appearance, colors) for appearance in CELL_APPEARANCES
+            }
+        for row in self.ui_data["board"]["cells"]:
+            sprite_row = []
+            for cell in row:
+                sprite = arcade.Sprite(texture=self.cell_textures[cell["appearance"]])
+                sprite.center_x = cell["x"]
+                sprite.center_y = cell["y"]
+                self.cell_sprite_list.append(sprite)
+                sprite_row.append(sprite)
+            self.cell_sprites.append(sprite_row)
+
+    def get_text_texture(self, text, color):
+        """
+        :return: The cached texture for a cell's text, rendering it the first time it's needed
+        """
+        key = (text, color)
+        if key not in self.text_textures:
+            image = arcade.create_text_image(text, color)
+            self.text_textures[key] = arcade.Texture("cell-text-" + text + "-" + str(color), image)
+        return self.text_textures[key]
+
+    def update_text_sprite(self, coord, cell):
+        """
+        Add, replace or remove the text sprite of one cell
+        """
+        if coord in self.text_sprites:
+            self.text_sprites.pop(coord).remove_from_sprite_lists()
+        if cell["text"] is not None:
+            sprite = arcade.Sprite(texture=self.get_text_texture(cell["text"], cell["text_color"]))
+            sprite.center_x = cell["x"]
+            sprite.center_y = cell["y"]
+            self.text_sprite_list.append(sprite)
+            self.text_sprites[coord] = sprite
+
+    def update_shape_list(self, changed):
+        """
+        Patch the sprites of only the cells that changed
+        """
+        for coord in changed:
+            (x, y) = coord
+            cell = get_cell_ui_data(self.game, self.ui_data, coord)
+            self.ui_data["board"]["cells"][y][x] = cell
+            if self.use_cell_textures:
+                self.cell_sprites[y][x].texture = self.cell_textures[cell["appearance"]]
+            else:
+                self.cell_sprites[y][x].color = cell["color"]
+                self.update_text_sprite(coord, cell)
+
     def setup(self):
         """
         Store all of the geometry for our scene into a shape list to optimize draw speed
         """
-        # reset the game
+        # reset the game, which also generates the board's shapes
         self.reset_game(self.difficulty)
 
         # generate the shape lists
         self.generate_button_shape_list()
-        self.generate_shape_list()
 
     def reset_game(self, difficulty):
         """
@@ -234,28 +410,62 @@ class App(arcade.Window):
         self.difficulty = difficulty
         difficulty = get_difficulty(self.difficulty)
         bomb_set = get_bomb_set(difficulty)
-        self.game = minesweeper.create_game(difficulty["board_width"], difficulty["board_height"], bomb_set)
+        self.game = minesweeper.Game(
+            minesweeper.create_game(difficulty["board_width"], difficulty["board_height"], bomb_set)
+        )
         self.ui_data = get_ui_data(self.game)
+        self.generate_shape_list()
 
         # The top left corner of the board needs to be adjusted
         self.offset_x = (SCREEN_WIDTH / 2) - ((self.game["board_width"] / 2) * CELL_SIZE_PX)
         self.offset_y = (SCREEN_HEIGHT / 2) - ((self.game["board_height"] / 2) * CELL_SIZE_PX)
 
+    def create_text_lines(self, count, x, top_y):
+        """
+        Create arcade.Text objects for lines of small text drawn one under another
+        """
+        color = self.ui_data["colors"]["click"]
+        return [arcade.Text("", x, top_y - OVERLAY_LINE_HEIGHT * i, color, 10) for i in range(count)]
+
+    def refresh_overlays(self, now):
+        """
+        Update the text of the HUD and profiling overlay lines, at most every OVERLAY_REFRESH_SECONDS
+        """
+        if self.overlay_refreshed_at is not None and now - self.overlay_refreshed_at < OVERLAY_REFRESH_SECONDS:
+            return
+        self.overlay_refreshed_at = now
+        if self.show_hud:
+            lines = self.telemetry.get_summary()
+            if self.hud_texts is None:
+                self.hud_texts = self.create_text_lines(len(lines), 20, 20 + OVERLAY_LINE_HEIGHT * (len(lines) - 1))
+            set_text_lines(self.hud_texts, lines)
+        if self.profiler is not None:
+            if self.profile_texts is None:
+                self.profile_texts = self.create_text_lines(PROFILE_LINES, 150, SCREEN_HEIGHT - 20)
+            set_text_lines(self.profile_texts, self.profiler.get_summary(PROFILE_LINES))
+
     def on_draw(self):
         """
         Render the screen.
         """
+        self.telemetry.start_frame()
+        draw_calls = 0
+        self.refresh_overlays(time.perf_counter())
 
         # This command should happen before we start drawing. It will clear
         # the screen to the background color, and erase what we drew last frame.
         arcade.start_render()
 
         # Call draw() on all your sprite lists below
+        self.cell_sprite_list.draw()
         self.board_shape_list.draw()
+        self.text_sprite_list.draw()
         self.button_shape_list.draw()
+        draw_calls += 4
         colors = self.ui_data["colors"]
 
-        arcade.draw_text(self.click_text, 20, 20, colors["click"])
+        if self.show_hud:
+            draw_calls += draw_text_lines(self.hud_texts)
 
         for button in self.ui_data["buttons"]:
             # NOTE: this takes the x,y as the center, but we are storing the top left location
@@ -267,48 +477,24 @@ class App(arcade.Window):
                 button["y"] - (button["height"] / 2 + y_fudge),
                 colors["text"]
             )
+            draw_calls += 1
+
+        if self.profiler is not None:
+            draw_calls += draw_text_lines(self.profile_texts)
 
         if self.game["game_over"] and not self.game["is_win"]:
             x_fudge = -85
             y_fudge = -20
             arcade.draw_text("YOU LOSE", SCREEN_WIDTH / 2 + x_fudge, SCREEN_HEIGHT / 2 + y_fudge, colors["over"], 36)
+            draw_calls += 1
 
         if self.game["game_over"] and self.game["is_win"]:
             x_fudge = -85
             y_fudge = -20
             arcade.draw_text("YOU WON", SCREEN_WIDTH / 2 + x_fudge, SCREEN_HEIGHT / 2 + y_fudge, colors["over"], 36)
+            draw_calls += 1
 
-        # Draw text for all the cells
-        # TODO: investigate if this performs well (we should probably use sprites instead)
-        for row in range(self.game["board_height"]):
-            for col in range(self.game["board_width"]):
-                cell = self.game["board"][row][col]
-                not_flagged = not cell["flagged"]
-                not_empty = cell["value"] != '0'
-                is_visible = cell["visible"] or (self.game["game_over"] and not self.game["is_win"])
-                if not_flagged and not_empty and is_visible:
-                    color = colors["bomb"]
-                    if cell["value"] == '1':
-                        color = colors["one"]
-                    elif cell["value"] == '2':
-                        color = colors["two"]
-                    elif cell["value"] == '3':
-                        color = colors["three"]
-                    elif cell["value"] == '4':
-                        color = colors["four"]
-                    elif cell["value"] == '5':
-                        color = colors["five"]
-                    elif cell["value"] == '6':
-                        color = colors["six"]
-                    elif cell["value"] == '7':
-                        color = colors["seven"]
-                    elif cell["value"] == '8':
-                        color = colors["eight"]
-
-                    num_offset = 7
-                    x_px = self.offset_x + (col * CELL_SIZE_PX) + num_offset
-                    y_px = self.offset_y + (row * CELL_SIZE_PX) - num_offset
-                    arcade.draw_text(cell["value"], x_px, SCREEN_HEIGHT - y_px - CELL_SIZE_PX, color)
+        self.telemetry.end_frame(draw_calls)
 
     def update(self, delta_time):
         """
@@ -318,12 +504,44 @@ class App(arcade.Window):
         """
         pass
 
+    def toggle_profiling(self):
+        """
+        Start or stop profiling the engine and the UI, whose slowest phases are drawn over the board while it runs
+        """
+        if self.profiler is None:
+            self.profiler = minesweeper_profile.enable()
+            self.profiler.instrument_phases([
+                (sys.modules[__name__], "get_ui_data", None),
+                (App, "generate_shape_list", None),
+                (App, "update_shape_list", lambda args, result: len(args[1])),
+                (App, "on_draw", None)
+            ])
+        else:
+            minesweeper_profile.disable()
+            self.profiler = None
+
+    def on_key_press(self, symbol, modifiers):
+        """
+        Called when the user presses a key
+        """
+        if symbol == arcade.key.P:
+            self.toggle_profiling()
+            self.overlay_refreshed_at = None
+        elif symbol == arcade.key.H:
+            self.show_hud = not self.show_hud
+            self.overlay_refreshed_at = None
+        elif symbol == arcade.key.E:
+            self.telemetry.save_json(TELEMETRY_JSON_PATH)
+            self.telemetry.save_csv(TELEMETRY_CSV_PATH)
+
     def on_mouse_press(self, x, y, button, key_modifiers):
         """
         Called when the user presses a mouse button
         """
+        click_start = time.perf_counter()
         is_left_click = button == 1
         is_right_click = button == 4
+        is_middle_click = button == 2
 
         for button in self.ui_data["buttons"]:
             if button["x"] <= x <= button["x"] + button["width"]:
@@ -342,18 +560,26 @@ class App(arcade.Window):
         y_click = math.floor(((SCREEN_HEIGHT - y) - self.offset_y) / CELL_SIZE_PX)
 
         # Advance the game
+        was_over = self.game["game_over"]
         if is_left_click:
-            self.click_text = "left click     x: " + str(x) + " y: " + str(y)
-            self.game = minesweeper.get_next_game(self.game, "LEFT_CLICK", (x_click, y_click))
+            self.telemetry.start_click("left click     x: " + str(x) + " y: " + str(y), click_start)
+            changed = self.game.play("LEFT_CLICK", (x_click, y_click))
         elif is_right_click:
-            self.click_text = "right click     x: " + str(x_click) + " y: " + str(y_click)
-            self.game = minesweeper.get_next_game(self.game, "RIGHT_CLICK", (x_click, y_click))
+            self.telemetry.start_click("right click     x: " + str(x_click) + " y: " + str(y_click), click_start)
+            changed = self.game.play("RIGHT_CLICK", (x_click, y_click))
+        elif is_middle_click:
+            self.telemetry.start_click("middle click     x: " + str(x_click) + " y: " + str(y_click), click_start)
+            changed = self.game.play("CHORD", (x_click, y_click))
         else:
             return
 
-        # Update the shape list
-        self.ui_data = get_ui_data(self.game)
-        self.generate_shape_list()
+        # Losing shows every cell, otherwise only the cells the move changed need updating
+        if not was_over and self.game["game_over"] and not self.game["is_win"]:
+            self.ui_data = get_ui_data(self.game)
+            self.generate_shape_list()
+        else:
+            self.update_shape_list(changed)
+        self.telemetry.end_click()
 
 
 def main():
@@ -0,0 +1,209 @@
+import numpy as np
+import minesweeper
+
+# Actions for BoardBatch.step, one per board
+NOTHING = 0
+REVEAL = 1
+FLAG = 2
+
+# Boards up to this wide flood fill a whole row at a time
+ROW_BITS = 64
+
+
+def _dilate(masks, out):
+    """ Marks every cell next to or on a marked cell, for a stack of masks
+    :param masks: A (N, height, width) Boolean array
+    :param out: A (N, height + 2, width + 2) Boolean array to work in
+    :return: A (N, height, width) view of out
+    """
+    (height, width) = masks.shape[1:]
+    out[:] = False
+    for (delta_x, delta_y) in minesweeper.DIRECTIONS + [(0, 0)]:
+        out[:, 1 + delta_y:1 + delta_y + height, 1 + delta_x:1 + delta_x + width] |= masks
+    return out[:, 1:1 + height, 1:1 + width]
+
+
+class BoardBatch:
+    """
+    N boards of the same size stored as stacked NumPy arrays, that all take a move at once.
+    Each step applies one action per board with the same rules as update_board, flood fills every
+    board that needs it together, and keeps the same running counts a game dictionary has, so the
+    result of every board is known without scanning it.
+    Boards whose game is over ignore their actions until they're reset.
+    """
+
+    def __init__(self, mines):
+        """
+        :param mines: A (N, height, width) Boolean array of where the bombs are
+        """
+        self.mines = np.array(mines, dtype=bool)
+        (self.num_boards, self.height, self.width) = self.mines.shape
+        self.numbers = np.zeros(self.mines.shape, dtype=np.int8)
+        self.visible = np.zeros(self.mines.shape, dtype=bool)
+        self.flagged = np.zeros(self.mines.shape, dtype=bool)
+        self.total_bombs = np.zeros(self.num_boards, dtype=np.int64)
+        self.visible_bombs = np.zeros(self.num_boards, dtype=np.int64)
+        self.visible_non_bombs = np.zeros(self.num_boards, dtype=np.int64)
+        self.game_over = np.zeros(self.num_boards, dtype=bool)
+        self.is_win = np.zeros(self.num_boards, dtype=bool)
+        self._padded = np.zeros((self.num_boards, self.height + 2, self.width + 2), dtype=bool)
+        self.reset(np.arange(self.num_boards), self.mines)
+
+    @classmethod
+    def from_bomb_sets(cls, board_width, board_height, bomb_sets):
+        """ Stacks boards from bomb sets like create_game takes
+        :return: A BoardBatch
+        """
+        mines = np.zeros((len(bomb_sets), board_height, board_width), dtype=bool)
+        for (i, bomb_set) in enumerate(bomb_sets):
+            for (x, y) in bomb_set:
+                mines[i, y, x] = True
+        return cls(mines)
+
+    @staticmethod
+    def create_mines(num_boards, board_width, board_height, num_bombs, seed=None):
+        """ Picks random bomb locations for a stack of boards
+        :param seed: A seed or a numpy.random.Generator to make the bombs reproducible
+        :return: A (num_boards, board_height, board_width) Boolean array
+        """
+        rng = np.random.default_rng(seed)
+        cells = board_width * board_height
+        if not 0 <= num_bombs <= cells:
+            raise ValueError("Can't fit {} bombs on a {}x{} board".format(num_bombs, board_width, board_height))
+        order = rng.random((num_boards, cells)).argsort(axis=1)[:, :num_bombs]
+        mines = np.zeros((num_boards, cells), dtype=bool)
+        np.put_along_axis(mines, order, True, axis=1)
+        return mines.reshape(num_boards, board_height, board_width)
+
+    @classmethod
+    def create(cls, num_boards, board_width, board_height, num_bombs, seed=None):
+        """ Creates a stack of boards with random bombs
+        :return: A BoardBatch
+        """
+        return cls(cls.create_mines(num_boards, board_width, board_height, num_bombs, seed))
+
+    def reset(self, indexes, mines):
+        """ Starts new games on some of the boards
+        :param indexes: An array of the boards to reset
+        :param mines: A (len(indexes), height, width) Boolean array of their new bombs
+        """
+        mines = np.asarray(mines, dtype=bool)
+        self.mines[indexes] = mines
+        padded = np.pad(mines, ((0, 0), (1, 1), (1, 1))).astype(np.int8)
+        numbers = np.zeros(mines.shape, dtype=np.int8)
+        for (delta_x, delta_y) in minesweeper.DIRECTIONS:
+            numbers += padded[:, 1 + delta_y:1 + delta_y + self.height, 1 + delta_x:1 + delta_x + self.width]
+        numbers[mines] = 0
+        self.numbers[indexes] = numbers
+        self.visible[indexes] = False
+        self.flagged[indexes] = False
+        self.total_bombs[indexes] = mines.sum(axis=(1, 2))
+        self.visible_bombs[indexes] = 0
+        self.visible_non_bombs[indexes] = 0
+        self.game_over[indexes] = False
+        self.is_win[indexes] = False
+
+    def step(self, actions, xs, ys):
+        """ Applies one action to every board
+        :param actions: An array of NOTHING, REVEAL or FLAG for each board
+        :param xs: An array of the x of each board's action
+        :param ys: An array of the y of each board's action
+        :return: An array of how many cells each board revealed
+        """
+        actions = np.asarray(actions)
+        xs = np.asarray(xs)
+        ys = np.asarray(ys)
+        revealed = np.zeros(self.num_boards, dtype=np.int64)
+        in_bounds = (0 <= xs) & (xs < self.width) & (0 <= ys) & (ys < self.height) & ~self.game_over
+
+        flags = np.flatnonzero(in_bounds & (actions == FLAG))
+        self.flagged[flags, ys[flags], xs[flags]] ^= True
+
+        reveals = np.flatnonzero(in_bounds & (actions == REVEAL))
+        (xs, ys) = (xs[reveals], ys[reveals])
+        hidden = ~self.visible[reveals, ys, xs] & ~self.flagged[reveals, ys, xs]
+        (reveals, xs, ys) = (reveals[hidden], xs[hidden], ys[hidden])
+        self.visible[reveals, ys, xs] = True
+        revealed[reveals] = 1
+        hit_bomb = self.mines[reveals, ys, xs]
+        bombed = reveals[hit_bomb]
+        self.visible_bombs[bombed] += 1
+
+        opened = ~hit_bomb & (self.numbers[reveals, ys, xs] == 0)
+        (reveals, xs, ys) = (reveals[opened], xs[opened], ys[opened])
+        if len(reveals):
+            fronts = np.zeros((len(reveals), self.height, self.width), dtype=bool)
+            fronts[np.arange(len(reveals)), ys, xs] = True
+            revealed[reveals] += self._flood_fill(reveals, fronts)
+
+        self.visible_non_bombs += revealed
+        self.visible_non_bombs[bombed] -= 1
+        self._update_result()
+        return revealed
+
+    def _flood_fill(self, indexes, fronts):
+        """ Reveals outward from freshly revealed 0 cells on several boards at once, a ring of cells a pass
+        :param indexes: An array of the boards to flood fill
+        :param fronts: A (len(indexes), height, width) Boolean array of the 0 cells to start from
+        :return: An array of how many cells each of those boards revealed
+        """
+        if self.width <= ROW_BITS:
+            grown = self._flood_fill_rows(indexes, fronts)
+        else:
+            grown = self._flood_fill_cells(indexes, fronts)
+        self.visible[indexes] |= grown
+        return grown.sum(axis=(1, 2))
+
+    def _flood_fill_rows(self, indexes, fronts):
+        """ Flood fills with each row packed into the bits of an integer, so a pass is a few
+        operations per row instead of per cell
+        :return: A (len(indexes), height, width) Boolean array of the cells revealed
+        """
+        bits = np.uint64(1) << np.arange(self.width, dtype=np.uint64)
+
+        def pack(masks):
+            return (masks * bits).sum(axis=2, dtype=np.uint64)
+
+        open_cells = pack(~self.flagged[indexes] & ~self.visible[indexes])
+        zeros = pack((self.numbers[indexes] == 0) & ~self.mines[indexes])
+        fronts = pack(fronts)
+        grown = np.zeros(fronts.shape, dtype=np.uint64)
+        positions = np.arange(len(indexes))
+        while len(positions):
+            sideways = fronts | (fronts << np.uint64(1)) | (fronts >> np.uint64(1))
+            ring = sideways.copy()
+            ring[:, 1:] |= sideways[:, :-1]
+            ring[:, :-1] |= sideways[:, 1:]
+            ring &= open_cells[positions]
+            open_cells[positions] &= ~ring
+            grown[positions] |= ring
+            fronts = ring & zeros[positions]
+            # Boards that have finished drop out, so the passes get cheaper as regions close
+            still_open = fronts.any(axis=1)
+            (positions, fronts) = (positions[still_open], fronts[still_open])
+        return (grown[:, :, None] & bits) != 0
+
+    def _flood_fill_cells(self, indexes, fronts):
+        """ Flood fills one cell per element, for boards too wide to pack a row into an integer
+        :return: A (len(indexes), height, width) Boolean array of the cells revealed
+        """
+        open_cells = ~self.flagged[indexes] & ~self.visible[indexes]
+        zeros = (self.numbers[indexes] == 0) & ~self.mines[indexes]
+        grown = np.zeros(fronts.shape, dtype=bool)
+        positions = np.arange(len(indexes))
+        while len(positions):
+            ring = _dilate(fronts, self._padded[:len(positions)]) & open_cells[positions]
+            open_cells[positions] &= ~ring
+            grown[positions] |= ring
+            fronts = ring & zeros[positions]
+            still_open = fronts.any(axis=(1, 2))
+            (positions, fronts) = (positions[still_open], fronts[still_open])
+        return grown
+
+    def _update_result(self):
+        total_cells = self.width * self.height
+        lost = self.visible_bombs > 0
+        won = ~lost & (self.visible_non_bombs == total_cells - self.total_bombs)
+        # In place, so views of these arrays stay up to date
+        np.logical_or(lost, won, out=self.game_over)
+        self.is_win[:] = won
@@ -0,0 +1,68 @@
+import random
+import numpy as np
+from minesweeper import *
+from minesweeper_vector import *
+
+
+def get_masks(game):
+    board = game["board"]
+    visible = [[board[y][x]["visible"] for x in range(game["board_width"])] for y in range(game["board_height"])]
+    flagged = [[board[y][x]["flagged"] for x in range(game["board_width"])] for y in range(game["board_height"])]
+    return np.array(visible), np.array(flagged)
+
+
+def check_against_games(num_boards, width, height, num_bombs, num_steps):
+    batch = BoardBatch.create(num_boards, width, height, num_bombs, seed=num_bombs)
+    bomb_sets = [{(x, y) for (y, x) in zip(*np.nonzero(mines))} for mines in batch.mines]
+    games = [create_game(width, height, bomb_set) for bomb_set in bomb_sets]
+    rng = random.Random(0)
+    for _ in range(num_steps):
+        actions = [rng.choice([REVEAL, REVEAL, REVEAL, FLAG, NOTHING]) for _ in range(num_boards)]
+        xs = [rng.randrange(-1, width) for _ in range(num_boards)]
+        ys = [rng.randrange(height) for _ in range(num_boards)]
+        revealed = batch.step(actions, xs, ys)
+        for (i, game) in enumerate(games):
+            if game["game_over"] or actions[i] == NOTHING:
+                assert revealed[i] == 0
+                continue
+            action = {REVEAL: "LEFT_CLICK", FLAG: "RIGHT_CLICK"}[actions[i]]
+            games[i] = get_next_game(game, action, (xs[i], ys[i]))
+            if action == "LEFT_CLICK":
+                assert revealed[i] == games[i]["visible_bombs"] + games[i]["visible_non_bombs"] - \
+                    game["visible_bombs"] - game["visible_non_bombs"]
+
+        for (i, game) in enumerate(games):
+            (visible, flagged) = get_masks(game)
+            assert (batch.visible[i] == visible).all() and (batch.flagged[i] == flagged).all()
+            assert (batch.game_over[i], batch.is_win[i]) == is_board_over(game["board"])
+            assert batch.visible_non_bombs[i] == game["visible_non_bombs"]
+    return batch
+
+
+def test_step():
+    # Every board ends up the same as playing it with get_next_game, whether its rows are packed or not
+    batch = check_against_games(60, 12, 9, 3, 30)
+    assert batch.is_win.any() and (batch.game_over & ~batch.is_win).any()
+    check_against_games(20, 70, 5, 8, 15)
+
+
+def test_create_and_reset():
+    batch = BoardBatch.create(5, 8, 6, 10, seed=1)
+    assert batch.mines.shape == (5, 6, 8)
+    assert list(batch.total_bombs) == [10] * 5 and list(batch.mines.sum(axis=(1, 2))) == [10] * 5
+    assert (batch.mines == BoardBatch.create(5, 8, 6, 10, seed=1).mines).all()
+
+    # The numbers match create_game's
+    #  X1
+    #  11
+    batch = BoardBatch.from_bomb_sets(2, 2, [{(0, 0)}, set()])
+    assert batch.numbers.tolist() == [[[0, 1], [1, 1]], [[0, 0], [0, 0]]]
+
+    # A board that's over ignores its moves until it's reset
+    batch.step([REVEAL, REVEAL], [0, 0], [0, 0])
+    assert batch.game_over.tolist() == [True, True] and batch.is_win.tolist() == [False, True]
+    assert batch.step([REVEAL, FLAG], [1, 1], [1, 1]).tolist() == [0, 0]
+    assert not batch.flagged.any()
+    batch.reset(np.array([0]), np.zeros((1, 2, 2), dtype=bool))
+    assert batch.game_over.tolist() == [False, True] and not batch.visible[0].any()
+    assert batch.total_bombs.tolist() == [0, 0] and batch.numbers[0].tolist() == [[0, 0], [0, 0]]